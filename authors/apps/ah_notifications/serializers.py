@@ -1,32 +1,47 @@
+from collections import defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
 from notifications.models import Notification
 from rest_framework import serializers
 
 from authors.apps.articles.models import Article, Comment
-from authors.apps.articles.serializers import CommentSerializer
 from authors.apps.authentication.models import User
-from authors.apps.profiles.models import Profile
 from authors.apps.profiles.serializers import ProfileSerializer
 
 
 class ActorField(serializers.RelatedField):
     """
-    To represent an actor that triggers the notification,
-
-    A comment is represented
+    To represent an actor that triggers the notification, or its target, with a
+    summary of the object: the slug and title of an article, the profile of a user,
+    and the body, author and article of a comment.
     """
 
+    def get_attribute(self, instance):
+        # the generic foreign key queries again for an object cached as missing, use what was loaded
+        field = getattr(type(instance), self.source)
+        if field.is_cached(instance):
+            return field.get_cached_value(instance)
+        return super().get_attribute(instance)
+
     def to_representation(self, value):
         actor_type = None
         data = []
         if isinstance(value, Article):
             actor_type = "article"
-            data = {"slug": value.slug}
+            data = {"slug": value.slug, "title": value.title}
         elif isinstance(value, Comment):
             actor_type = "comment"
-            data = CommentSerializer(value).data
+            data = {
+                "id": value.id,
+                "body": value.body,
+                "author": value.author.user.username,
+                "article": value.article.slug,
+                "parent": value.parent_id,
+            }
         elif isinstance(value, User):
             actor_type = "user"
-            data = ProfileSerializer(Profile.objects.get(user=value)).data
+            data = ProfileSerializer(value.profile).data
 
         return {
             "type": actor_type,
@@ -37,11 +52,83 @@ class ActorField(serializers.RelatedField):
         return Notification(data)
 
 
+class NotificationListSerializer(serializers.ListSerializer):
+    """
+    Serializes notifications with a query for each type of actor and target instead
+    of one for each notification, see load_related.
+    """
+
+    # the related objects loaded with each type of actor or target
+    RELATED = {
+        Comment: ('author__user', 'article'),
+        User: ('profile',),
+    }
+
+    def to_representation(self, data):
+        notifications = list(data.all() if isinstance(data, models.Manager) else data)
+        self.load_related(notifications)
+        return super().to_representation(notifications)
+
+    @classmethod
+    def load_related(cls, notifications):
+        """
+        Load the actors and targets of the notifications, with a single query for each
+        type of object whether it is an actor or a target, and set them on the
+        notifications. The same object is shared by all the notifications it is in, the
+        objects that no longer exist are set to None.
+        :param notifications:
+        """
+        fields = [Notification.actor, Notification.target]
+        objects = cls.load_objects(related_keys(notifications, fields))
+        for notification in notifications:
+            for field in fields:
+                field.set_cached_value(notification, objects.get(related_key(notification, field)))
+
+    @classmethod
+    def load_objects(cls, keys):
+        """
+        :param keys: the content type ids and object ids of the objects
+        :return: dict of the objects by their key
+        """
+        pks = defaultdict(set)
+        for content_type_id, pk in keys:
+            pks[content_type_id].add(pk)
+
+        objects = {}
+        for content_type_id, model_pks in pks.items():
+            model = ContentType.objects.get_for_id(content_type_id).model_class()
+            if model is None:
+                # the model was removed, its objects are gone
+                continue
+            queryset = model._base_manager.select_related(*cls.RELATED.get(model, ()))
+            objects.update({(content_type_id, str(instance.pk)): instance
+                            for instance in queryset.filter(pk__in=model_pks)})
+        return objects
+
+
+def related_key(notification, field):
+    """
+    :param notification:
+    :param field: a generic foreign key of the notification
+    :return: the id of the content type and the object id the field points to
+    """
+    return getattr(notification, field.ct_field + '_id'), getattr(notification, field.fk_field)
+
+
+def related_keys(notifications, fields):
+    """
+    :return: the keys of the objects the fields of the notifications point to, see related_key
+    """
+    keys = (related_key(notification, field) for notification in notifications for field in fields)
+    return [key for key in keys if key[0] is not None]
+
+
 class NotificationSerializer(serializers.ModelSerializer):
     actor = ActorField(read_only=True)
     target = ActorField(read_only=True)
 
     class Meta:
         model = Notification
+        list_serializer_class = NotificationListSerializer
 
         fields = ('id', 'actor', 'verb', 'target', 'level', 'unread', 'timestamp', 'description',)
@@ -1,11 +1,14 @@
 import json
 
+from django.core import mail
 from notifications.signals import notify
 from rest_framework import status
 from rest_framework.reverse import reverse
 
+from authors.apps.articles.models import Article
 from authors.apps.articles.tests.api.test_articles import BaseArticlesTestCase
 from authors.apps.authentication.tests.api.test_auth import AuthenticatedTestCase
+from authors.apps.core.test_helpers import run_jobs
 
 
 class BaseNotificationsTestCase(AuthenticatedTestCase):
@@ -284,12 +287,46 @@ class ArticleNotificationTestCase(BaseArticlesTestCase, BaseNotificationsTestCas
         # login as first user and create an article
         self.login(self.user)
         self.create_article(published=True)
+        run_jobs()
 
         # login as second user and check notifications
         self.login(self.user2)
         status_code, data = self.get(notification_type='unsent')
         self.assertEqual(data['data']['count'], 1)
 
+    def test_followers_are_notified_once_when_a_draft_is_published(self):
+        self.register_and_login(self.user2)
+        self.client.post(reverse("profiles:follow", kwargs={'username': self.user['user']['username']}))
+
+        self.login(self.user)
+        slug = self.create_article()['slug']
+        run_jobs()
+        self.login(self.user2)
+        self.assertEqual(self.get(notification_type='unsent')[1]['data']['count'], 0)
+
+        self.login(self.user)
+        for title in ("Published", "Updated after publishing"):
+            self.client.put(self.url_retrieve(slug), data={"article": {"title": title, "published": True}},
+                            format="json")
+            slug = Article.objects.get(title=title).slug
+        run_jobs()
+        self.login(self.user2)
+        self.assertEqual(self.get(notification_type='unsent')[1]['data']['count'], 1)
+
+    def test_subscribed_followers_are_emailed(self):
+        self.register_and_login(self.user2)
+        self.client.post(reverse("profiles:follow", kwargs={'username': self.user['user']['username']}))
+        self.client.post(reverse("notifications:subscribe"))
+        run_jobs()
+
+        self.login(self.user)
+        mail.outbox = []
+        self.create_article(published=True)
+        self.assertEqual(len(mail.outbox), 0)
+
+        run_jobs()
+        self.assertEqual([message.to for message in mail.outbox], [[self.user2['user']['email']]])
+
     def test_author_gets_notification_upon_article_favoriting(self):
         """
         Ensure a author gets a notification in their unread box after his article has been rated
@@ -0,0 +1,75 @@
+import json
+
+from notifications.signals import notify
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from authors.apps.articles.models import Comment
+from authors.apps.core.test_helpers import QueryScalingMixin, create_article, create_profile
+
+
+class NotificationQueriesTestCase(QueryScalingMixin, APITestCase):
+    """
+    The notifications are listed with the same number of queries however many there are
+    """
+
+    def setUp(self):
+        self.user = create_profile().user
+        self.client.force_authenticate(self.user)
+        self.article = create_article(self.user)
+
+    def create_notifications(self, count):
+        # the actors of the notifications are users, articles and comments
+        for _ in range(count):
+            follower = create_profile()
+            notify.send(follower.user, recipient=self.user, verb='follow', description='Followed you')
+            article = create_article(follower.user)
+            notify.send(article, recipient=self.user, verb='article', description='Published', target=follower.user)
+            comment = Comment.objects.create(article=self.article, author=follower, body='A comment')
+            comment.likes.add(self.user)
+            notify.send(comment, recipient=self.user, verb='comment', description='Commented', target=self.article)
+
+    def test_all_notifications(self):
+        self.assertQueriesDoNotScale(reverse('notifications:notifications'), self.create_notifications)
+
+    def test_unread_notifications(self):
+        self.assertQueriesDoNotScale(reverse('notifications:unread-notifications'), self.create_notifications)
+
+    def test_notifications_are_listed_with_a_fixed_number_of_queries(self):
+        self.create_notifications(5)
+        # marking the notifications as sent, the notifications, then the comments, the
+        # articles and the users, whether they are actors or targets
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('notifications:notifications'))
+        data = json.loads(response.content)['data']
+        self.assertEqual(data['count'], len(data['notifications']))
+        self.assertGreaterEqual(data['count'], 15)
+
+    def test_deleted_actors_do_not_add_queries(self):
+        self.create_notifications(3)
+        Comment.objects.filter(article=self.article).delete()
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('notifications:notifications'))
+        comments = [notification for notification in json.loads(response.content)['data']['notifications']
+                    if notification['verb'] == 'comment']
+        self.assertEqual(len(comments), 3)
+        self.assertTrue(all(notification['actor'] is None for notification in comments))
+
+    def test_actors_and_targets_are_summaries(self):
+        self.create_notifications(1)
+        response = self.client.get(reverse('notifications:notifications'))
+        notifications = {notification['verb']: notification
+                         for notification in json.loads(response.content)['data']['notifications']}
+        follower = notifications['follow']['actor']
+        self.assertEqual(follower['type'], 'user')
+        self.assertIn('username', follower['data'])
+        article = notifications['article']['actor']
+        self.assertEqual(article['type'], 'article')
+        self.assertEqual(set(article['data']), {'slug', 'title'})
+        comment = notifications['comment']['actor']
+        self.assertEqual(comment['type'], 'comment')
+        self.assertEqual(comment['data']['body'], 'A comment')
+        self.assertEqual(comment['data']['author'], follower['data']['username'])
+        self.assertEqual(comment['data']['article'], self.article.slug)
+        self.assertEqual(notifications['comment']['target'], {
+            'type': 'article', 'data': {'slug': self.article.slug, 'title': self.article.title}})
@@ -7,7 +7,7 @@ from authors.apps.ah_notifications.serializers import NotificationSerializer
 from authors.apps.core.renderers import BaseJSONRenderer
 from rest_framework.views import APIView
 from authors.apps.authentication.models import User
-from authors.apps.core.mail_sender import send_email
+from authors.apps.core.jobs import send_email
 
 
 class NotificationAPIView(generics.ListAPIView, generics.DestroyAPIView):
@@ -18,8 +18,10 @@ class NotificationAPIView(generics.ListAPIView, generics.DestroyAPIView):
     def get(self, request, *args, **kwargs):
         notifications = self.notifications(request)
         serializer = self.serializer_class(notifications, many=True, context={'request': request})
+        data = serializer.data
 
-        return Response({"count": notifications.count(), "notifications": serializer.data})
+        # all the notifications are listed, they are counted without another query
+        return Response({"count": len(data), "notifications": data})
 
     def destroy(self, request, *args, **kwargs):
         notifications = self.notifications(request)
@@ -103,7 +105,7 @@ class SubscribeAPIView(APIView):
         data = {
             'username': request.user.username
         }
-        send_email(
+        send_email.delay(
             template='email_subscribe.html',
             data=data,
             to_email=request.user.email,
@@ -124,7 +126,7 @@ class SubscribeAPIView(APIView):
         data = {
             'username': request.user.username,
         }
-        send_email(
+        send_email.delay(
             template='unsubscribe_email.html',
             data=data,
             to_email=request.user.email,
@@ -0,0 +1,72 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def aggregate_subquery(model, field, aggregate):
+    """
+    Builds a subquery that aggregates the rows of model that point to the outer article
+    :param model: the related model
+    :param field: the name of the foreign key to the article
+    :param aggregate: the aggregate expression
+    :return:
+    """
+    rows = model.objects.filter(**{field: OuterRef('pk')}).order_by().values(field)
+    return Coalesce(Subquery(rows.annotate(value=aggregate).values('value'), output_field=IntegerField()), 0)
+
+
+def actual_counters(article_model):
+    """
+    Expressions that compute the real value of each counter on the article model
+    from the tables they are denormalized from. The model is passed in so that the
+    expressions can also be used with the historical models in migrations.
+    :param article_model:
+    :return: dict
+    """
+    meta = article_model._meta
+    likes = meta.get_field('likes').remote_field.through
+    dislikes = meta.get_field('dislikes').remote_field.through
+    ratings = meta.get_field('articleratings').related_model
+    comments = meta.get_field('comments').related_model
+    views = meta.get_field('article_views').related_model
+
+    counters = {
+        'like_count': aggregate_subquery(likes, 'article', Count('id')),
+        'dislike_count': aggregate_subquery(dislikes, 'article', Count('id')),
+        'rating_sum': aggregate_subquery(ratings, 'article', Sum('rating')),
+        'rating_count': aggregate_subquery(ratings, 'article', Count('id')),
+        'comment_count': aggregate_subquery(comments, 'article', Count('id')),
+        'view_count': aggregate_subquery(views, 'article', Count('id')),
+    }
+    for rating in range(1, 6):
+        counters['rating_{}_count'.format(rating)] = aggregate_subquery(
+            ratings, 'article', Count('id', filter=Q(rating=rating)))
+    return counters
+
+
+def drifted_articles(article_model):
+    """
+    Get the ids of the articles whose counters differ from the real values
+    :param article_model:
+    :return: QuerySet
+    """
+    counters = actual_counters(article_model)
+    annotations = {'actual_' + counter: expression for counter, expression in counters.items()}
+    drifted = Q()
+    for counter in counters:
+        drifted |= ~Q(**{counter: F('actual_' + counter)})
+
+    return article_model._base_manager.annotate(**annotations).filter(drifted).values_list('pk', flat=True)
+
+
+def reconcile_counters(article_model, batch_size=1000):
+    """
+    Recompute the counters of the articles that have drifted, in batches.
+    :param article_model:
+    :param batch_size:
+    :return: the number of articles that were repaired
+    """
+    ids = list(drifted_articles(article_model))
+    for start in range(0, len(ids), batch_size):
+        article_model._base_manager.filter(pk__in=ids[start:start + batch_size]).update(
+            **actual_counters(article_model))
+    return len(ids)
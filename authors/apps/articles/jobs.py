@@ -0,0 +1,85 @@
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+from notifications.models import Notification
+from rest_framework.reverse import reverse
+
+from authors.apps.ah_notifications.notifications import Verbs
+from authors.apps.articles.models import Article
+from authors.apps.authentication.models import User
+from authors.apps.core.jobs import RetryJob, job
+from authors.apps.core.mail_sender import send_mass_email
+
+# the number of followers handled at a time by the fan out
+FAN_OUT_CHUNK_SIZE = 500
+
+
+@job('articles.notify_followers')
+def notify_followers(article_id):
+    """
+    Notify the followers of the author that the article was published. The
+    notifications are inserted in chunks and the emails to the subscribed
+    followers are sent by a job per chunk.
+    :param article_id:
+    """
+    article = Article.objects.select_related('author').filter(pk=article_id).first()
+    if article is None:
+        return
+
+    followers = article.author.profile.followers().order_by('user_id').values_list('user_id', 'user__is_subscribed')
+    chunk = []
+    for follower in followers.iterator(chunk_size=FAN_OUT_CHUNK_SIZE):
+        chunk.append(follower)
+        if len(chunk) == FAN_OUT_CHUNK_SIZE:
+            notify_chunk(article, chunk)
+            chunk = []
+    if chunk:
+        notify_chunk(article, chunk)
+
+
+def notify_chunk(article, followers):
+    """
+    :param article:
+    :param followers: a list of (user id, is subscribed)
+    """
+    actor_type = ContentType.objects.get_for_model(article)
+    timestamp = timezone.now()
+    Notification.objects.bulk_create([
+        Notification(recipient_id=user_id, actor_content_type=actor_type, actor_object_id=article.pk,
+                     verb=Verbs.ARTICLE_CREATION, timestamp=timestamp,
+                     description="An article by an author you follow has been created")
+        for user_id, is_subscribed in followers
+    ])
+
+    subscribed = [user_id for user_id, is_subscribed in followers if is_subscribed]
+    if subscribed:
+        email_followers.delay(article_id=article.pk, user_ids=subscribed)
+
+
+@job('articles.email_followers')
+def email_followers(article_id, user_ids):
+    """
+    Email the subscribed followers about the article over a single connection.
+    Only the emails that could not be sent are retried.
+    :param article_id:
+    :param user_ids:
+    """
+    article = Article.objects.select_related('author').filter(pk=article_id).first()
+    if article is None:
+        return
+
+    users = {user.email: user for user in User.objects.filter(pk__in=user_ids, is_subscribed=True).only(
+        'pk', 'username', 'email')}
+    failed = send_mass_email('article_created.html', 'You have a new notification',
+                             [(email, article_created_data(article, user)) for email, user in users.items()])
+    if failed:
+        raise RetryJob('{} email(s) could not be sent.'.format(len(failed)),
+                       payload={'article_id': article_id, 'user_ids': [users[email].pk for email in failed]})
+
+
+def article_created_data(article, user):
+    return {
+        'username': user.username,
+        'article_title': article.title,
+        'author': article.author.username,
+        'unsubscribe_url': 'http://localhost:8000'+reverse('notifications:subscribe')
+    }
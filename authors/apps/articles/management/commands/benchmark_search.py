@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from authors.apps.articles.models import Article
+from authors.apps.articles.search import InMemorySearchBackend, PostgresSearchBackend
+
+
+def ilike_search(queryset, text):
+    """
+    The substring search of the rest framework search filter the search backends replaced
+    """
+    for term in text.split():
+        queryset = queryset.filter(
+            Q(title__icontains=term) | Q(description__icontains=term) | Q(body__icontains=term) |
+            Q(tags__tag__icontains=term) | Q(author__username__icontains=term))
+    return queryset.distinct()
+
+
+class Command(BaseCommand):
+    help = 'Compares how long the search backends and the substring search take to get a page of results'
+
+    def add_arguments(self, parser):
+        parser.add_argument('queries', nargs='+', help='The texts to search for')
+        parser.add_argument('--repeat', type=int, default=20, help='How many times to run each search')
+        parser.add_argument('--page-size', type=int, default=10)
+
+    def handle(self, *args, **options):
+        memory = InMemorySearchBackend()
+        started = time.perf_counter()
+        memory.get_index()
+        self.stdout.write('Loaded the in memory index of {} article(s) in {:.1f}ms'.format(
+            len(memory.index), (time.perf_counter() - started) * 1000))
+
+        searches = [
+            ('ilike', ilike_search),
+            ('postgres', PostgresSearchBackend().search),
+            ('memory', memory.search),
+        ]
+        for text in options['queries']:
+            for name, search in searches:
+                timings = []
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    queryset = search(Article.objects.all(), text)
+                    count = queryset.count()
+                    list(queryset.values_list('pk', flat=True)[:options['page_size']])
+                    timings.append((time.perf_counter() - started) * 1000)
+                timings.sort()
+                self.stdout.write('{:<20} {:<10} {:>6} result(s)  median {:8.2f}ms  max {:8.2f}ms'.format(
+                    text[:20], name, count, timings[len(timings) // 2], timings[-1]))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from authors.apps.articles.search import InMemorySearchBackend
+
+
+class Command(BaseCommand):
+    help = 'Builds the in memory search index from the articles and saves it to disk'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', help='Where to save the index, ARTICLE_SEARCH_INDEX_PATH by default')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='The number of articles to read in a single query')
+
+    def handle(self, *args, **options):
+        backend = InMemorySearchBackend(path=options['path'])
+        if not backend.path:
+            raise CommandError('Set ARTICLE_SEARCH_INDEX_PATH or pass --path.')
+
+        backend.batch_size = options['batch_size']
+        indexed = backend.rebuild()
+        backend.save()
+        self.stdout.write(self.style.SUCCESS('Indexed {} article(s) in {}.'.format(indexed, backend.path)))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from authors.apps.articles.counters import reconcile_counters
+from authors.apps.articles.models import Article, article_details, cached_articles
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the denormalized reaction, rating, comment and view counters of articles that have drifted'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='The number of articles to update in a single statement')
+
+    def handle(self, *args, **options):
+        repaired = reconcile_counters(Article, batch_size=options['batch_size'])
+        if repaired:
+            cached_articles.invalidate_all()
+            article_details.invalidate_all()
+        self.stdout.write(self.style.SUCCESS('Reconciled the counters of {} article(s).'.format(repaired)))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from authors.apps.articles.models import Comment
+from authors.apps.articles.threads import update_comment_paths
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the paths and depths of the comments, e.g. after comments were inserted in bulk'
+
+    def handle(self, *args, **options):
+        updated = update_comment_paths(Comment)
+        self.stdout.write(self.style.SUCCESS('Updated the paths of {} comment(s).'.format(updated)))
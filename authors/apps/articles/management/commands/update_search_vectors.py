@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from authors.apps.articles.models import Article
+from authors.apps.articles.search import update_search_vectors
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the full text search vectors of all the articles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='The number of articles to update in a single statement')
+
+    def handle(self, *args, **options):
+        updated = update_search_vectors(Article, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS('Updated the search vectors of {} article(s).'.format(updated)))
@@ -0,0 +1,59 @@
+import re
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+from notifications.models import Notification
+
+from authors.apps.ah_notifications.notifications import Verbs
+from authors.apps.authentication.models import User
+
+# an @ followed by a username, the @ of an email address is not a mention
+MENTION = re.compile(r'(?<![\w@])@([\w.+-]*\w)')
+
+
+def parse_mentions(body):
+    """
+    :param body: the body of a comment
+    :return: the usernames mentioned in the body, in the order they are first mentioned
+    """
+    return list(dict.fromkeys(MENTION.findall(body)))
+
+
+def notify_mentions(comment, author, mentions=None):
+    """
+    Notify the users mentioned in a comment once it is committed, if it is. The users
+    mentioned in its body are notified, and the ones listed in mentions, the
+    usernames that do not exist and the author are skipped.
+    :param comment:
+    :param author: the user who made the comment
+    :param mentions: usernames mentioned besides the ones in the body, as the clients used to send them
+    """
+    if isinstance(mentions, str):
+        mentions = [mentions]
+    elif not isinstance(mentions, (list, tuple)):
+        mentions = []
+    usernames = set(parse_mentions(comment.body)) | {mention for mention in mentions if isinstance(mention, str)}
+    usernames.discard(author.username)
+    if usernames:
+        transaction.on_commit(lambda: create_mention_notifications(comment, author, usernames))
+
+
+def create_mention_notifications(comment, author, usernames):
+    """
+    Resolve the usernames with a single query and insert the notifications of the
+    users with a single statement
+    :return: the number of notifications created
+    """
+    recipients = User.objects.filter(username__in=usernames, is_active=True).values_list('pk', flat=True)
+    actor_type = ContentType.objects.get_for_model(author)
+    target_type = ContentType.objects.get_for_model(comment.article)
+    timestamp = timezone.now()
+    notifications = Notification.objects.bulk_create([
+        Notification(recipient_id=recipient, actor_content_type=actor_type, actor_object_id=author.pk,
+                     verb=Verbs.COMMENT_MENTION, target_content_type=target_type,
+                     target_object_id=comment.article_id, timestamp=timestamp,
+                     description="{} mentioned you in a comment".format(author.username))
+        for recipient in recipients
+    ])
+    return len(notifications)
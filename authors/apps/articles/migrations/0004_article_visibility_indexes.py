@@ -0,0 +1,21 @@
+# Generated by Django 2.1.2 on 2026-10-18 01:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0003_article_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['published', 'deleted_at', '-created_at'], name='article_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['author', '-created_at'], name='article_author_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 2.1.2 on 2026-10-18 02:01
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+from authors.apps.articles.search import update_search_vectors
+
+
+def backfill_search_vectors(apps, schema_editor):
+    update_search_vectors(apps.get_model('articles', 'Article'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0004_article_visibility_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='article_search_idx'),
+        ),
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+    ]
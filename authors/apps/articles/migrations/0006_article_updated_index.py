@@ -0,0 +1,17 @@
+# Generated by Django 2.1.2 on 2026-10-18 02:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0005_article_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['updated_at'], name='article_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 2.1.2 on 2026-10-18 04:48
+
+from django.db import migrations, models
+
+from authors.apps.articles.threads import update_comment_paths
+
+
+def backfill_comment_paths(apps, schema_editor):
+    update_comment_paths(apps.get_model('articles', 'Comment'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0006_article_updated_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['path'], name='comment_path_idx'),
+        ),
+        migrations.RunPython(backfill_comment_paths, migrations.RunPython.noop),
+    ]
@@ -1,13 +1,116 @@
 import random
 import string
 
-from django.db import models
-from django.db.models.signals import pre_save
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import connection, models, transaction
+from django.db.models import Count, Exists, F, OuterRef, Q, Subquery
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
 from django.template.defaultfilters import slugify
+from django.utils import timezone
 from authors.apps.authentication.models import User
-from authors.apps.core.models import TimestampsMixin, SoftDeleteMixin
+from authors.apps.core.cache import ModelCache, Namespace
+from authors.apps.core.models import TimestampsMixin, SoftDeleteMixin, SoftDeleteManager
 from notifications.signals import notify
 from authors.apps.ah_notifications.notifications import Verbs
+from authors.apps.articles.search import get_search_backend, search_vector
+from authors.apps.articles.threads import comment_path, path_range
+
+
+class CountersMixin(models.Model):
+    """
+    This mixin adds denormalized counters to the article model so that reads do
+    not have to aggregate over the reactions, ratings, comments and views tables.
+    The counters are only ever changed with F() expressions to keep them
+    consistent under concurrent writes. Use the reconcile_article_counters
+    management command to repair counters that have drifted.
+    """
+    RATING_STARS = range(1, 6)
+
+    like_count = models.PositiveIntegerField(default=0)
+    dislike_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    # histogram of the ratings. A rating of 0 is allowed by the rating
+    # serializer, the number of such ratings is the remainder of rating_count.
+    rating_1_count = models.PositiveIntegerField(default=0)
+    rating_2_count = models.PositiveIntegerField(default=0)
+    rating_3_count = models.PositiveIntegerField(default=0)
+    rating_4_count = models.PositiveIntegerField(default=0)
+    rating_5_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    view_count = models.PositiveIntegerField(default=0)
+
+    @classmethod
+    def adjust_counters(cls, pk, **deltas):
+        """
+        Atomically add the deltas to the counters of the article with the primary key.
+        update() is used instead of save() so that updated_at and the slug are not touched.
+        Decrements never go below zero.
+        :param pk: the primary key of the article
+        :param deltas: the change for each counter, e.g. like_count=1
+        :return: the counters that were changed
+        """
+        deltas = {counter: delta for counter, delta in deltas.items() if delta}
+        if deltas:
+            cls._base_manager.filter(pk=pk).update(**{
+                counter: F(counter) + delta if delta > 0 else Greatest(F(counter) + delta, 0)
+                for counter, delta in deltas.items()
+            })
+            # update() does not send post_save
+            cached_articles.invalidate_on_commit(pk)
+            # the views and comments are not shown with the article
+            if set(deltas) - {'view_count', 'comment_count'}:
+                article_details.invalidate_on_commit(pk)
+        return list(deltas)
+
+    def update_counters(self, **deltas):
+        """
+        Atomically add the deltas to the counters and refresh them on this instance.
+        :param deltas: the change for each counter, e.g. like_count=1
+        """
+        changed = self.adjust_counters(self.pk, **deltas)
+        if changed:
+            self.refresh_from_db(fields=changed)
+
+    @staticmethod
+    def rating_bucket(rating):
+        return 'rating_{}_count'.format(rating) if rating in CountersMixin.RATING_STARS else None
+
+    def record_rating(self, previous, current):
+        """
+        Update the rating counters when a user's rating changes from previous to current.
+        None means that the user had not rated or has removed their rating.
+        :param previous: int
+        :param current: int
+        """
+        deltas = {
+            'rating_sum': (current or 0) - (previous or 0),
+            'rating_count': (current is not None) - (previous is not None),
+        }
+        for rating, delta in ((previous, -1), (current, 1)):
+            bucket = self.rating_bucket(rating)
+            if bucket is not None:
+                deltas[bucket] = deltas.get(bucket, 0) + delta
+        self.update_counters(**deltas)
+
+    @property
+    def average_rating(self):
+        return self.rating_sum / self.rating_count if self.rating_count else 0
+
+    @property
+    def rating_histogram(self):
+        """
+        The number of users that gave each rating, ratings without users are left out
+        """
+        histogram = {rating: getattr(self, self.rating_bucket(rating)) for rating in self.RATING_STARS}
+        histogram[0] = self.rating_count - sum(histogram.values())
+        return {rating: count for rating, count in histogram.items() if count}
+
+    class Meta:
+        abstract = True
 
 
 class ReactionMixin(models.Model):
@@ -19,6 +122,33 @@ class ReactionMixin(models.Model):
     dislikes = models.ManyToManyField(
         User, related_name='dislikes', blank=True)
 
+    def add_reaction(self, relation, user):
+        """
+        Adds the user to the reaction relation and increments its counter
+        if the user had not reacted yet.
+        :param relation: likes or dislikes
+        :param user:
+        """
+        manager = getattr(self, relation)
+        with transaction.atomic():
+            _, created = manager.through.objects.get_or_create(
+                **{manager.source_field_name: self, manager.target_field_name: user})
+            if created:
+                self.update_counters(**{relation[:-1] + '_count': 1})
+
+    def remove_reaction(self, relation, user):
+        """
+        Removes the user from the reaction relation and decrements its counter
+        if the user had reacted.
+        :param relation: likes or dislikes
+        :param user:
+        """
+        manager = getattr(self, relation)
+        with transaction.atomic():
+            deleted, _ = manager.through.objects.filter(
+                **{manager.source_field_name: self, manager.target_field_name: user}).delete()
+            self.update_counters(**{relation[:-1] + '_count': -deleted})
+
     def like(self, user):
         """
         Adds a like on the article for the user. Before
@@ -32,7 +162,7 @@ class ReactionMixin(models.Model):
                         description="{} just liked your article".format(user.username))
         self.un_dislike(user)
         # add like for the user
-        self.likes.add(user)
+        self.add_reaction('likes', user)
 
     def un_like(self, user):
         """
@@ -41,7 +171,7 @@ class ReactionMixin(models.Model):
         :param user:
         :return:
         """
-        self.likes.remove(user)
+        self.remove_reaction('likes', user)
 
     def dislike(self, user):
         """
@@ -55,7 +185,7 @@ class ReactionMixin(models.Model):
             notify.send(user, verb=Verbs.ARTICLE_DISLIKE, recipient=self.author,
                         description="{} just disliked your article".format(user.username))
         self.un_like(user)
-        self.dislikes.add(user)
+        self.add_reaction('dislikes', user)
 
     def un_dislike(self, user):
         """
@@ -64,16 +194,42 @@ class ReactionMixin(models.Model):
         :param user:
         :return:
         """
-        self.dislikes.remove(user)
+        self.remove_reaction('dislikes', user)
 
     class Meta:
         abstract = True
 
 
-class Article(TimestampsMixin, ReactionMixin, SoftDeleteMixin):
+class ArticleQuerySet(models.QuerySet):
+
+    def visible_to(self, user):
+        """
+        Filter the articles that the user can read. These are the published articles
+        and, for a logged in user, the articles they authored whether published or not.
+        This is a single WHERE clause so that the result can still be paginated,
+        ordered and have related objects prefetched.
+        :param user:
+        :return:
+        """
+        visible = Q(published=True)
+        if user is not None and user.is_authenticated:
+            visible |= Q(author=user)
+        return self.filter(visible)
+
+    def cached(self):
+        return self.defer('search_vector').prefetch_related('tags')
+
+
+ArticleManager = SoftDeleteManager.from_queryset(ArticleQuerySet)
+
+
+class Article(TimestampsMixin, ReactionMixin, CountersMixin, SoftDeleteMixin):
     """
     Model for an article, extends a base model since the created and updated times are required
     """
+    objects = ArticleManager()
+    objects_with_deleted = ArticleManager(deleted=True)
+
     slug = models.SlugField(max_length=255, unique=True, db_index=True)
     title = models.CharField(max_length=255)
     description = models.TextField()
@@ -91,6 +247,38 @@ class Article(TimestampsMixin, ReactionMixin, SoftDeleteMixin):
         related_name='articles',
     )
     published = models.BooleanField(default=False)
+    # the weighted full text search document, maintained by update_search_vector
+    # while the postgres search backend is in use
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta(TimestampsMixin.Meta):
+        indexes = [
+            GinIndex(fields=['search_vector'], name='article_search_idx'),
+            # the listing of published articles, newest first
+            models.Index(fields=['published', 'deleted_at', '-created_at'], name='article_published_idx'),
+            # the listing of an author's own articles, newest first
+            models.Index(fields=['author', '-created_at'], name='article_author_idx'),
+            # lets the in memory search index pick up the articles changed by other processes
+            models.Index(fields=['updated_at'], name='article_updated_idx'),
+        ]
+
+    # whether the article was published when it was loaded, None when the field was
+    # deferred. The followers are notified when an article gets published
+    was_published = False
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.was_published = instance.__dict__.get('published')
+        return instance
+
+    def is_visible_to(self, user):
+        """
+        Whether the user can read the article, see ArticleQuerySet.visible_to
+        :param user:
+        :return: bool
+        """
+        return self.published or (user is not None and user.is_authenticated and self.author_id == user.id)
 
     @staticmethod
     def pre_save(sender, instance, *args, **kwargs):
@@ -104,6 +292,43 @@ class Article(TimestampsMixin, ReactionMixin, SoftDeleteMixin):
                 instance.slug = instance.slug[:250]
                 instance.slug = instance.slug + '-' + unique
 
+    def update_search_vector(self):
+        """
+        Recompute the search document from the article, its tags and its author
+        """
+        Article._base_manager.filter(pk=self.pk).update(search_vector=search_vector(Article))
+
+    @staticmethod
+    def post_save(sender, instance, *args, **kwargs):
+        # soft deleted articles are saved too, the backend removes them
+        get_search_backend().update(instance)
+        article_details.invalidate_on_commit(instance.pk)
+
+    @staticmethod
+    def post_delete(sender, instance, *args, **kwargs):
+        get_search_backend().remove(instance)
+        article_details.invalidate_on_commit(instance.pk)
+
+    @staticmethod
+    def tags_changed(sender, instance, action, reverse, pk_set, *args, **kwargs):
+        if action not in ('post_add', 'post_remove', 'post_clear'):
+            return
+        # when the change is made from the tag side the instance is the tag
+        articles = Article._base_manager.filter(pk__in=pk_set or []) if reverse else [instance]
+        # the tags are part of the article, the conditional requests rely on updated_at
+        Article._base_manager.filter(pk__in=[article.pk for article in articles]).update(updated_at=timezone.now())
+        for article in articles:
+            get_search_backend().update(article)
+            cached_articles.invalidate_on_commit(article.pk)
+            article_details.invalidate_on_commit(article.pk)
+
+    @staticmethod
+    def author_changed(sender, instance, *args, **kwargs):
+        # the profile of the author, with their username, is shown with their articles
+        author_id = getattr(instance, 'user_id', instance.pk)
+        for pk in Article._base_manager.filter(author_id=author_id).values_list('pk', flat=True):
+            article_details.invalidate_on_commit(pk)
+
     def __str__(self):
         """
         Use the Article title to represent this object
@@ -112,6 +337,12 @@ class Article(TimestampsMixin, ReactionMixin, SoftDeleteMixin):
         return self.title
 
 
+# the articles that are not deleted by primary key, with their tags
+cached_articles = ModelCache(Article, Article.objects.cached())
+# the part of the rendered article detail that is the same for every reader, by primary key
+article_details = Namespace('articles.article:detail')
+
+
 class Tag(TimestampsMixin):
     """
     Every article contains a tag
@@ -131,10 +362,20 @@ class Tag(TimestampsMixin):
         if not Tag.objects.filter(slug=self.slug).first():
             super().save(*args, **kwargs)
 
+    @staticmethod
+    def clear_cache(sender, instance, *args, **kwargs):
+        cached_tags.invalidate_all()
+
     def __str__(self):
         return self.tag
 
 
+# the list of all the tags
+cached_tags = Namespace('articles.tag:list')
+post_save.connect(Tag.clear_cache, Tag, dispatch_uid="authors.apps.articles.models.Tag")
+post_delete.connect(Tag.clear_cache, Tag, dispatch_uid="authors.apps.articles.models.Tag")
+
+
 class ArticleRating(models.Model):
     """
     Ratings that users give Articles
@@ -150,12 +391,71 @@ pre_save.connect(
     Article.pre_save,
     Article,
     dispatch_uid="authors.apps.articles.models.Article")
+post_save.connect(Article.post_save, Article, dispatch_uid="authors.apps.articles.models.Article")
+post_delete.connect(Article.post_delete, Article, dispatch_uid="authors.apps.articles.models.Article")
+m2m_changed.connect(Article.tags_changed, Article.tags.through, dispatch_uid="authors.apps.articles.models.Article")
+post_save.connect(Article.author_changed, User, dispatch_uid="authors.apps.articles.models.Article")
+post_save.connect(Article.author_changed, 'profiles.Profile', dispatch_uid="authors.apps.articles.models.Article")
+
+
+class CommentQuerySet(models.QuerySet):
+
+    def with_reactions(self, user):
+        """
+        Annotate the comments with their like_count and dislike_count, and with
+        liked_by_me and disliked_by_me for the user, and join their authors. A page
+        of comments is then read in a single query however long it is.
+        :param user: the user reading the comments, can be anonymous
+        :return:
+        """
+        user_id = user.id if user is not None and user.is_authenticated else None
+        annotations = {}
+        for reaction, by_me in (('like', 'liked_by_me'), ('dislike', 'disliked_by_me')):
+            reactions = getattr(self.model, reaction + 's').through.objects.filter(comment_id=OuterRef('pk'))
+            counts = reactions.order_by().values('comment_id').annotate(count=Count('id')).values('count')
+            annotations[reaction + '_count'] = Coalesce(Subquery(counts, output_field=models.IntegerField()), 0)
+            annotations[by_me] = Exists(reactions.filter(user_id=user_id))
+        return self.select_related('author__user').annotate(**annotations)
+
+    def subtrees(self, roots, depth=None):
+        """
+        Filter the comments in the threads of the roots, the roots included, found with
+        a single recursive query
+        :param roots: list of comment ids
+        :param depth: the number of levels of replies to include, all of them by default
+        :return:
+        """
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        params = [list(roots)]
+        limit = ''
+        if depth is not None:
+            limit = 'WHERE tree.depth < %s'
+            params.append(depth)
+        return self.filter(pk__in=RawSQL(
+            'WITH RECURSIVE tree (id, depth) AS ('
+            'SELECT id, 0 FROM {table} WHERE id = ANY(%s) '
+            'UNION ALL '
+            'SELECT reply.id, tree.depth + 1 FROM {table} reply JOIN tree ON reply.parent_id = tree.id {limit}'
+            ') SELECT id FROM tree'.format(table=table, limit=limit), params))
+
+    def under(self, comment, include_self=False):
+        """
+        Filter the replies under the comment at any depth, a range of the index on the
+        path. Order them by path to list them depth first.
+        :param comment:
+        :param include_self: whether to include the comment too
+        :return:
+        """
+        start, end = path_range(comment.path)
+        return self.filter(**{'path__gte' if include_self else 'path__gt': start, 'path__lt': end})
 
 
 class Comment(TimestampsMixin):
     """
     Represent model for an comment
     """
+    objects = CommentQuerySet.as_manager()
+
     # Bound comment to article class
     article = models.ForeignKey(
         Article, on_delete=models.CASCADE, related_name='comments')
@@ -177,9 +477,60 @@ class Comment(TimestampsMixin):
         User, related_name='comment_likes', blank=True)
     dislikes = models.ManyToManyField(
         User, related_name='comment_dislikes', blank=True)
+    # the ids of the ancestors of the comment followed by its own, see threads.py
+    path = models.TextField(default='', editable=False)
+    # the number of ancestors of the comment
+    depth = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta(TimestampsMixin.Meta):
+        indexes = [
+            # the replies under a comment, depth first
+            models.Index(fields=['path'], name='comment_path_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        """
+        The path of a new comment is computed once its id is known, in the same transaction
+        """
+        if self.pk is not None:
+            return super().save(*args, **kwargs)
+        with transaction.atomic():
+            self.depth = self.parent.depth + 1 if self.parent is not None else 0
+            super().save(*args, **kwargs)
+            self.path = comment_path(self.pk, self.parent)
+            Comment.objects.filter(pk=self.pk).update(path=self.path)
+
+    def delete_thread(self):
+        """
+        Delete the comment and the replies under it with range deletes on their paths,
+        instead of collecting the replies level by level and deleting them one by one
+        :return: the number of comments deleted
+        """
+        thread = Comment.objects.under(self, include_self=True)
+        with transaction.atomic():
+            for reactions in (Comment.likes.through, Comment.dislikes.through):
+                reactions.objects.filter(comment__in=thread).delete()
+            with connection.cursor() as cursor:
+                cursor.execute('DELETE FROM {} WHERE path >= %s AND path < %s'.format(
+                    connection.ops.quote_name(Comment._meta.db_table)), path_range(self.path))
+                deleted = cursor.rowcount
+            Article.adjust_counters(self.article_id, comment_count=-deleted)
+        return deleted
+
+    @staticmethod
+    def post_save(sender, instance, created, *args, **kwargs):
+        # keep the comment count of the article in sync
+        if created:
+            Article.adjust_counters(instance.article_id, comment_count=1)
+
+    @staticmethod
+    def post_delete(sender, instance, *args, **kwargs):
+        Article.adjust_counters(instance.article_id, comment_count=-1)
 
 
 pre_save.connect(Article.pre_save, Article, dispatch_uid="authors.apps.articles.models.Article")
+post_save.connect(Comment.post_save, Comment, dispatch_uid="authors.apps.articles.models.Comment")
+post_delete.connect(Comment.post_delete, Comment, dispatch_uid="authors.apps.articles.models.Comment")
 
 
 class FavouriteArticle(TimestampsMixin):
@@ -197,6 +548,15 @@ class ArticleView(models.Model):
     user = models.ForeignKey(User, related_name="article_views", on_delete=models.CASCADE)
     article = models.ForeignKey(Article, related_name="article_views", on_delete=models.CASCADE)
 
+    @staticmethod
+    def post_save(sender, instance, created, *args, **kwargs):
+        # keep the view count of the article in sync
+        if created:
+            Article.adjust_counters(instance.article_id, view_count=1)
+
+
+post_save.connect(ArticleView.post_save, ArticleView, dispatch_uid="authors.apps.articles.models.ArticleView")
+
 
 class Violation(TimestampsMixin):
     spam = 'spam'
@@ -1,5 +1,13 @@
-from rest_framework.pagination import PageNumberPagination
+import binascii
+import json
+from base64 import b64decode, b64encode
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class StandardResultsSetPagination(PageNumberPagination):
@@ -36,3 +44,138 @@ class StandardResultsSetPagination(PageNumberPagination):
             'total_pages': self.page.paginator.num_pages,
             'results': data
         })
+
+
+class KeysetPagination(BasePagination):
+    """
+    A cursor style that pages through the results keyed on (created_at, id),
+    the ordering given by the TimestampsMixin. A page is fetched with an indexed
+    range condition instead of an OFFSET, so deep pages cost the same as the first.
+    The cursors are opaque and the total count is only computed if requested.
+    `example usage`
+    http://localhost:8000/api/articles/?cursor=
+    http://localhost:8000/api/articles/?cursor=<next cursor>&page_size=5&count=true
+    """
+    page_size = StandardResultsSetPagination.page_size
+    page_size_query_param = StandardResultsSetPagination.page_size_query_param
+    max_page_size = StandardResultsSetPagination.max_page_size
+
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor'
+
+    ordering = ('-created_at', '-id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+
+        self.count = None
+        if request.query_params.get(self.count_query_param, '').lower() in ('1', 'true'):
+            self.count = queryset.count()
+
+        if position is None:
+            queryset = queryset.order_by(*self.ordering)
+        else:
+            created_at, pk = position
+            if reverse:
+                after = Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+                queryset = queryset.filter(after).order_by('created_at', 'id')
+            else:
+                before = Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+                queryset = queryset.filter(before).order_by(*self.ordering)
+
+        # fetch an extra item to find out whether there are more items
+        results = list(queryset[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def decode_cursor(self, request):
+        """
+        Get the position and the direction from the cursor query parameter
+        :param request:
+        :return: ((created_at, id), reverse) or (None, False) for the first page
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            cursor = json.loads(b64decode(encoded.encode('ascii'), altchars=b'-_').decode('utf-8'))
+            created_at = parse_datetime(cursor['c'])
+            if created_at is None:
+                raise ValueError
+            return (created_at, int(cursor['i'])), bool(cursor.get('r'))
+        except (TypeError, ValueError, KeyError, binascii.Error, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, item, reverse):
+        cursor = {'c': item.created_at.isoformat(), 'i': item.id}
+        if reverse:
+            cursor['r'] = 1
+        encoded = b64encode(json.dumps(cursor).encode('utf-8'), altchars=b'-_').decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        response = {
+            'links': {
+                'next': self.get_next_link(),
+                'previous': self.get_previous_link()
+            },
+            'results': data
+        }
+        if self.count is not None:
+            response['count'] = self.count
+        return Response(response)
+
+
+class FeedPagination(StandardResultsSetPagination):
+    """
+    Page numbers by default. Clients opt in to the keyset pagination by passing
+    the cursor query parameter, empty for the first page.
+    `example usage`
+    http://localhost:8000/api/articles/?page=3
+    http://localhost:8000/api/articles/?cursor=
+    """
+
+    keyset = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if KeysetPagination.cursor_query_param in request.query_params:
+            self.keyset = KeysetPagination()
+            return self.keyset.paginate_queryset(queryset, request, view=view)
+        return super().paginate_queryset(queryset, request, view=view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
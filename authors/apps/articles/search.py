@@ -0,0 +1,409 @@
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import Case, F, Func, IntegerField, OuterRef, Subquery, TextField, Value, When
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.module_loading import import_string
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+
+from authors.apps.articles.search_index import InvertedIndex, highlight, tokenize
+
+# The simple configuration does not drop stop words or stem, this keeps the search
+# close to the substring matching it replaces. Prefix matching makes up for the stemming.
+SEARCH_CONFIG = 'simple'
+
+HIGHLIGHT_OPTIONS = 'StartSel=<mark>, StopSel=</mark>, MinWords=15, MaxWords=35, MaxFragments=2'
+
+
+def search_vector(article_model):
+    """
+    Builds the weighted search document of an article. The title is weighted the
+    highest followed by the tags and the author, the description then the body.
+    Tags and the author are read with subqueries so the expression can be used to
+    update many articles in a single statement. The model is passed in so that this
+    can also be used with the historical models in migrations.
+    :param article_model:
+    :return:
+    """
+    tag_model = article_model._meta.get_field('tags').related_model
+    user_model = article_model._meta.get_field('author').related_model
+
+    tags = tag_model._base_manager.filter(articles=OuterRef('pk')).order_by().values('articles').annotate(
+        names=StringAgg('tag', ' ')).values('names')
+    author = user_model._base_manager.filter(pk=OuterRef('author_id')).values('username')[:1]
+
+    def weighted(expression, weight):
+        return SearchVector(expression, weight=weight, config=SEARCH_CONFIG)
+
+    return (weighted('title', 'A') +
+            weighted(Subquery(tags, output_field=TextField()), 'B') +
+            weighted(Subquery(author, output_field=TextField()), 'B') +
+            weighted('description', 'C') +
+            weighted('body', 'D'))
+
+
+def update_search_vectors(article_model, queryset=None, batch_size=1000):
+    """
+    Recompute the search vectors of the articles in batches
+    :param article_model:
+    :param queryset: the articles to update, all articles by default
+    :param batch_size:
+    :return: the number of articles updated
+    """
+    if queryset is None:
+        queryset = article_model._base_manager.all()
+    ids = list(queryset.order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(ids), batch_size):
+        article_model._base_manager.filter(pk__in=ids[start:start + batch_size]).update(
+            search_vector=search_vector(article_model))
+    return len(ids)
+
+
+class PrefixSearchQuery(SearchQuery):
+    """
+    Matches the documents that contain a word starting with every term of the search,
+    e.g. "drag trai" matches "How to train your dragon".
+    """
+
+    @classmethod
+    def from_text(cls, text):
+        """
+        Builds the query from what the user typed, None if there are no terms
+        :param text:
+        :return:
+        """
+        terms = tokenize(text)
+        if not terms:
+            return None
+        return cls(' & '.join('{}:*'.format(term) for term in terms), config=SEARCH_CONFIG)
+
+    def as_sql(self, compiler, connection):
+        # the terms are already sanitized, parse them as a tsquery instead of plain text
+        sql, params = super().as_sql(compiler, connection)
+        return sql.replace('plainto_tsquery', 'to_tsquery', 1), params
+
+
+class SearchHeadline(Func):
+    """
+    Highlights the parts of the text that match the search query
+    """
+    function = 'ts_headline'
+    template = "%(function)s('{}'::regconfig, %(expressions)s)".format(SEARCH_CONFIG)
+    output_field = TextField()
+
+    def __init__(self, expression, query, options=HIGHLIGHT_OPTIONS):
+        super().__init__(expression, query, Value(options))
+
+
+def get_search_backend():
+    """
+    Get the search backend configured with the ARTICLE_SEARCH_BACKEND setting.
+    Backends are created once per process since they may hold an index in memory.
+    :return: SearchBackend
+    """
+    path = settings.ARTICLE_SEARCH_BACKEND
+    with _backends_lock:
+        if path not in _backends:
+            _backends[path] = import_string(path)()
+        return _backends[path]
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+class SearchBackend:
+    """
+    Searches the articles. The article model lets the backend know about the
+    articles that change through the update and remove hooks.
+    """
+
+    def search(self, queryset, text):
+        """
+        Filter the articles down to the ones that match the text, best matches first.
+        All the articles are returned if the text does not contain any words.
+        :param queryset:
+        :param text:
+        :return: QuerySet
+        """
+        raise NotImplementedError
+
+    def highlight(self, articles, text):
+        """
+        Set the highlight attribute of the articles to the fragment of their
+        body that matches the text
+        :param articles:
+        :param text:
+        """
+        raise NotImplementedError
+
+    def prepare(self):
+        """
+        Called when a web process starts, before it serves its first request
+        """
+
+    def update(self, article):
+        """
+        Called after an article, its tags or its author were saved
+        :param article:
+        """
+
+    def remove(self, article):
+        """
+        Called after an article was deleted from the database
+        :param article:
+        """
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    Full text search using the weighted search vector stored on the articles.
+    The vectors are only maintained while this backend is in use, run the
+    update_search_vectors command after switching to it.
+    """
+
+    def search(self, queryset, text):
+        query = PrefixSearchQuery.from_text(text)
+        if query is None:
+            return queryset
+        return queryset.filter(search_vector=query).annotate(
+            rank=SearchRank(F('search_vector'), query)).order_by('-rank', '-created_at', '-id')
+
+    def highlight(self, articles, text):
+        # a single query computes the fragments of the whole page
+        query = PrefixSearchQuery.from_text(text)
+        if query is None or not articles:
+            return
+        highlights = dict(type(articles[0])._base_manager.filter(pk__in=[article.pk for article in articles]).annotate(
+            highlight=SearchHeadline('body', query)).values_list('pk', 'highlight'))
+        for article in articles:
+            article.highlight = highlights.get(article.pk)
+
+    def update(self, article):
+        article.update_search_vector()
+
+
+def article_documents(article_model, ids):
+    """
+    Read the searchable fields of the articles with two queries
+    :param article_model:
+    :param ids:
+    :return: a generator of (id, deleted_at, fields)
+    """
+    tags = defaultdict(list)
+    through = article_model._meta.get_field('tags').remote_field.through
+    for article_id, tag in through.objects.filter(article_id__in=ids).values_list('article_id', 'tag__tag'):
+        tags[article_id].append(tag)
+
+    rows = article_model._base_manager.filter(pk__in=ids).values_list(
+        'pk', 'deleted_at', 'title', 'description', 'body', 'author__username')
+    for pk, deleted_at, title, description, body, author in rows:
+        yield pk, deleted_at, {
+            'title': title,
+            'tags': ' '.join(tags[pk]),
+            'author': author,
+            'description': description,
+            'body': body,
+        }
+
+
+class InMemorySearchBackend(SearchBackend):
+    """
+    Searches an inverted index of the articles held in memory, see InvertedIndex.
+
+    The index is loaded from ARTICLE_SEARCH_INDEX_PATH, or built from the database
+    when there is no saved index, when a gunicorn process starts, see prepare and the
+    hooks of authors/gunicorn_config.py. With the application preloaded this happens
+    once, before the workers are forked, otherwise each worker does it and has to
+    finish within the timeout. Other servers load it on the first search. Each
+    process holds a copy of the index, use the postgres backend when the articles
+    do not fit in the memory of every process. The articles saved in this process
+    are indexed right away, the ones saved by other processes are picked up from
+    their updated_at at most every ARTICLE_SEARCH_SYNC_INTERVAL seconds.
+
+    A search returns at most max_results articles, the best matches among the ones
+    the queryset lets through. The count and the pages of a broader search stop there.
+    """
+    # the number of ranked results passed on to the database
+    max_results = 1000
+    batch_size = 1000
+    # how far back to look when syncing, covers saves that were in flight during the last sync
+    sync_overlap = timedelta(seconds=5)
+
+    def __init__(self, path=None):
+        self.path = path or settings.ARTICLE_SEARCH_INDEX_PATH
+        self.index = None
+        self.synced_at = None
+        self.checked_at = 0
+        self.lock = threading.RLock()
+
+    @property
+    def article_model(self):
+        return apps.get_model('articles', 'Article')
+
+    def prepare(self):
+        self.get_index()
+
+    def get_index(self):
+        """
+        Get the index, loading or syncing it first when needed
+        :return: InvertedIndex
+        """
+        with self.lock:
+            if self.index is None:
+                self.load()
+            elif time.monotonic() - self.checked_at >= settings.ARTICLE_SEARCH_SYNC_INTERVAL:
+                self.sync()
+            return self.index
+
+    def load(self):
+        """
+        Load the index saved at the configured path and bring it up to date,
+        or build it when there is none
+        """
+        if not self.path or not os.path.exists(self.path):
+            self.rebuild()
+            return
+        index, data = InvertedIndex.load(self.path)
+        with self.lock:
+            self.index = index
+            self.synced_at = parse_datetime(data['synced_at'])
+            self.sync()
+
+    def save(self, path=None):
+        """
+        Save the index so that it can be loaded by other processes
+        :param path: the configured path by default
+        """
+        index = self.get_index()
+        index.save(path or self.path, synced_at=self.synced_at.isoformat())
+
+    def rebuild(self):
+        """
+        Build the index from all the articles that are not deleted
+        :return: the number of articles indexed
+        """
+        index = InvertedIndex()
+        synced_at = timezone.now()
+        ids = list(self.article_model.objects.order_by('pk').values_list('pk', flat=True))
+        for start in range(0, len(ids), self.batch_size):
+            for pk, deleted_at, fields in article_documents(self.article_model, ids[start:start + self.batch_size]):
+                index.add(pk, fields)
+        with self.lock:
+            self.index = index
+            self.synced_at = synced_at
+            self.checked_at = time.monotonic()
+        return len(index)
+
+    def sync(self):
+        """
+        Index the articles that were saved since the last sync
+        """
+        synced_at = timezone.now()
+        ids = list(self.article_model._base_manager.filter(
+            updated_at__gte=self.synced_at - self.sync_overlap).values_list('pk', flat=True))
+        self.index_articles(ids)
+        self.synced_at = synced_at
+        self.checked_at = time.monotonic()
+
+    def index_articles(self, ids):
+        indexed = set()
+        for pk, deleted_at, fields in article_documents(self.article_model, ids):
+            if deleted_at is None:
+                self.index.add(pk, fields)
+            else:
+                self.index.remove(pk)
+            indexed.add(pk)
+        # the articles that are gone were hard deleted
+        for pk in set(ids) - indexed:
+            self.index.remove(pk)
+
+    def search(self, queryset, text):
+        if not tokenize(text):
+            return queryset
+        ids = self.visible_ids(queryset, [pk for pk, score in self.get_index().search(text)])
+        if not ids:
+            return queryset.none()
+        rank = Case(*[When(pk=pk, then=Value(position)) for position, pk in enumerate(ids)],
+                    output_field=IntegerField())
+        return queryset.filter(pk__in=ids).annotate(rank=rank).order_by('rank')
+
+    def visible_ids(self, queryset, ranked_ids):
+        """
+        Get the first max_results of the ranked articles that are in the queryset, e.g.
+        that are published, checking them a batch at a time
+        :param queryset:
+        :param ranked_ids: the ids of the articles that match, best matches first
+        :return: list
+        """
+        ids = []
+        for start in range(0, len(ranked_ids), self.max_results):
+            batch = ranked_ids[start:start + self.max_results]
+            visible = set(queryset.filter(pk__in=batch).values_list('pk', flat=True))
+            ids.extend(pk for pk in batch if pk in visible)
+            if len(ids) >= self.max_results:
+                break
+        return ids[:self.max_results]
+
+    def highlight(self, articles, text):
+        terms = tokenize(text)
+        if not terms:
+            return
+        for article in articles:
+            article.highlight = highlight(article.body, terms)
+
+    def update(self, article):
+        # an index that is not loaded yet will read the article when it is
+        with self.lock:
+            if self.index is not None:
+                self.index_articles([article.pk])
+
+    def remove(self, article):
+        with self.lock:
+            if self.index is not None:
+                self.index.remove(article.pk)
+
+
+class ArticleSearchFilter(BaseFilterBackend):
+    """
+    Filters the articles using the configured search backend and ranks the results.
+    Uses the same query parameter as the rest framework search filter.
+    """
+    search_param = api_settings.SEARCH_PARAM
+
+    def get_search_text(self, request):
+        return request.query_params.get(self.search_param, '')
+
+    def filter_queryset(self, request, queryset, view):
+        return get_search_backend().search(queryset, self.get_search_text(request))
+
+    def highlight(self, request, articles):
+        """
+        Attach the highlighted fragments of the body to a page of articles.
+        This is done after pagination so that the fragments are only computed
+        for the articles being returned.
+        :param request:
+        :param articles:
+        """
+        get_search_backend().highlight(articles, self.get_search_text(request))
+
+    def get_schema_fields(self, view):
+        import coreapi
+        import coreschema
+        return [
+            coreapi.Field(
+                name=self.search_param,
+                required=False,
+                location='query',
+                schema=coreschema.String(title='Search', description='Words to search the articles for.')
+            )
+        ]
@@ -0,0 +1,221 @@
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+from bisect import bisect_left
+from collections import Counter
+
+TERM_PATTERN = re.compile(r'[^\W_]+')
+
+# how much a word counts towards the score depending on where it appears
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'tags': 2.0,
+    'author': 2.0,
+    'description': 1.5,
+    'body': 1.0,
+}
+
+
+def tokenize(text):
+    """
+    Split the text into lower case words
+    :param text:
+    :return: list
+    """
+    return TERM_PATTERN.findall((text or '').lower())
+
+
+def highlight(text, terms, size=35, start='<mark>', stop='</mark>'):
+    """
+    Get a fragment of the text around the first word that matches one of
+    the terms, with every matching word marked.
+    :param text:
+    :param terms: the prefixes to mark
+    :param size: the number of words in the fragment
+    :return: str
+    """
+    words = (text or '').split()
+
+    def matches(word):
+        return any(token.startswith(term) for token in tokenize(word) for term in terms)
+
+    first = next((i for i, word in enumerate(words) if matches(word)), 0)
+    begin = max(0, first - size // 3)
+    fragment = words[begin:begin + size]
+    return ' '.join(start + word + stop if matches(word) else word for word in fragment)
+
+
+class InvertedIndex:
+    """
+    An in memory inverted index over documents made up of weighted fields,
+    scored with Okapi BM25. Every term of a query is matched as a prefix and
+    all the terms of the query have to match for a document to be returned.
+    Documents can be added, replaced and removed incrementally.
+    """
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        # term -> {document id -> weighted term frequency}
+        self.postings = {}
+        # document id -> {term -> weighted term frequency}
+        self.documents = {}
+        # document id -> sum of the weighted term frequencies
+        self.lengths = {}
+        # the sorted terms, to look up the terms that start with a prefix, sorted
+        # again from the postings the first time they are needed after a change
+        self.sorted_terms = []
+        self.total_length = 0.0
+
+    @property
+    def terms(self):
+        """
+        The indexed terms, sorted
+        """
+        with self.lock:
+            if self.sorted_terms is None:
+                self.sorted_terms = sorted(self.postings)
+            return self.sorted_terms
+
+    def __len__(self):
+        return len(self.documents)
+
+    def __contains__(self, doc_id):
+        return doc_id in self.documents
+
+    @staticmethod
+    def analyze(fields):
+        """
+        Get the weighted frequency of each term in the fields of a document
+        :param fields: {field name: text}
+        :return: dict
+        """
+        frequencies = Counter()
+        for field, text in fields.items():
+            weight = FIELD_WEIGHTS.get(field, 1.0)
+            for term in tokenize(text):
+                frequencies[term] += weight
+        return dict(frequencies)
+
+    def add(self, doc_id, fields):
+        """
+        Index a document, replacing it if it is already indexed
+        :param doc_id:
+        :param fields: {field name: text}
+        """
+        self.add_terms(doc_id, self.analyze(fields))
+
+    def add_terms(self, doc_id, frequencies):
+        with self.lock:
+            self.remove(doc_id)
+            self.documents[doc_id] = frequencies
+            self.lengths[doc_id] = sum(frequencies.values())
+            self.total_length += self.lengths[doc_id]
+            for term, frequency in frequencies.items():
+                if term not in self.postings:
+                    self.postings[term] = {}
+                    self.sorted_terms = None
+                self.postings[term][doc_id] = frequency
+
+    def remove(self, doc_id):
+        with self.lock:
+            frequencies = self.documents.pop(doc_id, None)
+            if frequencies is None:
+                return
+            self.total_length -= self.lengths.pop(doc_id)
+            for term in frequencies:
+                postings = self.postings[term]
+                del postings[doc_id]
+                if not postings:
+                    del self.postings[term]
+                    self.sorted_terms = None
+
+    def expand(self, prefix):
+        """
+        Get the indexed terms that start with the prefix
+        """
+        terms = self.terms
+        start = bisect_left(terms, prefix)
+        end = start
+        while end < len(terms) and terms[end].startswith(prefix):
+            end += 1
+        return terms[start:end]
+
+    def score(self, prefix, average_length):
+        """
+        Score the documents that contain a term starting with the prefix
+        :param prefix:
+        :param average_length: the average length of the documents
+        :return: Counter
+        """
+        count = len(self.documents)
+        scores = Counter()
+        for term in self.expand(prefix):
+            postings = self.postings[term]
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequency in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[doc_id] / average_length)
+                scores[doc_id] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return scores
+
+    def search(self, text):
+        """
+        Find the documents that match all the words of the text
+        :param text:
+        :return: a list of (document id, score) with the best matches first
+        """
+        query = tokenize(text)
+        with self.lock:
+            if not query or not self.documents:
+                return []
+            average_length = self.total_length / len(self.documents)
+
+            scores = self.score(query[0], average_length)
+            for prefix in query[1:]:
+                if not scores:
+                    break
+                term_scores = self.score(prefix, average_length)
+                scores = {doc_id: score + term_scores[doc_id]
+                          for doc_id, score in scores.items() if doc_id in term_scores}
+
+        return sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+
+    def to_dict(self):
+        with self.lock:
+            return {'version': 1, 'documents': {str(doc_id): terms for doc_id, terms in self.documents.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        index = cls()
+        for doc_id, frequencies in data['documents'].items():
+            index.add_terms(int(doc_id), frequencies)
+        return index
+
+    def save(self, path, **extra):
+        """
+        Write the index to a file. The file is replaced atomically so that
+        readers never see a partially written index.
+        :param path:
+        :param extra: other values to store alongside the index
+        """
+        data = self.to_dict()
+        data.update(extra)
+        directory = os.path.dirname(os.path.abspath(path))
+        with tempfile.NamedTemporaryFile('w', dir=directory, delete=False) as file:
+            json.dump(data, file)
+        os.replace(file.name, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read an index written with save
+        :param path:
+        :return: the index and the data that was stored with it
+        """
+        with open(path) as file:
+            data = json.load(file)
+        return cls.from_dict(data), data
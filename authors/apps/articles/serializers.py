@@ -1,16 +1,16 @@
 from django.contrib.auth.models import AnonymousUser
+from django.db.models import Count, Q, prefetch_related_objects
 from django.utils.text import slugify
 from rest_framework import serializers
 from rest_framework.exceptions import NotFound
 from rest_framework.validators import UniqueTogetherValidator
 
-from authors.apps.profiles.models import Profile
+from authors.apps.profiles.models import Profile, cached_profiles
 from authors.apps.profiles.serializers import ProfileSerializer
 from django.db import models
-from authors.apps.articles.models import Article, Tag, ArticleRating, Comment, FavouriteArticle, ArticleView, Violation
+from authors.apps.articles.models import Article, Tag, ArticleRating, Comment, FavouriteArticle, Violation
 from authors.apps.authentication.models import User
 from ..core import client
-from collections import Counter
 
 
 class TagField(serializers.RelatedField):
@@ -28,10 +28,66 @@ class TagField(serializers.RelatedField):
         return value.tag
 
 
+class ArticleListSerializer(serializers.ListSerializer):
+    """
+    Serializes a page of articles using a fixed number of bulk queries.
+
+    Instead of letting every article look up its author, tags, reactions and
+    favourite status on its own, the data for the whole page is fetched up front
+    and handed to the child serializer which reads from it.
+    """
+
+    def to_representation(self, data):
+        articles = list(data.all() if isinstance(data, models.Manager) else data)
+        self.child.batch = self.load_batch(articles)
+        try:
+            return super().to_representation(articles)
+        finally:
+            self.child.batch = None
+
+    def load_batch(self, articles):
+        """
+        Fetch the related data for the articles keyed by the article id.
+        Counts are read from the denormalized counters on the articles themselves.
+        :param articles:
+        :return:
+        """
+        ids = [article.id for article in articles]
+        user = getattr(self.context.get('request'), 'user', None)
+        user_id = user.id if user is not None and user.is_authenticated else None
+
+        prefetch_related_objects(articles, 'tags')
+
+        return {
+            'authors': self.load_authors(articles),
+            'likes': self.load_reacted(Article.likes.through, ids, user_id),
+            'dislikes': self.load_reacted(Article.dislikes.through, ids, user_id),
+            'favourited': self.load_reacted(FavouriteArticle, ids, user_id),
+        }
+
+    @staticmethod
+    def load_authors(articles):
+        profiles = Profile.objects.filter(
+            user_id__in={article.author_id for article in articles}).select_related('user')
+        return {profile.user_id: ProfileSerializer(profile).data for profile in profiles}
+
+    @staticmethod
+    def load_reacted(model, ids, user_id):
+        """
+        Get the ids of the articles that the user has a row for in the model
+        """
+        if user_id is None:
+            return set()
+        return set(model.objects.filter(user_id=user_id, article_id__in=ids).values_list('article_id', flat=True))
+
+
 class ArticleSerializer(serializers.ModelSerializer):
     """
     Creates articles, updates and validated data for the articles created and retrieved.
     """
+    # related data for a page of articles, set by the ArticleListSerializer
+    batch = None
+
     slug = serializers.CharField(read_only=True, max_length=255)
     title = serializers.CharField(
         required=True,
@@ -100,6 +156,7 @@ class ArticleSerializer(serializers.ModelSerializer):
             'favourited',
         ]
         read_only_fields = ('slug', 'author', 'reactions')
+        list_serializer_class = ArticleListSerializer
 
     def get_share_article(self, instance):
         """
@@ -126,8 +183,10 @@ class ArticleSerializer(serializers.ModelSerializer):
         return article_uri
 
     def get_author(self, obj):
+        if self.batch is not None:
+            return self.batch['authors'].get(obj.author_id)
         serializer = ProfileSerializer(
-            instance=Profile.objects.get(user=obj.author))
+            instance=cached_profiles.get_instance(obj.author_id))
         return serializer.data
 
     def get_read_time(self, obj):
@@ -159,9 +218,7 @@ class ArticleSerializer(serializers.ModelSerializer):
         tags = validated_data.pop('tags', [])
 
         article = Article.objects.create(**validated_data)
-
-        for tag in tags:
-            article.tags.add(tag)
+        article.tags.add(*tags)
 
         return article
 
@@ -175,9 +232,7 @@ class ArticleSerializer(serializers.ModelSerializer):
 
         tags = validated_data.pop('tags', [])
 
-        instance.tags.clear()
-        for tag in tags:
-            instance.tags.add(tag)
+        instance.tags.set(tags)
 
         for (key, value) in validated_data.items():
             setattr(instance, key, value)
@@ -186,55 +241,55 @@ class ArticleSerializer(serializers.ModelSerializer):
         return instance
 
     def get_average_rating(self, instance):
-        avg_rating = ArticleRating.objects.filter(article=instance).aggregate(
-            average_rating=models.Avg('rating'))['average_rating'] or 0
-        total_user_rated = ArticleRating.objects.filter(
-            article=instance).count()
-        each_rating = Counter(
-            ArticleRating.objects.filter(article=instance).values_list(
-                'rating', flat=True))
-
         return {
-            'avg_rating': avg_rating,
-            'total_user': total_user_rated,
-            'each_rating': each_rating
+            'avg_rating': instance.average_rating,
+            'total_user': instance.rating_count,
+            'each_rating': instance.rating_histogram
         }
 
-    def get_reactions(self, instance):
-        request = self.context.get('request')
-
-        liked_by_me = False
-        disliked_by_me = False
+    def reacted_by_me(self, instance, relation):
+        if self.batch is not None:
+            return instance.id in self.batch[relation]
 
-        if request is not None and request.user.is_authenticated:
-            user_id = request.user.id
-            liked_by_me = instance.likes.all().filter(id=user_id).count() == 1
-            disliked_by_me = instance.dislikes.all().filter(
-                id=user_id).count() == 1
+        request = self.context.get('request')
+        if request is None or not request.user.is_authenticated:
+            return False
+        return getattr(instance, relation).filter(id=request.user.id).exists()
 
+    def get_reactions(self, instance):
         return {
             'likes': {
-                'count': instance.likes.count(),
-                'me': liked_by_me
+                'count': instance.like_count,
+                'me': self.reacted_by_me(instance, 'likes')
             },
             'dislikes': {
-                'count': instance.dislikes.count(),
-                'me': disliked_by_me
+                'count': instance.dislike_count,
+                'me': self.reacted_by_me(instance, 'dislikes')
             }
         }
 
     favourited = serializers.SerializerMethodField(read_only=True)
 
     def get_favourited(self, obj):  # istanbul ignore next
-        if not hasattr(self.context.get('request'), 'user'):
-            return False
-        elif isinstance(self.context.get('request').user, AnonymousUser):
-            return False
-        try:
-            FavouriteArticle.objects.get(user=self.context.get('request').user, article=obj.id)
-            return True
-        except FavouriteArticle.DoesNotExist:
+        if self.batch is not None:
+            return obj.id in self.batch['favourited']
+        user = getattr(self.context.get('request'), 'user', None)
+        if user is None or isinstance(user, AnonymousUser):
             return False
+        return FavouriteArticle.objects.filter(user=user, article=obj.id).exists()
+
+
+class ArticleSearchSerializer(ArticleSerializer):
+    """
+    Adds the highlighted fragments of the body that matched the search
+    """
+    highlight = serializers.SerializerMethodField(read_only=True)
+
+    class Meta(ArticleSerializer.Meta):
+        fields = ArticleSerializer.Meta.fields + ['highlight']
+
+    def get_highlight(self, instance):
+        return getattr(instance, 'highlight', None)
 
 
 class TagsSerializer(serializers.ModelSerializer):
@@ -297,8 +352,56 @@ class RatingSerializer(serializers.ModelSerializer):
         return {'rating': _rating}
 
 
+class CommentListSerializer(serializers.ListSerializer):
+    """
+    Serializes a page of comments using a fixed number of bulk queries, the way
+    ArticleListSerializer serializes articles.
+    """
+
+    def to_representation(self, data):
+        comments = list(data.all() if isinstance(data, models.Manager) else data)
+        if comments and hasattr(comments[0], 'liked_by_me'):
+            # annotated by CommentQuerySet.with_reactions, there is nothing left to load
+            return super().to_representation(comments)
+        self.child.batch = self.load_batch(comments)
+        try:
+            return super().to_representation(comments)
+        finally:
+            self.child.batch = None
+
+    def load_batch(self, comments):
+        """
+        Fetch the authors of the comments and count their reactions
+        :param comments:
+        :return:
+        """
+        ids = [comment.id for comment in comments]
+        user = getattr(self.context.get('request'), 'user', None)
+        user_id = user.id if user is not None and user.is_authenticated else None
+
+        prefetch_related_objects(comments, 'author__user')
+
+        return {
+            'likes': self.load_reactions(Comment.likes.through, ids, user_id),
+            'dislikes': self.load_reactions(Comment.dislikes.through, ids, user_id),
+        }
+
+    @staticmethod
+    def load_reactions(model, ids, user_id):
+        """
+        Count the reactions of each comment, and whether the user is one of them
+        :return: dict of the comment ids to (count, bool)
+        """
+        rows = model.objects.filter(comment_id__in=ids).values('comment_id').annotate(
+            count=Count('id'), mine=Count('id', filter=Q(user_id=user_id))).order_by()
+        return {row['comment_id']: (row['count'], row['mine'] > 0) for row in rows}
+
+
 class CommentSerializer(serializers.ModelSerializer):
     """ serialize and deserialize comment model"""
+    # the reactions of a page of comments, set by the CommentListSerializer
+    batch = None
+
     body = serializers.CharField(max_length=1200)  # remove
     author = ProfileSerializer(read_only=True)
     likes = serializers.SerializerMethodField(method_name='count_likes')
@@ -307,26 +410,60 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
 
-        fields = ['id', 'body', 'author', 'likes', 'dislikes', 'parent', 'created_at']
+        fields = ['id', 'body', 'author', 'likes', 'dislikes', 'parent', 'depth', 'created_at']
+        list_serializer_class = CommentListSerializer
 
     def count_likes(self, instance):
         """Returns the total likes of particlular comment"""
-        request = self.context.get('request')
-        liked_by_me = False
-        if request is not None and request.user.is_authenticated:
-            user_id = request.user.id
-            liked_by_me = instance.likes.all().filter(id=user_id).count() == 1
-        return {'count': instance.likes.count(), 'me': liked_by_me}
+        return self.count_reactions(instance, 'like', 'liked_by_me')
 
     def count_dislikes(self, instance):
         """Returns  the total dislikes of a particular comment."""
+        return self.count_reactions(instance, 'dislike', 'disliked_by_me')
+
+    def count_reactions(self, instance, reaction, by_me):
+        """
+        Count the likes or dislikes of a comment, from the annotations of
+        CommentQuerySet.with_reactions, the batch of the page or the database
+        :param reaction: like or dislike
+        :param by_me: the name of the annotation of the requester's reaction
+        :return: dict of the count and whether the requester is one of them
+        """
+        if hasattr(instance, by_me):
+            return {'count': getattr(instance, reaction + '_count'), 'me': getattr(instance, by_me)}
+        if self.batch is not None:
+            count, mine = self.batch[reaction + 's'].get(instance.id, (0, False))
+            return {'count': count, 'me': mine}
         request = self.context.get('request')
-        disliked_by_me = False
-        if request is not None and request.user.is_authenticated:
-            user_id = request.user.id
-            disliked_by_me = instance.dislikes.all().filter(
-                id=user_id).count() == 1
-        return {'count': instance.dislikes.count(), 'me': disliked_by_me}
+        users = getattr(instance, reaction + 's')
+        mine = request is not None and request.user.is_authenticated and users.filter(id=request.user.id).exists()
+        return {'count': users.count(), 'me': mine}
+
+
+class CommentTreeListSerializer(CommentListSerializer):
+    """
+    Serializes comments with their replies nested in them, in a single pass over
+    the comments. The comments whose parent is not among them are the roots of the
+    trees, returned in the order they are given.
+    """
+
+    def to_representation(self, data):
+        comments = super().to_representation(data)
+        nodes = {comment['id']: dict(comment, replies=[]) for comment in comments}
+        roots = []
+        for comment in comments:
+            node = nodes[comment['id']]
+            if node['parent'] in nodes:
+                nodes[node['parent']]['replies'].append(node)
+            else:
+                roots.append(node)
+        return roots
+
+
+class CommentTreeSerializer(CommentSerializer):
+
+    class Meta(CommentSerializer.Meta):
+        list_serializer_class = CommentTreeListSerializer
 
 
 class UpdateCommentSerializer(serializers.Serializer):
@@ -401,27 +538,10 @@ def update(request, key):
 
 
 class StatsSerializer(serializers.ModelSerializer):
-    view_count = serializers.SerializerMethodField()
-    comment_count = serializers.SerializerMethodField()
-    like_count = serializers.SerializerMethodField()
-    dislike_count = serializers.SerializerMethodField()
-    average_rating = serializers.SerializerMethodField()
-
-    def get_comment_count(self, value):
-        return Comment.objects.filter(article=value).count()
-
-    def get_view_count(self, value):
-        return ArticleView.objects.filter(article=value).count()
-
-    def get_like_count(self, value):
-        return value.likes.count()
-
-    def get_dislike_count(self, value):
-        return value.dislikes.count()
-
-    def get_average_rating(self, value):
-        return ArticleRating.objects.filter(article=value).aggregate(
-            average_rating=models.Avg('rating'))['average_rating'] or 0
+    """
+    Reads the statistics of an article from its denormalized counters
+    """
+    average_rating = serializers.ReadOnlyField()
 
     class Meta:
         model = Article
@@ -489,10 +609,9 @@ class ViolationListSerializer(serializers.Serializer):
         }
 
     def get_reports(self, data):
-        violations = Violation.objects.filter(article=data.article.id)
-
+        # the violations of the article are prefetched with their reporter by the view
         reports = []
-        for value in violations:
+        for value in data.article.violations.all():
             reports.append({
                 "user": value.reporter.username,
                 "description": value.description,
@@ -504,7 +623,7 @@ class ViolationListSerializer(serializers.Serializer):
         return reports
 
     def get_count(self, value):
-        return Violation.objects.filter(article=value.article.id).count()
+        return len(value.article.violations.all())
 
     class Meta:
         fields = ('article', 'count', 'reports')
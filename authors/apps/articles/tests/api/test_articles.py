@@ -2,11 +2,15 @@ import json
 import random
 import string
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils.text import slugify
 from rest_framework import status
 from rest_framework.reverse import reverse
 
+from authors.apps.articles.models import Article, ArticleRating, FavouriteArticle
 from authors.apps.authentication.tests.api.test_auth import AuthenticatedTestCase
+from authors.apps.core.test_helpers import create_user, set_test_client
 
 
 class BaseArticlesTestCase(AuthenticatedTestCase):
@@ -614,3 +618,104 @@ class DeleteArticleTestCase(BaseArticlesTestCase):
 
         response = self.delete_article(slug)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ListArticlesQueryCountTestCase(BaseArticlesTestCase):
+    """
+    Ensure that listing articles costs a fixed number of queries per page
+    """
+
+    def setUp(self):
+        super().setUp()
+        set_test_client(self.client)
+        self.reader = create_user(verified=True)
+
+    def create_reacted_articles(self, count):
+        """
+        Create published articles that have been rated, liked, disliked and favourited
+        :param count:
+        :return:
+        """
+        for _ in range(count):
+            article = Article.objects.get(slug=self.create_article(published=True)['slug'])
+            article.like(self.reader)
+            article.dislike(self.get_current_user())
+            ArticleRating.objects.create(article=article, rated_by=self.reader, rating=4)
+            article.record_rating(None, 4)
+            FavouriteArticle.objects.create(article=article, user=self.reader)
+
+    def count_list_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url_list)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_the_page(self):
+        self.create_reacted_articles(2)
+        small_page = self.count_list_queries()
+
+        self.create_reacted_articles(6)
+        large_page = self.count_list_queries()
+
+        self.assertEqual(small_page, large_page)
+
+    def test_batched_list_matches_single_article(self):
+        self.create_reacted_articles(1)
+        self.client.force_authenticate(self.reader)
+
+        listed = self.client.get(self.url_list).data['results'][0]
+        single = self.client.get(self.url_retrieve(listed['slug'])).data
+
+        for field in ['author', 'avg_rating', 'reactions', 'favourited', 'tags']:
+            self.assertEqual(listed[field], single[field])
+        self.assertTrue(listed['favourited'])
+        self.assertTrue(listed['reactions']['likes']['me'])
+        self.assertEqual(listed['avg_rating']['avg_rating'], 4)
+
+
+class CursorPaginationTestCase(BaseArticlesTestCase):
+    """
+    Test the opt-in keyset pagination of the articles
+    """
+
+    def get_page(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_cursor_pages_through_all_articles(self):
+        self.create_30_articles()
+
+        page = self.get_page(self.url_list + '?cursor=&page_size=10')
+        self.assertIsNone(page['links']['previous'])
+        self.assertNotIn('count', page)
+
+        slugs = []
+        pages = [page]
+        while page['links']['next']:
+            slugs += [article['slug'] for article in page['results']]
+            page = self.get_page(page['links']['next'])
+            pages.append(page)
+        slugs += [article['slug'] for article in page['results']]
+
+        self.assertEqual(len(slugs), 30)
+        self.assertEqual(len(set(slugs)), 30)
+
+        # going back returns the previous page
+        previous = self.get_page(pages[-1]['links']['previous'])
+        self.assertEqual(previous['results'], pages[-2]['results'])
+
+    def test_cursor_pages_skip_count_unless_requested(self):
+        self.create_random_articles()
+        first = self.get_page(self.url_list + '?cursor=&page_size=2')
+
+        with CaptureQueriesContext(connection) as queries:
+            self.get_page(first['links']['next'])
+        self.assertFalse(any('COUNT(' in query['sql'] for query in queries.captured_queries))
+
+        page = self.get_page(self.url_list + '?cursor=&count=true')
+        self.assertEqual(page['count'], self.DEFAULT_NUM_ARTICLES)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url_list + '?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
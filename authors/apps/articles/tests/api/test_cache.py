@@ -0,0 +1,164 @@
+import json
+
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from authors.apps.articles.tests.api.test_articles import BaseArticlesTestCase
+from authors.apps.core.test_helpers import create_user, set_test_client
+
+
+class CachedReadsTestCase(BaseArticlesTestCase):
+    """
+    The article detail, rating and reaction summaries, tags and profiles are read from the cache
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.slug = self.create_article(published=True)['slug']
+        self.reader = {
+            "user": {
+                "username": "reader",
+                "email": "reader@gmail.com",
+                "password": "passwordU1#@243"
+            }
+        }
+
+    def get_article(self, slug=None):
+        return self.client.get(self.url_retrieve(slug or self.slug))
+
+    def test_cached_article_is_read_without_queries(self):
+        self.logout()
+        self.assertEqual(self.get_article().status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            response = self.get_article()
+        self.assertEqual(response.data['tags'], ["angularjs", "dragons", "reactjs"])
+
+    def test_unpublished_articles_are_only_visible_to_the_author(self):
+        slug = self.create_article(published=False)['slug']
+        self.assertEqual(self.get_article(slug).status_code, status.HTTP_200_OK)
+        self.logout()
+        self.assertEqual(self.get_article(slug).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_article_changes_invalidate_the_cache(self):
+        self.get_article()
+        self.client.put(self.url_retrieve(self.slug), data={"article": {"body": "A new body"}}, format="json")
+        self.assertEqual(self.get_article().data['body'], "A new body")
+
+        self.client.delete(self.url_retrieve(self.slug))
+        self.assertEqual(self.get_article().status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_reactions_and_ratings_invalidate_the_cache(self):
+        self.register_and_login(self.reader)
+        self.client.get(reverse('articles:reactions', kwargs={'slug': self.slug}))
+        self.client.get(reverse('articles:rating-article', kwargs={'slug': self.slug}))
+
+        self.client.post(reverse('articles:like', kwargs={'slug': self.slug}))
+        self.client.put(reverse("articles:rate-article", kwargs={'slug': self.slug}),
+                        data={"rating": {"rating": 4}}, format="json")
+
+        response = self.client.get(reverse('articles:reactions', kwargs={'slug': self.slug}))
+        self.assertEqual(response.data['reactions']['likes'], {'count': 1, 'me': True})
+        response = self.client.get(reverse('articles:rating-article', kwargs={'slug': self.slug}))
+        self.assertEqual(response.data['avg_rating'], 4)
+        self.assertEqual(self.get_article().data['reactions']['likes']['count'], 1)
+
+    def test_tag_list_is_invalidated_by_new_tags(self):
+        self.client.get(reverse('tags'))
+        self.client.post(reverse("articles:article-tags", kwargs={'slug': self.slug}), data={"tags": ["caching"]},
+                         format="json")
+        response = self.client.get(reverse('tags'))
+        self.assertIn('caching', [tag['tag'] for tag in response.data])
+
+    def test_username_changes_invalidate_the_author(self):
+        self.get_article()
+        response = self.client.put(reverse('authentication:user-retrieve-update'),
+                                   data={"user": {"username": "renamed"}}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.get_article().data['author']['username'], 'renamed')
+        response = self.client.get(reverse('profiles:profiles', kwargs={'username': 'renamed'}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_cache_stats_are_only_shown_to_admins(self):
+        self.assertEqual(self.client.get(reverse('cache-stats')).status_code, status.HTTP_403_FORBIDDEN)
+
+        set_test_client(self.client)
+        self.client.force_authenticate(create_user(admin=True))
+        self.get_article()
+        response = self.client.get(reverse('cache-stats'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('articles.article:pk', response.data)
+
+
+class CachedArticleDetailTestCase(BaseArticlesTestCase):
+    """
+    The rendered article detail is cached, the flags of a logged in reader are added to it
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.slug = self.create_article(published=True)['slug']
+        self.reader = {
+            "user": {
+                "username": "reader",
+                "email": "reader@gmail.com",
+                "password": "passwordU1#@243"
+            }
+        }
+
+    def get_article(self, **headers):
+        return self.client.get(self.url_retrieve(self.slug), **headers)
+
+    def test_anonymous_readers_get_the_cached_body(self):
+        self.logout()
+        first = self.get_article()
+        second = self.get_article()
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(first['ETag'], second['ETag'])
+        self.assertEqual(second['Content-Type'], 'application/json; charset=utf-8')
+        self.assertEqual(json.loads(second.content.decode())['data']['article']['slug'], self.slug)
+
+    def test_not_modified_when_the_etag_matches(self):
+        self.logout()
+        etag = self.get_article()['ETag']
+        response = self.get_article(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+        self.register_and_login(self.reader)
+        self.client.post(reverse('articles:like', kwargs={'slug': self.slug}))
+        self.logout()
+        response = self.get_article(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['reactions']['likes'], {'count': 1, 'me': False})
+
+    def test_logged_in_readers_get_their_own_flags(self):
+        self.register_and_login(self.reader)
+        anonymous_etag = self.get_article()['ETag']
+        self.client.post(reverse('articles:like', kwargs={'slug': self.slug}))
+        self.client.post(reverse('articles:favourite_article', kwargs={'slug': self.slug}))
+
+        response = self.get_article()
+        self.assertEqual(response.data['reactions']['likes'], {'count': 1, 'me': True})
+        self.assertTrue(response.data['favourited'])
+        self.assertNotEqual(response['ETag'], anonymous_etag)
+        self.assertEqual(self.get_article(HTTP_IF_NONE_MATCH=response['ETag']).status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+
+        self.logout()
+        response = self.get_article()
+        self.assertEqual(response.data['reactions']['likes'], {'count': 1, 'me': False})
+        self.assertFalse(response.data['favourited'])
+
+    def test_profile_changes_invalidate_the_detail(self):
+        self.get_article()
+        self.client.put(reverse('profiles:profiles', kwargs={'username': 'anything'}), data={"bio": "A new bio"},
+                        format="json")
+        self.assertEqual(self.get_article().data['author']['bio'], "A new bio")
+
+    def test_ratings_invalidate_the_detail(self):
+        self.get_article()
+        self.register_and_login(self.reader)
+        self.client.put(reverse("articles:rate-article", kwargs={'slug': self.slug}),
+                        data={"rating": {"rating": 5}}, format="json")
+        self.assertEqual(self.get_article().data['avg_rating']['avg_rating'], 5)
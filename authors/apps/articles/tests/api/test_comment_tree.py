@@ -0,0 +1,77 @@
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from authors.apps.articles.models import Comment
+from authors.apps.core.test_helpers import create_article, create_profile
+
+
+class CommentTreeTestCase(APITestCase):
+
+    def setUp(self):
+        self.reader = create_profile()
+        self.client.force_authenticate(self.reader.user)
+        self.article = create_article(create_profile().user)
+        self.first = self.comment('First')
+        self.reply = self.comment('Reply', self.first)
+        self.nested = self.comment('Nested reply', self.reply)
+        self.second = self.comment('Second')
+        self.other_reply = self.comment('Other reply', self.second)
+        self.nested.likes.add(self.reader.user)
+
+    def comment(self, body, parent=None):
+        return Comment.objects.create(article=self.article, parent=parent, author=create_profile(), body=body)
+
+    def get_tree(self, pk=None, **params):
+        kwargs = {'slug': self.article.slug}
+        if pk is not None:
+            kwargs['pk'] = pk
+        return self.client.get(reverse('articles:comment-subtree' if pk else 'articles:comment-tree', kwargs=kwargs),
+                               params)
+
+    @staticmethod
+    def bodies(nodes):
+        return [(node['body'], CommentTreeTestCase.bodies(node['replies'])) for node in nodes]
+
+    def test_the_whole_tree_is_nested(self):
+        response = self.get_tree()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 2)
+        # the newest comments first, as in the list of comments, their replies oldest first
+        self.assertEqual(self.bodies(response.data['results']), [
+            ('Second', [('Other reply', [])]),
+            ('First', [('Reply', [('Nested reply', [])])]),
+        ])
+        nested = response.data['results'][1]['replies'][0]['replies'][0]
+        self.assertEqual(nested['likes'], {'count': 1, 'me': True})
+
+    def test_the_depth_is_limited(self):
+        response = self.get_tree(depth=1)
+        self.assertEqual(self.bodies(response.data['results']), [
+            ('Second', [('Other reply', [])]),
+            ('First', [('Reply', [])]),
+        ])
+
+    def test_the_tree_of_a_comment(self):
+        response = self.get_tree(self.reply.pk)
+        self.assertEqual(self.bodies(response.data['results']), [('Reply', [('Nested reply', [])])])
+
+    def test_invalid_depth(self):
+        self.assertEqual(self.get_tree(depth='-1').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unknown_article(self):
+        response = self.client.get(reverse('articles:comment-tree', kwargs={'slug': 'unknown'}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_the_thread_of_a_comment_is_listed_depth_first(self):
+        later_reply = self.comment('Later reply', self.first)
+        response = self.client.get(reverse('articles:a-comment', kwargs={'slug': self.article.slug,
+                                                                         'pk': self.first.pk}))
+        self.assertEqual([(reply['body'], reply['depth']) for reply in response.data['results']],
+                         [('Reply', 1), ('Nested reply', 2), (later_reply.body, 1)])
+
+    def test_deleting_a_comment_deletes_its_thread(self):
+        response = self.client.delete(reverse('articles:a-comment', kwargs={'slug': self.article.slug,
+                                                                            'pk': self.first.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(Comment.objects.all()), [self.other_reply, self.second])
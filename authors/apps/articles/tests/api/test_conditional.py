@@ -0,0 +1,107 @@
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from authors.apps.articles.tests.api.test_articles import BaseArticlesTestCase
+
+
+class ConditionalRequestsTestCase(BaseArticlesTestCase):
+    """
+    The read endpoints answer If-None-Match and If-Modified-Since with 304 Not Modified
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.slug = self.create_article(published=True)['slug']
+        self.reader = {
+            "user": {
+                "username": "reader",
+                "email": "reader@gmail.com",
+                "password": "passwordU1#@243"
+            }
+        }
+
+    def assertNotModified(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    def assertModified(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_article_list(self):
+        etag = self.client.get(self.url_list)['ETag']
+        with self.assertNumQueries(6):
+            # the count and the page, the authors, and the user's reactions and favourites. The tags are not fetched
+            self.assertNotModified(self.url_list, etag)
+
+        self.register_and_login(self.reader)
+        reader_etag = self.client.get(self.url_list)['ETag']
+        self.assertNotEqual(reader_etag, etag)
+        self.client.post(reverse('articles:like', kwargs={'slug': self.slug}))
+        self.assertModified(self.url_list, reader_etag)
+        self.assertModified(self.url_list + '?page=1', reader_etag)
+
+    def test_article_list_changes_with_the_tags(self):
+        etag = self.client.get(self.url_list)['ETag']
+        self.client.post(reverse("articles:article-tags", kwargs={'slug': self.slug}), data={"tags": ["new"]},
+                         format="json")
+        self.assertModified(self.url_list, etag)
+
+    def test_tags(self):
+        url = reverse('tags')
+        response = self.client.get(url)
+        self.assertNotModified(url, response['ETag'])
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+
+        self.client.post(reverse("articles:article-tags", kwargs={'slug': self.slug}), data={"tags": ["new"]},
+                         format="json")
+        self.assertModified(url, response['ETag'])
+
+    def test_comments(self):
+        url = reverse("articles:comments", kwargs={'slug': self.slug})
+        etag = self.client.get(url)['ETag']
+        self.assertNotModified(url, etag)
+
+        comment = self.client.post(url, data={"comment": {"body": "A comment"}}, format="json").data
+        self.assertModified(url, etag)
+
+        etag = self.client.get(url)['ETag']
+        self.client.put(reverse('articles:likes', kwargs={'slug': self.slug, 'pk': comment['id']}))
+        self.assertModified(url, etag)
+
+    def test_ratings(self):
+        url = reverse('articles:rating-article', kwargs={'slug': self.slug})
+        etag = self.client.get(url)['ETag']
+        self.assertNotModified(url, etag)
+
+        self.register_and_login(self.reader)
+        self.client.put(reverse("articles:rate-article", kwargs={'slug': self.slug}),
+                        data={"rating": {"rating": 4}}, format="json")
+        self.client.credentials()
+        self.assertModified(url, etag)
+
+    def test_profile(self):
+        url = reverse('profiles:profiles', kwargs={'username': 'anything'})
+        self.client.get(url)
+        response = self.client.get(reverse('authentication:user-retrieve-update'))
+        url = reverse('profiles:profiles', kwargs={'username': response.data['username']})
+
+        response = self.client.get(url)
+        self.assertNotModified(url, response['ETag'])
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(0)).status_code,
+                         status.HTTP_200_OK)
+
+        self.client.put(url, data={"bio": "A new bio"}, format="json")
+        self.assertModified(url, response['ETag'])
+
+    def test_errors_are_not_validated(self):
+        response = self.client.get(reverse('articles:rating-article', kwargs={'slug': 'missing'}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(response.has_header('ETag'))
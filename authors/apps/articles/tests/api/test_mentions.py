@@ -0,0 +1,58 @@
+from django.test import SimpleTestCase
+from notifications.models import Notification
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITransactionTestCase
+
+from authors.apps.ah_notifications.notifications import Verbs
+from authors.apps.articles.mentions import parse_mentions
+from authors.apps.articles.models import Comment
+from authors.apps.core.test_helpers import create_article, create_profile
+
+
+class ParseMentionsTestCase(SimpleTestCase):
+
+    def test_mentions_are_parsed(self):
+        self.assertEqual(parse_mentions('@alice and @bob.smith, thanks @alice. Mail me at me@example.com'),
+                         ['alice', 'bob.smith'])
+
+
+class MentionsTestCase(APITransactionTestCase):
+    # the notifications are created once the comment is committed
+
+    def setUp(self):
+        self.author = create_profile()
+        self.client.force_authenticate(self.author.user)
+        self.article = create_article(create_profile().user)
+        self.parent = Comment.objects.create(article=self.article, author=create_profile(), body='A comment')
+        self.mentioned = [create_profile().user for _ in range(2)]
+
+    def reply(self, body, mentions=None):
+        data = {'comment': {'body': body}}
+        if mentions is not None:
+            data['mentions'] = mentions
+        return self.client.post(reverse('articles:a-comment', kwargs={'slug': self.article.slug,
+                                                                      'pk': self.parent.pk}), data, format='json')
+
+    def mention_recipients(self):
+        return set(Notification.objects.filter(verb=Verbs.COMMENT_MENTION).values_list('recipient_id', flat=True))
+
+    def test_the_mentioned_users_are_notified(self):
+        first, second = self.mentioned
+        response = self.reply('Thanks @{} and @{}'.format(first.username, self.author.user.username),
+                              mentions=[second.username, 'unknown-user'])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        # the author and the unknown user are skipped
+        self.assertEqual(self.mention_recipients(), {first.pk, second.pk})
+        notification = Notification.objects.get(recipient=first)
+        self.assertEqual((notification.actor, notification.target), (self.author.user, self.article))
+
+    def test_nobody_is_notified_of_an_invalid_comment(self):
+        response = self.reply('', mentions=[self.mentioned[0].username])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.mention_recipients(), set())
+
+    def test_mentions_in_top_level_comments(self):
+        self.client.post(reverse('articles:comments', kwargs={'slug': self.article.slug}),
+                         {'comment': {'body': 'Hi @{}'.format(self.mentioned[0].username)}}, format='json')
+        self.assertEqual(self.mention_recipients(), {self.mentioned[0].pk})
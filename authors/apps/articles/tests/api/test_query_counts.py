@@ -0,0 +1,91 @@
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from authors.apps.articles.models import Comment, Violation
+from authors.apps.core.test_helpers import QueryScalingMixin, create_article, create_profile
+
+
+class ArticleQueriesTestCase(QueryScalingMixin, APITestCase):
+    """
+    The list endpoints of the articles make the same number of queries however many rows they list
+    """
+
+    def setUp(self):
+        self.reader = create_profile()
+        self.client.force_authenticate(self.reader.user)
+        self.article = create_article(create_profile().user)
+
+    def create_articles(self, count):
+        for _ in range(count):
+            article = create_article(create_profile().user)
+            article.tags.create(tag='tag-{}'.format(article.pk), slug='tag-{}'.format(article.pk))
+            article.like(self.reader.user)
+            article.favourites.create(user=self.reader.user)
+
+    def create_comments(self, count):
+        for _ in range(count):
+            comment = Comment.objects.create(article=self.article, author=create_profile(), body='A comment')
+            comment.likes.add(self.reader.user)
+            comment.dislikes.add(create_profile().user)
+
+    def create_replies(self, count):
+        if not hasattr(self, 'parent'):
+            self.parent = Comment.objects.create(article=self.article, author=create_profile(), body='A comment')
+        for _ in range(count):
+            reply = Comment.objects.create(article=self.article, parent=self.parent, author=create_profile(),
+                                           body='A reply')
+            reply.likes.add(self.reader.user)
+
+    def create_violations(self, count):
+        for _ in range(count):
+            article = create_article(create_profile().user)
+            for reporter in (self.reader.user, create_profile().user):
+                Violation.objects.create(article=article, reporter=reporter, type=Violation.spam, description='Spam')
+
+    def test_article_list(self):
+        self.assertQueriesDoNotScale(reverse('articles:articles-list'), self.create_articles)
+
+    def test_article_search(self):
+        self.assertQueriesDoNotScale(reverse('articles:search-filter'), self.create_articles)
+
+    def test_favourites(self):
+        self.assertQueriesDoNotScale(reverse('articles:article-favourites'), self.create_articles)
+
+    def test_comments(self):
+        self.assertQueriesDoNotScale(reverse('articles:comments', kwargs={'slug': self.article.slug}),
+                                     self.create_comments)
+
+    def test_comment_thread(self):
+        self.create_replies(0)
+        self.assertQueriesDoNotScale(
+            reverse('articles:a-comment', kwargs={'slug': self.article.slug, 'pk': self.parent.pk}),
+            self.create_replies)
+
+    def test_comment_tree(self):
+        self.create_replies(0)
+        self.assertQueriesDoNotScale(reverse('articles:comment-tree', kwargs={'slug': self.article.slug}),
+                                     self.create_replies)
+
+    def test_comment_reactions(self):
+        self.create_comments(1)
+        comment = Comment.objects.get()
+        reply = Comment.objects.create(article=self.article, parent=comment, author=create_profile(), body='A reply')
+        reply.dislikes.add(self.reader.user)
+
+        listed = self.client.get(reverse('articles:comments', kwargs={'slug': self.article.slug})).data
+        thread = self.client.get(reverse('articles:a-comment', kwargs={'slug': self.article.slug, 'pk': comment.pk}))
+
+        for data in (listed['results'][0], thread.data['comment']):
+            self.assertEqual(data['likes'], {'count': 1, 'me': True})
+            self.assertEqual(data['dislikes'], {'count': 1, 'me': False})
+        self.assertEqual(thread.data['results'][0]['likes'], {'count': 0, 'me': False})
+        self.assertEqual(thread.data['results'][0]['dislikes'], {'count': 1, 'me': True})
+
+    def test_comment_authors(self):
+        self.assertQueriesDoNotScale(reverse('articles:comment-users', kwargs={'slug': self.article.slug}),
+                                     self.create_comments)
+
+    def test_violations(self):
+        self.reader.user.is_staff = True
+        self.reader.user.save()
+        self.assertQueriesDoNotScale(reverse('articles:violations'), self.create_violations)
@@ -1,7 +1,16 @@
 import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
 
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
 from rest_framework.reverse import reverse
 
+from authors.apps.articles.models import Article
+from authors.apps.articles.search import InMemorySearchBackend
 from authors.apps.articles.tests.api.test_articles import BaseArticlesTestCase
 
 true = True
@@ -86,3 +95,101 @@ class TestFavouriteArticle(BaseArticlesTestCase):
         response = self.create_articles()
         response = self.client.get(reverse("articles:search-filter"), data={"search": 'more'})
         self.assertIn(b"never", response.content)
+
+
+class FullTextSearchTestCase(BaseArticlesTestCase):
+    """Tests for the full text search of the articles"""
+
+    def setUp(self):
+        super().setUp()
+        self.create_article(article={"article": {
+            "title": "Training dragons",
+            "description": "A guide",
+            "body": "Feed them well and they will listen",
+            "tags": ["pets"],
+            "published": True}}, published=True)
+        self.create_article(article={"article": {
+            "title": "Feeding cats",
+            "description": "Another guide",
+            "body": "Cats are not dragons, but they still need training",
+            "tags": ["dragonflies"],
+            "published": True}}, published=True)
+
+    def search(self, text, **filters):
+        response = self.client.get(reverse("articles:search-filter"), data=dict(filters, search=text))
+        return json.loads(response.content)['data']['article']['results']
+
+    def test_search_matches_word_prefixes(self):
+        results = self.search('drag')
+        self.assertEqual(len(results), 2)
+
+    def test_title_matches_rank_higher(self):
+        results = self.search('dragons')
+        self.assertEqual(results[0]['title'], 'Training dragons')
+
+    def test_all_terms_must_match(self):
+        results = self.search('cats dragons')
+        self.assertEqual([article['title'] for article in results], ['Feeding cats'])
+
+    def test_search_matches_tags_and_author(self):
+        self.assertEqual(len(self.search('pets')), 1)
+        self.assertEqual(len(self.search(self.user['user']['username'])), 2)
+
+    def test_search_results_are_highlighted(self):
+        results = self.search('listen')
+        self.assertIn('<mark>listen</mark>', results[0]['highlight'])
+
+    def test_vector_follows_tag_changes(self):
+        slug = self.search('pets')[0]['slug']
+        self.client.put(self.url_retrieve(slug), data={"article": {"tags": ["reptiles"]}}, format="json")
+        self.assertEqual(self.search('pets'), [])
+        self.assertEqual(len(self.search('reptil')), 1)
+
+    def test_search_without_terms_lists_everything(self):
+        self.assertEqual(len(self.search('!!')), 2)
+
+    def test_deleted_articles_are_not_found(self):
+        slug = self.search('pets')[0]['slug']
+        self.client.delete(self.url_retrieve(slug))
+        self.assertEqual(self.search('pets'), [])
+        self.assertEqual(len(self.search('dragons')), 1)
+
+    def test_changes_from_other_processes_are_synced(self):
+        # update does not send signals, like a save made by another process
+        Article.objects.filter(title='Feeding cats').update(title='Feeding parrots', updated_at=timezone.now())
+        with override_settings(ARTICLE_SEARCH_SYNC_INTERVAL=0):
+            self.assertEqual(len(self.search('parrots')), 1)
+
+    def test_filters_apply_before_the_results_are_capped(self):
+        with mock.patch.object(InMemorySearchBackend, 'max_results', 1):
+            results = self.search('dragons', tag='dragonflies')
+        self.assertEqual([article['title'] for article in results], ['Feeding cats'])
+
+    def test_rebuild_command_saves_the_index(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'index.json')
+            call_command('rebuild_search_index', path=path, stdout=StringIO())
+
+            backend = InMemorySearchBackend(path=path)
+            articles = backend.search(Article.objects.all(), 'dragons')
+            self.assertEqual([article.title for article in articles], ['Training dragons', 'Feeding cats'])
+
+
+@override_settings(ARTICLE_SEARCH_BACKEND='authors.apps.articles.search.PostgresSearchBackend')
+class PostgresFullTextSearchTestCase(FullTextSearchTestCase):
+    """Runs the full text search tests against the postgres search backend"""
+
+    def test_changes_from_other_processes_are_synced(self):
+        # the search vectors are updated in the database, there is nothing to sync
+        pass
+
+    def test_filters_apply_before_the_results_are_capped(self):
+        # the database ranks the articles it filters, there is no cap
+        pass
+
+    def test_backfill_command_rebuilds_vectors(self):
+        Article.objects.update(search_vector=None)
+        self.assertEqual(self.search('dragons'), [])
+
+        call_command('update_search_vectors', stdout=StringIO())
+        self.assertEqual(len(self.search('dragons')), 2)
@@ -1,7 +1,15 @@
+from io import StringIO
 from unittest import TestCase
 
-from authors.apps.articles.models import Article, Tag
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase as DjangoTestCase
+
+from authors.apps.articles.models import Article, Tag, ArticleRating, ArticleView, Comment
 from authors.apps.authentication.tests.api.test_auth import AuthenticatedTestCase
+from authors.apps.articles.threads import path_segment
+from authors.apps.core.test_helpers import create_article, create_profile, create_user, set_test_client
 
 
 class ArticleModelTest(AuthenticatedTestCase):
@@ -77,3 +85,143 @@ class TagModelTest(TestCase):
         """
         tag = self.create_tag()
         self.assertEqual(tag.__str__(), "Django")
+
+
+class ArticleCountersTest(AuthenticatedTestCase):
+
+    def setUp(self):
+        super().setUp()
+        set_test_client(self.client)
+        self.reader = create_user()
+        self.article = Article.objects.create(title="Counted", description="Counted", body="Counted",
+                                              author=self.get_current_user())
+
+    def test_reactions_update_counters(self):
+        self.article.like(self.reader)
+        self.article.like(self.reader)
+        self.assertEqual(self.article.like_count, 1)
+
+        self.article.dislike(self.reader)
+        self.assertEqual((self.article.like_count, self.article.dislike_count), (0, 1))
+
+        self.article.un_dislike(self.reader)
+        self.article.un_dislike(self.reader)
+        self.assertEqual(self.article.dislike_count, 0)
+
+    def test_ratings_update_counters(self):
+        self.article.record_rating(None, 4)
+        self.article.record_rating(None, 2)
+        self.article.record_rating(4, 5)
+        self.assertEqual(self.article.average_rating, 3.5)
+        self.assertEqual(self.article.rating_histogram, {2: 1, 5: 1})
+
+        self.article.record_rating(5, None)
+        self.assertEqual((self.article.rating_sum, self.article.rating_count), (2, 1))
+
+    def test_comments_and_views_update_counters(self):
+        comment = Comment.objects.create(article=self.article, body="Nice", author=self.reader.profile)
+        ArticleView.objects.create(article=self.article, user=self.reader)
+        self.article.refresh_from_db()
+        self.assertEqual((self.article.comment_count, self.article.view_count), (1, 1))
+
+        comment.delete()
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comment_count, 0)
+
+    def test_reconcile_repairs_drifted_counters(self):
+        self.article.like(self.reader)
+        ArticleRating.objects.create(article=self.article, rated_by=self.reader, rating=3)
+        Article.objects.filter(pk=self.article.pk).update(like_count=7, comment_count=2)
+
+        out = StringIO()
+        call_command('reconcile_article_counters', stdout=out)
+        self.assertIn('1 article(s)', out.getvalue())
+
+        self.article.refresh_from_db()
+        self.assertEqual((self.article.like_count, self.article.comment_count), (1, 0))
+        self.assertEqual(self.article.rating_histogram, {3: 1})
+
+
+class ArticleVisibilityTest(AuthenticatedTestCase):
+
+    def setUp(self):
+        super().setUp()
+        set_test_client(self.client)
+        self.author = self.get_current_user()
+        self.reader = create_user()
+        for published in (True, False):
+            Article.objects.create(title="Visible", description="Visible", body="Visible",
+                                   author=self.author, published=published)
+
+    def explain(self, queryset):
+        """
+        Get the query plan of the queryset. Sequential scans are disabled since
+        the planner prefers them for the few rows in the test database.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def test_authors_see_their_unpublished_articles(self):
+        self.assertEqual(Article.objects.visible_to(self.author).count(), 2)
+        self.assertEqual(Article.objects.visible_to(self.reader).count(), 1)
+        self.assertEqual(Article.objects.visible_to(AnonymousUser()).count(), 1)
+
+    def test_listing_published_articles_uses_index(self):
+        plan = self.explain(Article.objects.visible_to(AnonymousUser()))
+        self.assertIn('article_published_idx', plan)
+
+    def test_listing_for_author_uses_indexes(self):
+        plan = self.explain(Article.objects.visible_to(self.author))
+        self.assertIn('Index', plan)
+        self.assertNotIn('Seq Scan', plan)
+        self.assertNotIn('Append', plan)
+
+    def test_retrieve_uses_index(self):
+        slug = Article.objects.first().slug
+        plan = self.explain(Article.objects.visible_to(self.author).filter(slug=slug))
+        self.assertIn('Index', plan)
+        self.assertNotIn('Seq Scan', plan)
+
+
+class CommentPathTest(DjangoTestCase):
+
+    def setUp(self):
+        self.article = create_article(create_profile().user)
+        self.author = create_profile()
+        self.first = self.comment()
+        self.reply = self.comment(self.first)
+        self.nested = self.comment(self.reply)
+        self.second_reply = self.comment(self.first)
+        self.second = self.comment()
+
+    def comment(self, parent=None):
+        return Comment.objects.create(article=self.article, parent=parent, author=self.author, body='A comment')
+
+    def test_the_path_is_set_on_creation(self):
+        self.nested.refresh_from_db()
+        self.assertEqual(self.nested.path, ''.join(path_segment(comment.pk) for comment in (
+            self.first, self.reply, self.nested)))
+        self.assertEqual((self.first.depth, self.reply.depth, self.nested.depth), (0, 1, 2))
+
+    def test_the_replies_under_a_comment_are_listed_depth_first(self):
+        self.assertEqual(list(Comment.objects.under(self.first).order_by('path')),
+                         [self.reply, self.nested, self.second_reply])
+        self.assertEqual(list(Comment.objects.under(self.reply, include_self=True).order_by('path')),
+                         [self.reply, self.nested])
+
+    def test_a_thread_is_deleted_with_its_reactions(self):
+        self.nested.likes.add(self.author.user)
+        self.assertEqual(self.reply.delete_thread(), 2)
+        self.assertEqual(set(Comment.objects.all()), {self.first, self.second_reply, self.second})
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comment_count, 3)
+
+    def test_the_paths_are_backfilled(self):
+        Comment.objects.update(path='', depth=0)
+        out = StringIO()
+        call_command('update_comment_paths', stdout=out)
+        self.assertIn('5 comment(s)', out.getvalue())
+        self.assertEqual(list(Comment.objects.under(self.first).order_by('path')),
+                         [self.reply, self.nested, self.second_reply])
+        self.assertEqual(Comment.objects.get(pk=self.nested.pk).depth, 2)
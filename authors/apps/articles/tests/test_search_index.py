@@ -0,0 +1,53 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from authors.apps.articles.search_index import InvertedIndex, highlight, tokenize
+
+
+class InvertedIndexTest(TestCase):
+
+    def setUp(self):
+        self.index = InvertedIndex()
+        self.index.add(1, {'title': 'Training dragons', 'body': 'Feed them well'})
+        self.index.add(2, {'title': 'Feeding cats', 'body': 'Cats are not dragons'})
+
+    def test_tokenize_splits_words(self):
+        self.assertEqual(tokenize("Don't_stop, 2 Dragons!"), ['don', 't', 'stop', '2', 'dragons'])
+
+    def test_search_ranks_the_best_match_first(self):
+        self.assertEqual([doc_id for doc_id, score in self.index.search('dragons')], [1, 2])
+
+    def test_search_matches_prefixes_of_all_the_terms(self):
+        self.assertEqual([doc_id for doc_id, score in self.index.search('feed cat')], [2])
+        self.assertEqual(self.index.search('feed horses'), [])
+
+    def test_documents_can_be_replaced_and_removed(self):
+        self.index.add(1, {'title': 'Training horses'})
+        self.assertEqual([doc_id for doc_id, score in self.index.search('dragons')], [2])
+
+        self.index.remove(2)
+        self.assertEqual(self.index.search('dragons'), [])
+        self.assertNotIn('cats', self.index.terms)
+        self.assertEqual(len(self.index), 1)
+
+    def test_terms_are_sorted_after_changes(self):
+        self.index.add(3, {'title': 'Zebras and aardvarks'})
+        self.assertEqual(self.index.terms, sorted(self.index.postings))
+        self.assertEqual([doc_id for doc_id, score in self.index.search('aard')], [3])
+
+        self.index.remove(3)
+        self.assertNotIn('zebras', self.index.terms)
+        self.assertEqual(self.index.search('aard'), [])
+
+    def test_index_can_be_saved_and_loaded(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'index.json')
+            self.index.save(path, synced_at='now')
+            index, data = InvertedIndex.load(path)
+
+        self.assertEqual(data['synced_at'], 'now')
+        self.assertEqual(index.search('dragons'), self.index.search('dragons'))
+
+    def test_highlight_marks_the_matching_words(self):
+        self.assertEqual(highlight('Cats are not dragons.', ['drag']), 'Cats are not <mark>dragons.</mark>')
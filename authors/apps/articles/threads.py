@@ -0,0 +1,53 @@
+from django.db import connection
+
+# The path of a comment is the ids of its ancestors followed by its own, each padded
+# to the same width. Ordering the comments by path lists a thread depth first, and
+# the replies under a comment are the paths that start with its path, a range of
+# the index on the path.
+PATH_SEGMENT_WIDTH = 10
+
+
+def path_segment(pk):
+    return str(pk).zfill(PATH_SEGMENT_WIDTH)
+
+
+def comment_path(pk, parent=None):
+    """
+    :param pk: the id of the comment
+    :param parent: the parent comment, None for a top-level comment
+    :return: the path of the comment
+    """
+    return (parent.path if parent is not None else '') + path_segment(pk)
+
+
+def path_range(path):
+    """
+    :param path: the path of a comment
+    :return: the lower bound, inclusive, and the upper bound, exclusive, of the paths of
+    the comment and of the replies under it
+    """
+    return path, path[:-PATH_SEGMENT_WIDTH] + path_segment(int(path[-PATH_SEGMENT_WIDTH:]) + 1)
+
+
+def update_comment_paths(comment_model):
+    """
+    Compute the paths and depths of the comments from their parents with a single
+    recursive statement, only the comments whose path or depth is wrong are written,
+    like the ones inserted in bulk. The model is passed in so that this can also be
+    used with the historical models in migrations.
+    :param comment_model:
+    :return: the number of comments updated
+    """
+    table = connection.ops.quote_name(comment_model._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'WITH RECURSIVE tree (id, path, depth) AS ('
+            'SELECT id, LPAD(CAST(id AS text), %(width)s, \'0\'), 0 FROM {table} WHERE parent_id IS NULL '
+            'UNION ALL '
+            'SELECT reply.id, tree.path || LPAD(CAST(reply.id AS text), %(width)s, \'0\'), tree.depth + 1 '
+            'FROM {table} reply JOIN tree ON reply.parent_id = tree.id'
+            ') UPDATE {table} SET path = tree.path, depth = tree.depth FROM tree '
+            'WHERE {table}.id = tree.id AND ({table}.path != tree.path OR {table}.depth != tree.depth)'.format(
+                table=table),
+            {'width': PATH_SEGMENT_WIDTH})
+        return cursor.rowcount
@@ -7,7 +7,7 @@ from authors.apps.articles.views import (
     ReactionsAPIView, SearchFilterListAPIView, FavouriteArticleApiView,
     LikeComments, DislikeComments, ArticleStatsView, ReportViolationsAPIView,
     ListViolationsAPIView, ProcessViolationsAPIView, ViolationTypesAPIView,
-    FavouritesAPIView, RatingsAPIView, CommentUsersAPIView)
+    FavouritesAPIView, RatingsAPIView, CommentUsersAPIView, CommentTreeAPIView)
 
 app_name = "articles"
 router = DefaultRouter()
@@ -27,6 +27,8 @@ urlpatterns = [
     path('articles/<slug>/favourite/', FavouriteArticleApiView.as_view(), name="favourite_article"),
     path('articles/<slug>/comments', CommentAPIView.as_view(), name='comments'),
     path('articles/<slug>/comments/authors', CommentUsersAPIView.as_view(), name='comment-users'),
+    path('articles/<slug>/comments/tree', CommentTreeAPIView.as_view(), name='comment-tree'),
+    path('articles/<slug>/comments/<int:pk>/tree', CommentTreeAPIView.as_view(), name='comment-subtree'),
     path('articles/<slug>/comments/<pk>', CommentCreateUpdateDestroy.as_view(), name="a-comment"),
     path('articles/<slug>/comments/<pk>/likes', LikeComments.as_view(), name="likes"),
     path('articles/<slug>/comments/<pk>/dislikes', DislikeComments.as_view(), name="dislikes"),
@@ -1,5 +1,9 @@
+import hashlib
+
 from django.contrib.auth.models import AnonymousUser
-from django.db.models import Count
+from django.db.models import Count, Max, Prefetch
+from django.http import HttpResponseNotModified
+from django.utils.http import parse_etags, quote_etag
 from django.utils.text import slugify
 from rest_framework import status, viewsets, generics
 from rest_framework import mixins
@@ -9,32 +13,48 @@ from rest_framework.response import Response
 from rest_framework.generics import (
     RetrieveUpdateDestroyAPIView, CreateAPIView, ListAPIView, ListCreateAPIView, UpdateAPIView,
 )
-from django.db import models
-from collections import Counter
+from django.db import transaction
 from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 from django_filters import rest_framework as filters
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
 
-from authors.apps.articles.models import Article, Tag, ArticleRating, Comment, ArticleView, Violation, FavouriteArticle
+from authors.apps.articles.models import (
+    Article, Tag, ArticleRating, Comment, ArticleView, Violation, FavouriteArticle, article_details, cached_articles,
+    cached_tags,
+)
 from authors.apps.articles.serializers import (
     ArticleSerializer, TagSerializer, RatingSerializer, FavouriteSerializer, update, CommentSerializer,
     UpdateCommentSerializer, TagsSerializer, StatsSerializer, ViolationSerializer, ViolationListSerializer,
+    ArticleSearchSerializer, CommentTreeSerializer,
 )
-from authors.apps.authentication.models import User
+from authors.apps.articles.mentions import notify_mentions
+from authors.apps.articles.search import ArticleSearchFilter
 from authors.apps.authentication.serializers import UserSerializer
-from authors.apps.core.renderers import BaseJSONRenderer
+from authors.apps.core import metrics
+from authors.apps.core.renderers import BaseJSONRenderer, RenderedResponse
+from authors.apps.core.views import ConditionalGetMixin, InstrumentedViewMixin
 from authors.apps.articles.permissions import IsArticleOwnerOrReadOnly, IsNotArticleOwner
 from authors.apps.profiles.models import Profile
 from authors.apps.profiles.serializers import ProfileSerializer
-from .pagination import StandardResultsSetPagination
+from .pagination import StandardResultsSetPagination, FeedPagination
 from notifications.signals import notify
 from authors.apps.ah_notifications.notifications import Verbs
-from authors.apps.core.mail_sender import send_email
-from rest_framework.exceptions import NotFound
+from authors.apps.core.jobs import send_email
+from rest_framework.exceptions import NotFound, ValidationError
+
+
+def rows_fingerprint(queryset):
+    """
+    The number of rows and the highest id of a table that rows are only added to
+    and deleted from, like the reactions. Together they change with every change.
+    :param queryset:
+    :return: dict
+    """
+    return queryset.order_by().aggregate(count=Count('id'), last=Max('id'))
 
 
-class ArticleAPIView(mixins.CreateModelMixin, mixins.UpdateModelMixin,
+class ArticleAPIView(InstrumentedViewMixin, ConditionalGetMixin, mixins.CreateModelMixin, mixins.UpdateModelMixin,
                      mixins.DestroyModelMixin, mixins.ListModelMixin,
                      mixins.RetrieveModelMixin, viewsets.GenericViewSet):
     """
@@ -49,7 +69,7 @@ class ArticleAPIView(mixins.CreateModelMixin, mixins.UpdateModelMixin,
     queryset = Article.objects.all()
     renderer_names = ('article', 'articles')
     serializer_class = ArticleSerializer
-    pagination_class = StandardResultsSetPagination
+    pagination_class = FeedPagination
 
     @staticmethod
     def retrieve_owner_or_published(slug, user):
@@ -60,20 +80,16 @@ class ArticleAPIView(mixins.CreateModelMixin, mixins.UpdateModelMixin,
             2. If the user is not the owner, return the article only if it is published
         If the user is not logged in:
             1. Return the article only if it is published
+        The article is read from the cache.
         :param slug:
         :param user:
         :return:
         """
-        article = Article.objects.filter(slug=slug)
-        if user and not isinstance(user, AnonymousUser):
-            mine = Article.objects.filter(slug=slug, author=user)
-            article = article.filter(published=True)
-
-            article = article.union(mine).first()
-        else:
-            # ensure the article is published
-            article = article.filter(published=True).first()
-        return article
+        try:
+            article = cached_articles.get_instance_by('slug', slug)
+        except Article.DoesNotExist:
+            return None
+        return article if article.is_visible_to(user) else None
 
     def create(self, request, *args, **kwargs):
         """
@@ -145,12 +161,61 @@ class ArticleAPIView(mixins.CreateModelMixin, mixins.UpdateModelMixin,
             return Response({
                 'errors': 'Article does not exist'
             }, status.HTTP_404_NOT_FOUND)
-        if request.user and not isinstance(request.user, AnonymousUser) and article.author != request.user:
+        if request.user and not isinstance(request.user, AnonymousUser) and article.author_id != request.user.id:
             ArticleView.objects.get_or_create(article=article, user=request.user)
-        serializer = self.serializer_class(
-            article, context={'request': request})
 
-        return Response(serializer.data)
+        data, body, etag = self.get_detail(article, request)
+        if set(parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))) & {etag, '*'}:
+            return self.not_modified(etag)
+        if body is None:
+            return Response(data, headers={'ETag': etag})
+        return RenderedResponse(data, body, headers={'ETag': etag})
+
+    def get_detail(self, article, request):
+        """
+        The cached detail of the article, with the flags of the user when logged in
+        :return: the data, the rendered body or None when it has to be rendered, and the ETag
+        """
+        detail = article_details.get_or_set(article.pk, lambda: self.render_detail(article))
+        if not request.user or isinstance(request.user, AnonymousUser):
+            return detail['data'], detail['body'], detail['etag']
+        return self.overlay_detail(article, detail, request)
+
+    @staticmethod
+    def not_modified(etag):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    def render_detail(self, article):
+        """
+        Render the article the way an anonymous reader sees it. This is the part of
+        the article that is the same for every reader, it is cached until the article,
+        its tags, reactions, ratings or author change.
+        :param article:
+        :return: dict of the data, the rendered body and its ETag
+        """
+        with metrics.timer('serializer'):
+            data = self.serializer_class(article).data
+        with metrics.timer('renderer'):
+            body = BaseJSONRenderer().render(
+                data, renderer_context={'view': self, 'response': Response()}).encode(BaseJSONRenderer.charset)
+        return {'data': data, 'body': body, 'etag': quote_etag(hashlib.md5(body).hexdigest())}
+
+    def overlay_detail(self, article, detail, request):
+        """
+        Add whether the user liked, disliked and favourited the article to the cached detail
+        :return: the data, None for the body which is rendered from the data, and the ETag
+        """
+        serializer = self.serializer_class(article, context={'request': request})
+        flags = (serializer.reacted_by_me(article, 'likes'), serializer.reacted_by_me(article, 'dislikes'),
+                 serializer.get_favourited(article))
+
+        # the detail is a copy, it was read from the cache
+        data = detail['data']
+        data['reactions']['likes']['me'], data['reactions']['dislikes']['me'], data['favourited'] = flags
+        etag = hashlib.md5('{}{}'.format(detail['etag'], flags).encode()).hexdigest()
+        return data, None, quote_etag(etag)
 
     def list(self, request, *args, **kwargs):
         """
@@ -161,26 +226,41 @@ class ArticleAPIView(mixins.CreateModelMixin, mixins.UpdateModelMixin,
         :return:
         """
 
-        articles = Article.objects.filter(published=True)
-
-        # if the user is logged in, display both published and unpublished articles
-        if request.user and not isinstance(request.user, AnonymousUser):
-            mine = Article.objects.filter(author=request.user)
-
-            articles = articles.union(mine)
+        # if the user is logged in, display both published and their unpublished articles
+        articles = Article.objects.visible_to(request.user)
 
         # paginates a queryset(articles) if required
         page = self.paginate_queryset(articles)
+        self.check_validators(request, self.page_validators(page, request))
 
-        serializer = self.serializer_class(
-            page,
-            context={
-                'request': request
-            },
-            many=True
-        )
+        serializer = self.get_serializer(page, many=True)
         return self.get_paginated_response(serializer.data)
 
+    def page_validators(self, page, request):
+        """
+        Values that change whenever the serialized page of articles changes, they are
+        read from the articles already fetched and the tables the page is batched from.
+        The counters are changed with update(), which does not touch updated_at.
+        :param page: the articles
+        :param request:
+        :return: list
+        """
+        ids = [article.id for article in page]
+        values = [
+            [(article.id, article.updated_at, article.like_count, article.dislike_count, article.rating_sum,
+              article.rating_count) for article in page],
+            Profile.objects.filter(user_id__in={article.author_id for article in page}).aggregate(
+                Max('updated_at'), Max('user__updated_at')),
+            # the count and the links to the other pages, they were computed by the paginator
+            self.paginator.get_paginated_response([]).data,
+        ]
+        if request.user.is_authenticated:
+            # whether the user liked, disliked or favourited the articles
+            for model in (Article.likes.through, Article.dislikes.through, FavouriteArticle):
+                values.append(sorted(model.objects.filter(user=request.user, article_id__in=ids).values_list(
+                    'article_id', flat=True)))
+        return values
+
     def destroy(self, request, *args, **kwargs):
         """
         Return a custom message when the article has been deleted
@@ -296,7 +376,7 @@ class ArticleTagsAPIView(generics.ListCreateAPIView, generics.DestroyAPIView):
             return Response(output.data)
 
 
-class TagsAPIView(generics.ListAPIView):
+class TagsAPIView(InstrumentedViewMixin, ConditionalGetMixin, generics.ListAPIView):
     """
     API View class to display all the tags
     """
@@ -305,6 +385,14 @@ class TagsAPIView(generics.ListAPIView):
     renderer_names = ('tag', 'tags')
     serializer_class = TagSerializer
 
+    def get_queryset(self):
+        # the tags are cached until a tag is saved or deleted
+        return cached_tags.get_or_set('all', lambda: list(super(TagsAPIView, self).get_queryset()))
+
+    def get_validators(self, request, *args, **kwargs):
+        tags = self.get_queryset()
+        return [(tag.pk, tag.tag, tag.slug) for tag in tags], max((tag.updated_at for tag in tags), default=None)
+
 
 class ReactionMixin(CreateAPIView, DestroyAPIView):
     permission_classes = (IsAuthenticated,)
@@ -328,14 +416,23 @@ class BaseReactionsMixin:
         article = self.get_object()
         serializer = ArticleSerializer(
             article, context={'request': self.request})
-        return serializer.data['reactions']
+        return serializer.get_reactions(article)
 
 
-class ReactionsAPIView(BaseReactionsMixin, RetrieveAPIView):
+class ReactionsAPIView(InstrumentedViewMixin, BaseReactionsMixin, RetrieveAPIView):
     """
     This view retrieves the reactions of an article.
     """
 
+    def get_object(self):
+        # the counts are read from the cached article
+        try:
+            obj = cached_articles.get_instance_by('slug', self.kwargs["slug"])
+        except Article.DoesNotExist:
+            raise NotFound()
+        self.check_object_permissions(self.request, obj)
+        return obj
+
     def get(self, request, **kwargs):
         return Response({'reactions': self.get_reactions()})
 
@@ -364,22 +461,28 @@ class ArticleFilter(filters.FilterSet):
         fields = ['tag', 'username', 'title']
 
 
-class SearchFilterListAPIView(ListAPIView):
-    serializer_class = ArticleSerializer
+class SearchFilterListAPIView(InstrumentedViewMixin, ListAPIView):
+    serializer_class = ArticleSearchSerializer
     permission_classes = (AllowAny,)
     renderer_classes = (BaseJSONRenderer,)
     renderer_names = ("article", "articles",)
     queryset = Article.objects.all()
-    pagination_class = StandardResultsSetPagination
+    # keyset pages (?cursor=) are always ordered by creation time, the ordering parameter only applies to page numbers
+    pagination_class = FeedPagination
 
-    filter_backends = (DjangoFilterBackend, SearchFilter, OrderingFilter)
+    filter_backends = (DjangoFilterBackend, ArticleSearchFilter, OrderingFilter)
     # filter fields are used to filter the articles using the tags, author's username and title
     filterset_class = ArticleFilter
-    # search fields search all articles' parameters for the searched character
-    search_fields = ('tags__tag', 'author__username', 'title', 'body', 'description')
+    # the search parameter is matched by the configured search backend against the title, tags,
+    # author's username, description and body of the articles. Results are ranked.
     # ordering fields are used to render search outputs in a particular order e.g asending or descending order
     ordering_fields = ('author__username', 'title')
 
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        ArticleSearchFilter().highlight(self.request, page if page is not None else [])
+        return page
+
 
 class LikeAPIView(LikeDislikeMixin):
     """
@@ -473,7 +576,6 @@ class RatingAPIView(CreateAPIView, RetrieveUpdateDestroyAPIView):
             data = {"errors": "This article does not exist!"}
             return Response(data, status=status.HTTP_404_NOT_FOUND)
         if article:
-            rating = ArticleRating.objects.filter(article=article, rated_by=request.user).first()
             rating_author = article.author
             rating_user = request.user
             if rating_author == rating_user:
@@ -481,20 +583,35 @@ class RatingAPIView(CreateAPIView, RetrieveUpdateDestroyAPIView):
                 return Response(data, status=status.HTTP_403_FORBIDDEN)
 
             else:
-                serializer = self.serializer_class(rating, data=serializer_data, partial=True)
-                serializer.is_valid(raise_exception=True)
-
-                notify.send(rating_user, verb=Verbs.ARTICLE_RATING, recipient=rating_author,
-                            description="{} has rated your article {}/5".format(rating_user, rating))
-
-                serializer.save(rated_by=request.user, article=article)
+                with transaction.atomic():
+                    # ratings of the article are made one at a time, so that the rating a user
+                    # already gave is read after any other request of theirs was saved
+                    Article.objects.select_for_update().filter(pk=article.pk).exists()
+                    rating = ArticleRating.objects.select_for_update().filter(
+                        article=article, rated_by=request.user).first()
+                    previous = rating.rating if rating else None
+                    serializer = self.serializer_class(rating, data=serializer_data, partial=True)
+                    serializer.is_valid(raise_exception=True)
+
+                    notify.send(rating_user, verb=Verbs.ARTICLE_RATING, recipient=rating_author,
+                                description="{} has rated your article {}/5".format(rating_user, rating))
+
+                    rating = serializer.save(rated_by=request.user, article=article)
+                    article.record_rating(previous, rating.rating)
 
                 data = serializer.data
                 data['Message'] = "You have successfully rated this article"
                 return Response(data, status=status.HTTP_201_CREATED)
 
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            # a rating deleted by another request at the same time is only counted out once
+            deleted, _ = ArticleRating.objects.filter(pk=instance.pk).delete()
+            if deleted:
+                instance.article.record_rating(instance.rating, None)
 
-class RatingsAPIView(RetrieveAPIView):
+
+class RatingsAPIView(InstrumentedViewMixin, ConditionalGetMixin, RetrieveAPIView):
     queryset = ArticleRating.objects.all()
     serializer_class = RatingSerializer
     renderer_classes = (BaseJSONRenderer,)
@@ -502,26 +619,24 @@ class RatingsAPIView(RetrieveAPIView):
     lookup_url_kwarg = 'slug'
     lookup_field = 'article__slug'
 
+    def get_validators(self, request, *args, **kwargs):
+        try:
+            article = cached_articles.get_instance_by('slug', kwargs['slug'])
+        except Article.DoesNotExist:
+            return None
+        return (article.rating_sum, article.rating_count, article.rating_histogram), None
+
     def retrieve(self, request, *args, **kwargs):
         try:
-            article = Article.objects.get(slug=kwargs['slug'])
+            article = cached_articles.get_instance_by('slug', kwargs['slug'])
         except Article.DoesNotExist:
             data = {"errors": "This article does not exist!"}
             return Response(data, status=status.HTTP_404_NOT_FOUND)
 
-        avg_rating = ArticleRating.objects.filter(article=article).aggregate(
-            average_rating=models.Avg('rating'))['average_rating'] or 0
-        total_user_rated = ArticleRating.objects.filter(
-            article=article).count()
-
-        each_rating = Counter(
-            ArticleRating.objects.filter(article=article).values_list(
-                'rating', flat=True))
-
         return Response({
-            'avg_rating': avg_rating,
-            'total_user': total_user_rated,
-            'each_rating': each_rating
+            'avg_rating': article.average_rating,
+            'total_user': article.rating_count,
+            'each_rating': article.rating_histogram
         }, status=status.HTTP_200_OK)
 
 
@@ -537,17 +652,17 @@ class CommentUsersAPIView(ListAPIView):
     def get_queryset(self):
         current = self.request.user.username
         """This method filter and get comment of an article."""
-        comments = Comment.objects.filter(article__slug=self.kwargs['slug']) \
+        comments = Comment.objects.filter(article__slug=self.kwargs['slug']).select_related('author__user') \
             .order_by('author__user_id').distinct('author__user_id')
         return [comment.author for comment in comments if comment.author != current]
 
 
-class CommentAPIView(ListCreateAPIView):
+class CommentAPIView(InstrumentedViewMixin, ConditionalGetMixin, ListCreateAPIView):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     permission_classes = (IsAuthenticatedOrReadOnly,)
     renderer_classes = (BaseJSONRenderer,)
-    pagination_class = StandardResultsSetPagination
+    pagination_class = FeedPagination
     renderer_names = ('comment', 'comments')
     """This class get commit for specific article and create comment"""
 
@@ -555,11 +670,24 @@ class CommentAPIView(ListCreateAPIView):
     lookup_url_kwarg = 'slug'
     lookup_field = 'article__slug'
 
+    def get_queryset(self):
+        return Comment.objects.with_reactions(self.request.user)
+
     def filter_queryset(self, queryset):
         """This method filter and get comment of an article."""
         filters = {self.lookup_field: self.kwargs[self.lookup_url_kwarg], 'parent': None}
         return queryset.filter(**filters)
 
+    def get_validators(self, request, *args, **kwargs):
+        comments = self.filter_queryset(Comment.objects.all())
+        return [
+            comments.order_by().aggregate(
+                count=Count('id'), updated_at=Max('updated_at'), author_updated_at=Max('author__updated_at'),
+                user_updated_at=Max('author__user__updated_at')),
+            rows_fingerprint(Comment.likes.through.objects.filter(comment__in=comments)),
+            rows_fingerprint(Comment.dislikes.through.objects.filter(comment__in=comments)),
+        ], None
+
     def create(self, request, *args, **kwargs):
         """This methods creates a comment"""
         slug = self.kwargs['slug']
@@ -573,10 +701,49 @@ class CommentAPIView(ListCreateAPIView):
             data=request.data.get('comment', {}))
         serializer.is_valid(raise_exception=True)
 
-        serializer.save(article=article, author=request.user.profile)
+        comment = serializer.save(article=article, author=request.user.profile)
+        notify_mentions(comment, request.user, request.data.get('mentions'))
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
+class CommentTreeAPIView(InstrumentedViewMixin, ListAPIView):
+    """
+    Lists the comments of an article with their replies nested in them, or the
+    thread of a single comment when its pk is given. The top-level comments are
+    paginated, their replies are loaded with them by a single recursive query, at
+    most ?depth= levels deep.
+    """
+    serializer_class = CommentTreeSerializer
+    permission_classes = (IsAuthenticatedOrReadOnly,)
+    renderer_classes = (BaseJSONRenderer,)
+    renderer_names = ('comment', 'comments')
+    pagination_class = StandardResultsSetPagination
+
+    def get_queryset(self):
+        article = get_object_or_404(Article.objects.all(), slug=self.kwargs['slug'])
+        roots = Comment.objects.filter(article=article)
+        if 'pk' in self.kwargs:
+            return roots.filter(pk=self.kwargs['pk'])
+        return roots.filter(parent=None)
+
+    def get_depth(self):
+        depth = self.request.query_params.get('depth')
+        if depth is None:
+            return None
+        if not depth.isdigit():
+            raise ValidationError({'depth': ['The depth must be a positive integer']})
+        return int(depth)
+
+    def list(self, request, *args, **kwargs):
+        depth = self.get_depth()
+        page = self.paginate_queryset(self.get_queryset().values_list('pk', flat=True))
+        # the replies of each comment are listed oldest first
+        comments = Comment.objects.with_reactions(request.user).subtrees(page, depth).order_by('created_at')
+        order = {pk: index for index, pk in enumerate(page)}
+        tree = sorted(self.get_serializer(comments, many=True).data, key=lambda node: order[node['id']])
+        return self.get_paginated_response(tree)
+
+
 class CommentCreateUpdateDestroy(CreateAPIView, RetrieveUpdateDestroyAPIView):
     """This class view creates update and delete comment"""
     queryset = Comment.objects.all()
@@ -598,14 +765,16 @@ class CommentCreateUpdateDestroy(CreateAPIView, RetrieveUpdateDestroyAPIView):
             }, status.HTTP_404_NOT_FOUND)
 
         # Get the parent comment of the thread
+        comments = Comment.objects.with_reactions(request.user)
         try:
             pk = self.kwargs.get('pk')
-            parent = Comment.objects.get(pk=pk)
+            parent = comments.get(pk=pk)
         except Comment.DoesNotExist:
             message = {"error": "comment with this ID doesn't exist"}
             return Response(message, status.HTTP_404_NOT_FOUND)
 
-        page = self.paginate_queryset(parent.thread.order_by('created_at').all())
+        # the replies under the comment at any depth, depth first
+        page = self.paginate_queryset(comments.under(parent).order_by('path'))
 
         serializer = self.serializer_class(
             page,
@@ -642,19 +811,12 @@ class CommentCreateUpdateDestroy(CreateAPIView, RetrieveUpdateDestroyAPIView):
         # validating, deserializing and  serializing comment-thread.
         serializer = self.serializer_class(
             data=request.data.get('comment', {}))
-
-        # send notifications to users mentioned in the comments
-        mentions = request.data.get('mentions', [])
-
-        for mention in mentions:
-            notify.send(request.user, verb=Verbs.COMMENT_MENTION,
-                        recipient=User.objects.get(username=mention),
-                        target=article,
-                        description="{} mentioned you in a comment".format(request.user.username))
-
         serializer.is_valid(raise_exception=True)
-        serializer.save(
+        comment = serializer.save(
             article=article, parent=parent, author=request.user.profile)
+
+        # send notifications to users mentioned in the comments
+        notify_mentions(comment, request.user, request.data.get('mentions'))
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     def destroy(self, request, *args, **kwargs):
@@ -674,7 +836,7 @@ class CommentCreateUpdateDestroy(CreateAPIView, RetrieveUpdateDestroyAPIView):
             message = {"error": "comment with this ID doesn't exist"}
             return Response(message, status.HTTP_404_NOT_FOUND)
 
-        super().destroy(self, request, *args, **kwargs)
+        self.get_object().delete_thread()
         return Response({'message': 'The comment has been deleted.'})
 
     def update(self, request, *args, **kwargs):
@@ -702,19 +864,15 @@ class CommentCreateUpdateDestroy(CreateAPIView, RetrieveUpdateDestroyAPIView):
             status=status.HTTP_201_CREATED)
 
 
-class FavouritesAPIView(ListAPIView):
+class FavouritesAPIView(InstrumentedViewMixin, ListAPIView):
     permission_classes = (IsAuthenticated,)
     renderer_classes = (BaseJSONRenderer,)
     serializer_class = ArticleSerializer
-    pagination_class = StandardResultsSetPagination
+    pagination_class = FeedPagination
     renderer_names = ['article', 'articles']
 
     def get_queryset(self):
-        articles = []
-        results = FavouriteArticle.objects.filter(user=self.request.user).select_related('article')
-        for result in results:
-            articles.append(result.article)
-        return articles
+        return Article.objects.filter(favourites__user=self.request.user)
 
 
 class FavouriteArticleApiView(APIView):
@@ -893,7 +1051,7 @@ class ReportViolationsAPIView(APIView):
             'report_category': serializer.data['type']
         }
 
-        send_email(
+        send_email.delay(
             template='acknowledgement_email.html',
             data=email_data,
             to_email=request.user.email,
@@ -913,7 +1071,9 @@ class ListViolationsAPIView(generics.ListAPIView):
 
     def get_queryset(self):
         violations = Violation.objects.filter(status=Violation.pending).order_by('article__id').distinct('article__id')
-        return violations
+        # the serializer lists all the violations of each article
+        return violations.select_related('article').prefetch_related(
+            Prefetch('article__violations', queryset=Violation.objects.select_related('reporter')))
 
 
 class ProcessViolationsAPIView(APIView):
@@ -945,7 +1105,7 @@ class ProcessViolationsAPIView(APIView):
             to_email = article.author.email
             template = 'confirmation_email.html'
             # send email to email owner
-            send_email(data=email_data, template=template, subject='Violation attention', to_email=to_email)
+            send_email.delay(data=email_data, template=template, subject='Violation attention', to_email=to_email)
             # soft-delete the article
             article.delete()
 
@@ -37,8 +37,6 @@ class JWTAuthentication(authentication.BaseAuthentication): # NOQA
         successful, return the user and token. If not, throw an error.
         """
 
-        if BlacklistedToken.objects.filter(token=token).first():
-                raise exceptions.AuthenticationFailed('Token is blacklisted')
         try:
             payload = jwt.decode(token, settings.SECRET_KEY)
         except Exception as e:
@@ -49,8 +47,12 @@ class JWTAuthentication(authentication.BaseAuthentication): # NOQA
             else:
                 raise exceptions.AuthenticationFailed(str(e))
 
+        # the token is decoded first, the tokens that are invalid or expired never reach the blacklist
+        if BlacklistedToken.is_revoked(token):
+            raise exceptions.AuthenticationFailed('Token is blacklisted')
+
         try:
-            user = User.objects.get(pk=payload['id'])
+            user = User.get_cached(payload['id'])
         except User.DoesNotExist:
             raise exceptions.AuthenticationFailed('No user Found')
         if not user.is_active:
@@ -0,0 +1,98 @@
+import math
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+
+class BloomFilter:
+    """
+    A set that can tell for sure that a value was never added to it. It can wrongly
+    say that a value was added, at most at the false positive rate it was sized for.
+    The values are hex digests, the bit positions are taken from their hex digits.
+    """
+
+    def __init__(self, capacity, false_positive_rate=0.01):
+        """
+        :param capacity: the number of values the filter holds at the false positive rate
+        :param false_positive_rate:
+        """
+        self.capacity = capacity = max(capacity, 1)
+        self.size = int(math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hashes = max(1, int(round(self.size / capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, digest):
+        # double hashing, the two halves of the digest are independent hashes
+        first, second = int(digest[:16], 16), int(digest[16:32], 16) | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, digest):
+        for position in self.positions(digest):
+            self.bits[position // 8] |= 1 << position % 8
+        self.count += 1
+
+    def __contains__(self, digest):
+        return all(self.bits[position // 8] & 1 << position % 8 for position in self.positions(digest))
+
+
+class RevocationFilter:
+    """
+    A Bloom filter of the blacklisted tokens that have not expired. It answers
+    "definitely not revoked" for almost every token without a query.
+
+    The filter is loaded the first time it is used. It then picks up the tokens
+    blacklisted by other processes every AUTH_REVOCATION_BLOOM_REFRESH seconds, and
+    is rebuilt when it gets fuller than it was sized for.
+    """
+    # how far back to look when refreshing, covers tokens blacklisted during the last refresh
+    refresh_overlap = timedelta(seconds=5)
+
+    def __init__(self, model):
+        self.model = model
+        self.filter = None
+        self.loaded_at = None
+        self.checked_at = 0
+        self.lock = threading.Lock()
+
+    def load(self):
+        """
+        Build the filter from the blacklisted tokens that have not expired
+        """
+        loaded_at = timezone.now()
+        digests = self.model.objects.filter(expires_at__gt=loaded_at).values_list('digest', flat=True)
+        # leave room for the tokens blacklisted until the next rebuild
+        bloom = BloomFilter(max(digests.count() * 2, 1000))
+        for digest in digests.iterator():
+            bloom.add(digest)
+        self.filter, self.loaded_at, self.checked_at = bloom, loaded_at, time.monotonic()
+
+    def refresh(self):
+        refreshed_at = timezone.now()
+        for digest in self.model.objects.filter(timestamp__gte=self.loaded_at - self.refresh_overlap).values_list(
+                'digest', flat=True):
+            self.filter.add(digest)
+        self.loaded_at, self.checked_at = refreshed_at, time.monotonic()
+
+    def get_filter(self):
+        with self.lock:
+            if self.filter is None or self.filter.count > self.filter.capacity:
+                self.load()
+            elif time.monotonic() - self.checked_at >= settings.AUTH_REVOCATION_BLOOM_REFRESH:
+                self.refresh()
+            return self.filter
+
+    def add(self, digest):
+        with self.lock:
+            if self.filter is not None:
+                self.filter.add(digest)
+
+    def might_be_revoked(self, digest):
+        """
+        :param digest:
+        :return: False when the token is definitely not blacklisted
+        """
+        return digest in self.get_filter()
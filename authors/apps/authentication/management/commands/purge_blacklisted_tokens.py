@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from authors.apps.authentication.models import BlacklistedToken
+
+
+class Command(BaseCommand):
+    help = 'Deletes the blacklisted tokens that have expired, run it periodically e.g. from a scheduler'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='The number of rows deleted at a time')
+
+    def handle(self, *args, **options):
+        deleted = BlacklistedToken.purge_expired(options['batch_size'])
+        self.stdout.write('Deleted {} expired token(s).'.format(deleted))
@@ -0,0 +1,65 @@
+# Generated by Django 2.1.2 on 2026-10-18 03:10
+
+import hashlib
+from datetime import datetime
+
+import jwt
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def digest_tokens(apps, schema_editor):
+    """
+    Replace the blacklisted tokens by their digests. The tokens that already
+    expired are dropped, they are rejected without the blacklist.
+    """
+    BlacklistedToken = apps.get_model('authentication', 'BlacklistedToken')
+    for blacklisted in BlacklistedToken.objects.all():
+        try:
+            payload = jwt.decode(blacklisted.token, verify=False)
+            expires_at = datetime.fromtimestamp(payload['exp'], timezone.utc)
+        except (jwt.InvalidTokenError, KeyError, TypeError, ValueError):
+            expires_at = None
+        digest = hashlib.sha256(blacklisted.token.encode()).hexdigest()
+        if expires_at is None or expires_at <= timezone.now() or \
+                BlacklistedToken.objects.filter(digest=digest).exists():
+            blacklisted.delete()
+            continue
+        blacklisted.digest = digest
+        blacklisted.expires_at = expires_at
+        blacklisted.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blacklistedtoken',
+            name='digest',
+            field=models.CharField(max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='blacklistedtoken',
+            name='expires_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(digest_tokens, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='blacklistedtoken',
+            name='token',
+        ),
+        migrations.AlterField(
+            model_name='blacklistedtoken',
+            name='digest',
+            field=models.CharField(max_length=64, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='blacklistedtoken',
+            name='expires_at',
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.1.2 on 2026-10-18 02:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_blacklisted_token_digest'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='blacklistedtoken',
+            name='timestamp',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -1,11 +1,17 @@
 from django.contrib.auth.models import (
     AbstractBaseUser, BaseUserManager, PermissionsMixin
 )
+import hashlib
 import jwt
 import os
 from datetime import datetime, timedelta
 from django.conf import settings
+from django.core.cache import cache
 from django.db import models
+from django.utils import timezone
+
+from authors.apps.authentication.bloom import RevocationFilter
+from authors.apps.core.cache import ModelCache
 
 
 class UserManager(BaseUserManager):
@@ -143,9 +149,93 @@ class User(AbstractBaseUser, PermissionsMixin):
             settings.SECRET_KEY, algorithm='HS256').decode()
         return token
 
+    @classmethod
+    def get_cached(cls, pk):
+        """
+        Get a user by id, the user is cached for AUTH_USER_CACHE_TIMEOUT seconds
+        and removed from the cache when saved or deleted.
+        :param pk:
+        :return: User
+        :raises User.DoesNotExist:
+        """
+        return cached_users.get_instance(pk)
+
+
+cached_users = ModelCache(User, timeout=settings.AUTH_USER_CACHE_TIMEOUT)
+
 
 class BlacklistedToken(models.Model):
-    """this class stores blacklisted token"""
+    """
+    This class stores the digests of the blacklisted tokens. A row is only
+    needed until the token expires, after that the token is rejected anyway.
+    """
+    digest = models.CharField(max_length=64, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    timestamp = models.DateTimeField(auto_now=True, db_index=True)
+
+    @staticmethod
+    def digest_token(token):
+        """
+        :param token: the encoded token
+        :return: the sha256 hex digest of the token
+        """
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    @staticmethod
+    def cache_key(digest):
+        return 'auth:revoked:{}'.format(digest)
+
+    @classmethod
+    def revoke(cls, token):
+        """
+        Blacklist a token until it expires
+        :param token: a valid token
+        :return: BlacklistedToken
+        """
+        payload = jwt.decode(token, settings.SECRET_KEY, options={'verify_exp': False})
+        expires_at = datetime.fromtimestamp(payload['exp'], timezone.utc)
+        digest = cls.digest_token(token)
+        blacklisted, created = cls.objects.get_or_create(digest=digest, defaults={'expires_at': expires_at})
+        cache.set(cls.cache_key(digest), True, max((expires_at - timezone.now()).total_seconds(), 1))
+        revocation_filter.add(digest)
+        return blacklisted
+
+    @classmethod
+    def is_revoked(cls, token):
+        """
+        Check whether a token is blacklisted. Blacklisted tokens are cached until they
+        expire, the tokens that are not blacklisted for AUTH_REVOCATION_CACHE_TIMEOUT
+        seconds so that a token blacklisted by another process is accepted by this
+        one for at most that long when the cache is not shared.
+        :param token:
+        :return: bool
+        """
+        digest = cls.digest_token(token)
+        if settings.AUTH_REVOCATION_BLOOM_FILTER and not revocation_filter.might_be_revoked(digest):
+            return False
+        key = cls.cache_key(digest)
+        revoked = cache.get(key)
+        if revoked is None:
+            revoked = cls.objects.filter(digest=digest).exists()
+            if revoked or settings.AUTH_REVOCATION_CACHE_TIMEOUT:
+                cache.set(key, revoked, None if revoked else settings.AUTH_REVOCATION_CACHE_TIMEOUT)
+        return revoked
+
+    @classmethod
+    def purge_expired(cls, batch_size=1000):
+        """
+        Delete the rows of the tokens that have expired, a batch at a time so
+        that the table is never locked for long
+        :param batch_size: the number of rows deleted at a time
+        :return: the number of rows deleted
+        """
+        deleted = 0
+        while True:
+            batch = list(cls.objects.filter(expires_at__lte=timezone.now()).values_list('pk', flat=True)[:batch_size])
+            if not batch:
+                return deleted
+            deleted += cls.objects.filter(pk__in=batch).delete()[0]
+
 
-    token = models.CharField(max_length=500)
-    timestamp = models.DateTimeField(auto_now=True)
+# the tokens blacklisted in this process are added to the filter as they are blacklisted
+revocation_filter = RevocationFilter(BlacklistedToken)
@@ -4,7 +4,7 @@ from django.contrib.auth import authenticate
 from django.contrib.auth.tokens import default_token_generator
 from rest_framework import serializers
 
-from .models import User, BlacklistedToken
+from .models import User
 from authors.apps.profiles.models import Profile
 
 email_expression = re.compile(
@@ -300,11 +300,6 @@ class SocialSignUpSerializer(serializers.Serializer):
     access_token = serializers.CharField(max_length=255, required=True)
 
 
-class LogoutSerializer(serializers.ModelSerializer):
+class LogoutSerializer(serializers.Serializer):
     """Performs logout serializer"""
     token = serializers.CharField(max_length=500)
-
-
-    class Meta:
-        model = BlacklistedToken
-        fields = "__all__"
@@ -0,0 +1,112 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from authors.apps.authentication.backends import JWTAuthentication
+from authors.apps.authentication.models import BlacklistedToken, User, cached_users, revocation_filter
+from authors.apps.authentication.tests.api.test_auth import AuthenticatedTestCase
+
+
+class LogoutTestCase(AuthenticatedTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.token = self.client._credentials['HTTP_AUTHORIZATION'].split()[1]
+
+    def current_user(self):
+        return self.client.get(reverse("authentication:user-retrieve-update"))
+
+    def test_logged_out_tokens_are_rejected(self):
+        self.assertEqual(self.current_user().status_code, status.HTTP_200_OK)
+        response = self.client.delete(reverse("authentication:logout"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.current_user()
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertIn('Token is blacklisted', str(response.data))
+
+    def test_only_the_digest_is_stored_until_the_token_expires(self):
+        self.client.delete(reverse("authentication:logout"))
+        blacklisted = BlacklistedToken.objects.get()
+        self.assertEqual(blacklisted.digest, BlacklistedToken.digest_token(self.token))
+        self.assertNotIn(self.token, blacklisted.digest)
+        self.assertAlmostEqual(blacklisted.expires_at, timezone.now() + timedelta(minutes=100),
+                               delta=timedelta(minutes=1))
+
+    def test_blacklist_is_checked_from_the_database_when_not_cached(self):
+        self.client.delete(reverse("authentication:logout"))
+        cache.clear()
+        self.assertTrue(BlacklistedToken.is_revoked(self.token))
+
+    def test_cached_authentication_does_not_query_the_database(self):
+        authentication = JWTAuthentication()
+        user, token = authentication.authenticate_credentials(None, self.token)
+        with CaptureQueriesContext(connection) as queries:
+            cached_user, token = authentication.authenticate_credentials(None, self.token)
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(cached_user, user)
+
+    def test_saving_a_user_clears_the_cached_user(self):
+        authentication = JWTAuthentication()
+        user, token = authentication.authenticate_credentials(None, self.token)
+        User.objects.get(pk=user.pk).save()
+        self.assertIsNone(cached_users.get(user.pk))
+
+    def blacklist(self, digest, expires_at):
+        return BlacklistedToken.objects.create(digest=digest, expires_at=expires_at)
+
+    def test_expired_tokens_are_purged_in_batches(self):
+        for number in range(5):
+            self.blacklist('expired{}'.format(number), timezone.now() - timedelta(minutes=1))
+        self.blacklist('valid', timezone.now() + timedelta(minutes=1))
+
+        self.assertEqual(BlacklistedToken.purge_expired(batch_size=2), 5)
+        self.assertEqual(list(BlacklistedToken.objects.values_list('digest', flat=True)), ['valid'])
+
+    def test_purge_command(self):
+        self.blacklist('expired', timezone.now() - timedelta(minutes=1))
+        out = StringIO()
+        call_command('purge_blacklisted_tokens', stdout=out)
+        self.assertIn('Deleted 1 expired token(s).', out.getvalue())
+        self.assertFalse(BlacklistedToken.objects.exists())
+
+    @override_settings(AUTH_REVOCATION_BLOOM_FILTER=True)
+    def test_bloom_filter_answers_without_the_database(self):
+        revocation_filter.load()
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertFalse(BlacklistedToken.is_revoked(self.token))
+        self.assertEqual(len(queries), 0)
+
+        self.client.delete(reverse("authentication:logout"))
+        cache.clear()
+        self.assertTrue(BlacklistedToken.is_revoked(self.token))
+
+    @override_settings(AUTH_REVOCATION_BLOOM_FILTER=True)
+    def test_bloom_filter_is_not_rebuilt_for_each_check(self):
+        expires_at = timezone.now() + timedelta(minutes=1)
+        BlacklistedToken.objects.bulk_create([
+            BlacklistedToken(digest=BlacklistedToken.digest_token('revoked{}'.format(number)), expires_at=expires_at)
+            for number in range(600)
+        ])
+        revocation_filter.load()
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(5):
+                self.assertFalse(BlacklistedToken.is_revoked(self.token))
+        self.assertEqual(len(queries), 0)
+
+    @override_settings(AUTH_REVOCATION_BLOOM_FILTER=True, AUTH_REVOCATION_BLOOM_REFRESH=0)
+    def test_bloom_filter_picks_up_tokens_blacklisted_by_other_processes(self):
+        revocation_filter.load()
+        # blacklisted without going through this process' filter
+        self.blacklist(BlacklistedToken.digest_token(self.token), timezone.now() + timedelta(minutes=1))
+        self.assertTrue(BlacklistedToken.is_revoked(self.token))
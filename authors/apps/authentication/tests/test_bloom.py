@@ -0,0 +1,25 @@
+import hashlib
+
+from django.test import SimpleTestCase
+
+from authors.apps.authentication.bloom import BloomFilter
+
+
+def digest(number):
+    return hashlib.sha256(str(number).encode()).hexdigest()
+
+
+class BloomFilterTestCase(SimpleTestCase):
+
+    def test_added_values_are_always_found(self):
+        bloom = BloomFilter(1000)
+        for number in range(1000):
+            bloom.add(digest(number))
+        self.assertTrue(all(digest(number) in bloom for number in range(1000)))
+
+    def test_false_positive_rate(self):
+        bloom = BloomFilter(1000, false_positive_rate=0.01)
+        for number in range(1000):
+            bloom.add(digest(number))
+        false_positives = sum(digest(number) in bloom for number in range(1000, 11000))
+        self.assertLess(false_positives, 200)
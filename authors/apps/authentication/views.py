@@ -1,5 +1,3 @@
-import os
-
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.db import IntegrityError
 from django.utils.encoding import force_bytes, force_text
@@ -12,14 +10,11 @@ from rest_framework.views import APIView
 from requests.exceptions import HTTPError
 
 from authors.apps.articles.pagination import StandardResultsSetPagination
-from authors.apps.core import client
+from authors.apps.core import client, jobs
 from authors.apps.core.renderers import BaseJSONRenderer
 from .renderers import UserJSONRenderer
 
 from django.contrib.auth.tokens import default_token_generator
-from django.template.loader import render_to_string
-from django.core.mail import EmailMultiAlternatives
-from django.utils.html import strip_tags
 
 from social_django.utils import load_backend, load_strategy
 
@@ -76,21 +71,14 @@ class RegistrationAPIView(CreateAPIView):
         uid = urlsafe_base64_encode(force_bytes(user.username)).decode("utf-8")
 
         if send_email:
-            email = user.email
-            username = user.username
-            from_email = os.getenv("EMAIL_HOST_SENDER")
-
             email_subject = 'Activate your Author\'s Haven account.'
-            email_message = render_to_string('email_verification.html', {
+            data = {
                 'activation_link': client.get_activate_account_link(token, uid),
                 'title': email_subject,
-                'username': username
-            })
-            text_content = strip_tags(email_message)
-            msg = EmailMultiAlternatives(
-                email_subject, text_content, from_email, to=[email])
-            msg.attach_alternative(email_message, "text/html")
-            msg.send()
+                'username': user.username
+            }
+            jobs.send_email.delay(template='email_verification.html', data=data, to_email=user.email,
+                                  subject=email_subject)
 
         return token, uid
 
@@ -184,21 +172,9 @@ class ForgotPasswordView(CreateAPIView):
 
         # Generate token and get  site domain
         token = default_token_generator.make_token(user)
-        # Required parameters for sending email
-        subject, from_email, to_email = 'Password Reset Link', os.getenv("EMAIL_HOST_SENDER"), email
-
         reset_link = client.get_password_reset_link(token)
-
-        # render with dynamic value
-        html_content = render_to_string('email_reset_password.html', {'reset_password_link': reset_link})
-
-        # Strip the html tag. So people can see the pure text at least.
-        text_content = strip_tags(html_content)
-
-        # create the email, and attach the HTML version as well.
-        msg = EmailMultiAlternatives(subject, text_content, from_email, [to_email])
-        msg.attach_alternative(html_content, "text/html")
-        msg.send()
+        jobs.send_email.delay(template='email_reset_password.html', data={'reset_password_link': reset_link},
+                              to_email=email, subject='Password Reset Link')
 
         response = {"message": "Please follow the link sent to your email to reset your password."}
 
@@ -222,14 +198,8 @@ class ResetPasswordView(APIView):
         data['token'] = token
         serializer = self.serializer_class(data=data)
         serializer.is_valid(raise_exception=True)
-        subject, from_email, to_email = 'Password reset notification', os.getenv("EMAIL_HOST_SENDER"), email
-
-        html_content = render_to_string('email_reset_password_done.html')
-
-        text_content = strip_tags(html_content)
-        msg = EmailMultiAlternatives(subject, text_content, from_email, [to_email])
-        msg.attach_alternative(html_content, "text/html")
-        msg.send()
+        jobs.send_email.delay(template='email_reset_password_done.html', data={}, to_email=email,
+                              subject='Password reset notification')
         response = {"message": "Your password has been successfully reset. You can now log in."}
         return Response(response, status.HTTP_200_OK)
 
@@ -351,13 +321,9 @@ class LogoutView(APIView):
 
     def delete(self, request):
         token = authentication.get_authorization_header(request).split()[1].decode()
-        data = request.data
-        data['token'] = token
-        if BlacklistedToken.objects.filter(token=token).first():
+        if BlacklistedToken.is_revoked(token):
             return Response({"success": "You have already logged out"}, status=status.HTTP_400_BAD_REQUEST)
-        serializer = self.serializer_class(data=data)
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
+        BlacklistedToken.revoke(token)
         return Response({"success": "Succesfully logged out"}, status=status.HTTP_200_OK)
 
 
@@ -0,0 +1,159 @@
+import asyncio
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+
+def default_threads():
+    """
+    :return: the number of requests each process handles at a time, from ASGI_THREADS
+    """
+    return int(os.getenv('ASGI_THREADS', '10'))
+
+
+class WsgiToAsgi:
+    """
+    Serves a WSGI application to an ASGI server. Django 2.1 has no ASGI handler of
+    its own, the requests are handled on a pool of threads while the event loop of
+    the server holds the connections, so idle keep-alive connections and slow
+    clients do not take a thread.
+
+    The response is streamed back from the thread as the application produces it,
+    the thread waits for each chunk to be sent.
+    """
+
+    def __init__(self, application, threads=10):
+        """
+        :param application: a WSGI application
+        :param threads: the number of requests handled at a time
+        """
+        self.application = application
+        self.executor = ThreadPoolExecutor(max_workers=threads)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            await self.http(scope, receive, send)
+        elif scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+        else:
+            raise ValueError('{} connections are not supported'.format(scope['type']))
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def http(self, scope, receive, send):
+        body = await self.read_body(receive)
+        if body is None:
+            # the client went away before sending its request
+            return
+        loop = asyncio.get_event_loop()
+        try:
+            await loop.run_in_executor(self.executor, self.run, loop, make_environ(scope, body), send)
+        finally:
+            body.close()
+
+    @staticmethod
+    async def read_body(receive):
+        """
+        :return: a file of the body of the request, spooled to disk when it is large, None when the client disconnected
+        """
+        body = tempfile.SpooledTemporaryFile(max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE)
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                body.close()
+                return None
+            body.write(message.get('body', b''))
+            if not message.get('more_body'):
+                body.seek(0)
+                return body
+
+    def run(self, loop, environ, send):
+        """
+        Call the application on this thread and send its response from the event loop
+        """
+        response = Response(loop, send)
+        chunks = self.application(environ, response.start_response)
+        try:
+            for chunk in chunks:
+                if chunk:
+                    response.send_body(chunk, more_body=True)
+        finally:
+            # lets django send request_finished and close the connections of this thread
+            if hasattr(chunks, 'close'):
+                chunks.close()
+        response.send_body(b'', more_body=False)
+
+
+class Response:
+    """
+    Sends the response of a WSGI application to the ASGI server, from the thread of the application
+    """
+
+    def __init__(self, loop, send):
+        self.loop = loop
+        self.send = send
+        self.start = None
+
+    def start_response(self, status, headers, exc_info=None):
+        self.start = {
+            'type': 'http.response.start',
+            'status': int(status.split(' ', 1)[0]),
+            'headers': [(name.lower().encode('latin1'), value.encode('latin1')) for name, value in headers],
+        }
+
+    def send_message(self, message):
+        # waits for the message to be sent, a slow client holds back the application
+        asyncio.run_coroutine_threadsafe(self.send(message), self.loop).result()
+
+    def send_body(self, body, more_body):
+        if self.start is not None:
+            # the status and headers are sent with the first chunk, they can change until then
+            self.send_message(self.start)
+            self.start = None
+        self.send_message({'type': 'http.response.body', 'body': body, 'more_body': more_body})
+
+
+def make_environ(scope, body):
+    """
+    :param scope: the ASGI scope of an http request
+    :param body: a file of the body of the request
+    :return: the WSGI environ of the request
+    """
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        # WSGI strings are bytes decoded as latin1
+        'PATH_INFO': scope['path'].encode('utf8').decode('latin1'),
+        'QUERY_STRING': scope['query_string'].decode('latin1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': 'HTTP/{}'.format(scope.get('http_version', '1.1')),
+        'REMOTE_ADDR': scope['client'][0] if scope.get('client') else '',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin1').upper().replace('-', '_')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = 'HTTP_{}'.format(name)
+        value = value.decode('latin1')
+        # repeated headers are joined as in a single header
+        environ[name] = '{},{}'.format(environ[name], value) if name in environ else value
+    return environ
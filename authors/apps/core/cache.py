@@ -0,0 +1,213 @@
+import threading
+from collections import Counter
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import post_delete, post_save
+
+from authors.apps.core.routers import reading_from_primary
+
+# returned by the cache for the keys it does not hold, None can be cached
+MISSING = object()
+
+
+class CacheStats:
+    """
+    Counts the hits and misses of each namespace in this process, for monitoring
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hits = Counter()
+        self.misses = Counter()
+
+    def record(self, namespace, hit):
+        with self.lock:
+            (self.hits if hit else self.misses)[namespace] += 1
+
+    def snapshot(self):
+        """
+        :return: dict of the hits, misses and hit rate of each namespace
+        """
+        with self.lock:
+            return {
+                namespace: {
+                    'hits': self.hits[namespace],
+                    'misses': self.misses[namespace],
+                    'hit_rate': self.hits[namespace] / (self.hits[namespace] + self.misses[namespace]),
+                }
+                for namespace in sorted(set(self.hits) | set(self.misses))
+            }
+
+    def reset(self):
+        with self.lock:
+            self.hits.clear()
+            self.misses.clear()
+
+
+stats = CacheStats()
+
+
+class Namespace:
+    """
+    A group of cache keys, stored as "<name>:<version>:<key>". A key is invalidated by
+    deleting it, all the keys of the namespace at once by bumping its version.
+
+    The values are stored in the cache configured in CACHES, the local memory cache
+    by default. It is per process, configure a Redis backend to share the cache
+    between processes.
+    """
+
+    def __init__(self, name, timeout=DEFAULT_TIMEOUT, alias=DEFAULT_CACHE_ALIAS):
+        """
+        :param name: a prefix unique to the namespace
+        :param timeout: how long, in seconds, values are cached, the TIMEOUT of the cache by default
+        :param alias: the cache to use, from CACHES
+        """
+        self.name = name
+        self.timeout = timeout
+        self.alias = alias
+
+    @property
+    def cache(self):
+        # caches are per thread, the connection is looked up each time
+        return caches[self.alias]
+
+    @property
+    def version_key(self):
+        return '{}:version'.format(self.name)
+
+    def version(self):
+        version = self.cache.get(self.version_key)
+        if version is None:
+            # add does not overwrite a version set by another process in the meantime
+            self.cache.add(self.version_key, 1, None)
+            version = self.cache.get(self.version_key, 1)
+        return version
+
+    def make_key(self, key):
+        return '{}:{}:{}'.format(self.name, self.version(), key)
+
+    def get(self, key, default=None):
+        value = self.cache.get(self.make_key(key), MISSING)
+        stats.record(self.name, value is not MISSING)
+        return default if value is MISSING else value
+
+    def set(self, key, value, timeout=None):
+        self.cache.set(self.make_key(key), value, self.timeout if timeout is None else timeout)
+
+    def get_or_set(self, key, default, timeout=None):
+        """
+        Get the value of the key, or compute it and cache it. The value is computed
+        from the default database, the replicas could be behind.
+        :param key:
+        :param default: a function that computes the value
+        :param timeout:
+        :return:
+        """
+        value = self.get(key, MISSING)
+        if value is MISSING:
+            with reading_from_primary():
+                value = default()
+            self.set(key, value, timeout)
+        return value
+
+    def invalidate(self, key):
+        self.cache.delete(self.make_key(key))
+
+    def invalidate_on_commit(self, key):
+        """
+        Invalidate the key now, and again once the transaction is committed so that
+        a read made before the commit does not keep the old value
+        """
+        self.invalidate(key)
+        transaction.on_commit(lambda: self.invalidate(key))
+
+    def invalidate_all(self):
+        try:
+            self.cache.incr(self.version_key)
+        except ValueError:
+            # the version was evicted, the keys were stored with an older one
+            self.cache.set(self.version_key, self.version() + 1, None)
+
+
+def resolve(instance, path):
+    """
+    Follow a lookup path like user__username on an instance
+    """
+    for attribute in path.split('__'):
+        instance = getattr(instance, attribute)
+    return instance
+
+
+class ModelCache(Namespace):
+    """
+    Caches the instances of a model by a key field, the primary key by default. An
+    instance is invalidated when it is saved or deleted, see invalidate_on_commit.
+    Changes made with update() do not send signals, invalidate them explicitly.
+
+        cached_articles = ModelCache(Article, Article.objects.prefetch_related('tags'))
+        article = cached_articles.get_instance(pk)
+        article = cached_articles.get_instance_by('slug', slug)
+    """
+
+    def __init__(self, model, queryset=None, key_field='pk', name=None, **kwargs):
+        """
+        :param model:
+        :param queryset: the queryset the instances are loaded from, the default manager by default
+        :param key_field: the field the instances are cached by, its value never changes
+        :param name: the namespace, the model label and the key field by default
+        """
+        super().__init__(name or '{}:{}'.format(model._meta.label_lower, key_field), **kwargs)
+        self.model = model
+        self.queryset = queryset
+        self.key_field = key_field
+        post_save.connect(self.clear, model, weak=False, dispatch_uid=self.name)
+        post_delete.connect(self.clear, model, weak=False, dispatch_uid=self.name)
+
+    def get_queryset(self):
+        queryset = self.model._default_manager.all() if self.queryset is None else self.queryset.all()
+        # the instances are cached, they are read from the default database as the replicas could be behind
+        return queryset.using(DEFAULT_DB_ALIAS)
+
+    def get_instance(self, key):
+        """
+        :param key: the value of the key field
+        :return: the instance, DoesNotExist is raised when there is none
+        """
+        instance = self.get(key)
+        if instance is None:
+            instance = self.get_queryset().get(**{self.key_field: key})
+            self.set(key, instance)
+        return instance
+
+    def get_instance_by(self, field, value):
+        """
+        Get an instance by another unique field, which can change. The key of the
+        instance is cached for the value, the instance is only used if it still
+        has the value.
+        :param field: a field or a lookup path like user__username
+        :param value:
+        :return: the instance, DoesNotExist is raised when there is none
+        """
+        alias = 'by:{}:{}'.format(field, value)
+        key = self.get(alias)
+        if key is not None:
+            try:
+                instance = self.get_instance(key)
+            except self.model.DoesNotExist:
+                instance = None
+            if instance is not None and resolve(instance, field) == value:
+                return instance
+        instance = self.get_queryset().get(**{field: value})
+        key = resolve(instance, self.key_field)
+        self.set(key, instance)
+        self.set(alias, key)
+        return instance
+
+    def clear(self, sender, instance, **kwargs):
+        self.invalidate_instance(instance)
+
+    def invalidate_instance(self, instance):
+        self.invalidate_on_commit(resolve(instance, self.key_field))
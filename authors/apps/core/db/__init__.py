@@ -0,0 +1,19 @@
+"""
+A postgres backend that shares a pool of connections between the threads of a
+process, see base.ConnectionPool, and the health checks of the persistent connections.
+
+Use it by setting DB_POOL_SIZE, the ENGINE of the database is then authors.apps.core.db
+"""
+from django.db import connections
+
+from authors.apps.core.db.base import DatabaseWrapper
+
+
+def close_connections():
+    """
+    Close the connections of this process and the idle connections of its pools. A
+    process closes them before it forks so that its children do not share them.
+    """
+    connections.close_all()
+    for pool in DatabaseWrapper.pools.values():
+        pool.close_all()
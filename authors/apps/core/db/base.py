@@ -0,0 +1,146 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.base import Database
+from psycopg2 import extensions
+
+
+class ConnectionPool:
+    """
+    At most `size` connections shared by the threads of a process. A thread that
+    needs a connection when they are all in use waits for one, for at most
+    `timeout` seconds. The idle connections are kept open, the most recently used
+    is handed out first so that the others can be dropped by the server.
+    """
+
+    def __init__(self, connect, size, timeout):
+        """
+        :param connect: a function that opens a new connection
+        :param size: the maximum number of connections, idle or in use
+        :param timeout: how long, in seconds, to wait for a free connection
+        """
+        self.connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(size)
+        self.lock = threading.Lock()
+        # (connection, when it was returned) pairs, the most recently returned last
+        self.idle = []
+
+    def get(self):
+        """
+        :return: an idle connection that still works, or a new one
+        :raises psycopg2.OperationalError: when no connection was free in time
+        """
+        if not self.slots.acquire(timeout=self.timeout):
+            raise Database.OperationalError(
+                'No database connection was free after {} seconds, the pool has {}'.format(self.timeout, self.size))
+        try:
+            return self.take_idle() or self.connect()
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def take_idle(self):
+        while True:
+            with self.lock:
+                if not self.idle:
+                    return None
+                connection, returned_at = self.idle.pop()
+            if time.monotonic() - returned_at < settings.DB_HEALTH_CHECK_INTERVAL or self.is_usable(connection):
+                return connection
+            connection.close()
+
+    @staticmethod
+    def is_usable(connection):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            connection.rollback()
+        except Database.Error:
+            return False
+        return True
+
+    def put(self, connection, discard=False):
+        """
+        Return a connection to the pool, in the state of a new connection
+        :param connection:
+        :param discard: close the connection instead, e.g. when it raised errors
+        """
+        try:
+            if discard or not self.reset(connection):
+                connection.close()
+            else:
+                with self.lock:
+                    self.idle.append((connection, time.monotonic()))
+        finally:
+            self.slots.release()
+
+    @staticmethod
+    def reset(connection):
+        """
+        Roll back the transaction left open on a connection
+        :return: False when the connection is broken
+        """
+        if connection.closed:
+            return False
+        try:
+            if connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+            connection.autocommit = False
+        except Database.Error:
+            return False
+        return True
+
+    def close_all(self):
+        """
+        Close the idle connections
+        """
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for connection, returned_at in idle:
+            connection.close()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    Takes its connections from the pool of its database instead of opening them. A
+    connection is back in the pool when django closes it, at the end of each request
+    when CONN_MAX_AGE is 0, which is what a pooled database should use.
+
+    POOL_SIZE and POOL_TIMEOUT are read from the settings of the database.
+    """
+    # the pool of each database alias, shared by the threads
+    pools = {}
+    pools_lock = threading.Lock()
+
+    def get_pool(self, conn_params):
+        with self.pools_lock:
+            if self.alias not in self.pools:
+                self.pools[self.alias] = ConnectionPool(
+                    lambda: Database.connect(**conn_params),
+                    self.settings_dict.get('POOL_SIZE') or 10,
+                    self.settings_dict.get('POOL_TIMEOUT', 30))
+            return self.pools[self.alias]
+
+    def get_new_connection(self, conn_params):
+        connection = self.get_pool(conn_params).get()
+
+        # as in the postgresql backend, the isolation level has to be read before autocommit is set
+        options = self.settings_dict['OPTIONS']
+        try:
+            self.isolation_level = options['isolation_level']
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pools[self.alias].put(self.connection, discard=self.errors_occurred)
@@ -0,0 +1,30 @@
+import time
+
+from django.conf import settings
+from django.db import connections
+
+
+def mark_idle_connections(**kwargs):
+    """
+    Remember when the persistent connections were last used, at the end of each request
+    """
+    now = time.monotonic()
+    for connection in connections.all():
+        if connection.connection is not None:
+            connection.idle_since = now
+
+
+def check_idle_connections(**kwargs):
+    """
+    Close the persistent connections that sat idle for DB_HEALTH_CHECK_INTERVAL
+    seconds and no longer work, e.g. after the database restarted, so that the
+    request opens a new one instead of failing on its first query. The check is
+    a round trip to the database, the connections used recently are trusted.
+    """
+    now = time.monotonic()
+    for connection in connections.all():
+        idle_since = getattr(connection, 'idle_since', None)
+        if connection.connection is None or idle_since is None or not connection.settings_dict['CONN_MAX_AGE']:
+            continue
+        if now - idle_since >= settings.DB_HEALTH_CHECK_INTERVAL and not connection.is_usable():
+            connection.close()
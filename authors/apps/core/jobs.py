@@ -0,0 +1,191 @@
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from authors.apps.core import mail_sender
+from authors.apps.core.models import Job
+
+logger = logging.getLogger(__name__)
+
+# the functions that do the work of the jobs, by name
+registry = {}
+
+
+class RetryJob(Exception):
+    """
+    Raised by a job to be run again later. The payload can be replaced so that
+    only the part of the work that failed is retried.
+    """
+
+    def __init__(self, message='', payload=None):
+        super().__init__(message)
+        self.payload = payload
+
+
+def job(name, max_attempts=5, priority=0):
+    """
+    Register a function to be run by the worker. The function is called with
+    the payload of the job as keyword arguments, so the payload has to be JSON.
+
+        @job('articles.notify_followers')
+        def notify_followers(article_id):
+            ...
+
+        notify_followers.delay(article_id=article.pk)
+        notify_followers.schedule({'article_id': article.pk}, key='notify-followers-{}'.format(article.pk))
+
+    :param name: a unique name, it is stored with the jobs
+    :param max_attempts: how many times the job is run before it is marked as failed
+    :param priority: the default priority of the jobs, the higher the sooner they are run
+    :return:
+    """
+    def register(function):
+        def schedule(payload, key=None, run_at=None, priority=priority):
+            return enqueue(name, payload, key=key, run_at=run_at, priority=priority, max_attempts=max_attempts)
+
+        registry[name] = function
+        function.schedule = schedule
+        function.delay = lambda **payload: schedule(payload)
+        return function
+    return register
+
+
+def enqueue(name, payload=None, key=None, run_at=None, priority=0, max_attempts=5):
+    """
+    Add a job to the queue. When this is called in a transaction the job
+    is only visible to the worker once the transaction is committed.
+    :param name: the name the job was registered with
+    :param payload: the keyword arguments of the job
+    :param key: when a job was already queued with the key, that job is returned instead
+    :param run_at: when to run the job, as soon as possible by default
+    :param priority: the higher the sooner the job is run
+    :param max_attempts:
+    :return: Job
+    """
+    fields = {
+        'name': name,
+        'payload': payload or {},
+        'run_at': run_at or timezone.now(),
+        'priority': priority,
+        'max_attempts': max_attempts,
+    }
+    if key is None:
+        return Job.objects.create(**fields)
+    return Job.objects.get_or_create(key=key, defaults=fields)[0]
+
+
+def backoff(attempts):
+    """
+    How long to wait before retrying a job that failed. The delay doubles with every
+    attempt up to a maximum, and is jittered so that jobs that failed together are
+    not all retried at the same time.
+    :param attempts: the number of times the job was run
+    :return: timedelta
+    """
+    delay = min(settings.JOB_RETRY_DELAY * 2 ** (attempts - 1), settings.JOB_RETRY_MAX_DELAY)
+    return timedelta(seconds=delay * random.uniform(0.5, 1))
+
+
+def claim(limit=1):
+    """
+    Take the jobs that are due off the queue, the ones with the highest priority
+    first. The rows are locked with SKIP LOCKED
+    so that workers running at the same time never claim the same job.
+
+    A claimed job is leased for JOB_LEASE seconds by pushing back its run_at. If the
+    worker dies before finishing it the job becomes due again and is claimed again,
+    which counts as an attempt. A job whose lease expired on its last attempt, e.g.
+    one that keeps crashing its worker, is marked as failed instead.
+    :param limit: the maximum number of jobs to claim
+    :return: list
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(Job.objects.select_for_update(skip_locked=True).filter(
+            status__in=(Job.QUEUED, Job.RUNNING), run_at__lte=now).order_by('-priority', 'run_at', 'id')[:limit])
+        abandoned = [due.pk for due in jobs if due.status == Job.RUNNING and due.attempts >= due.max_attempts]
+        if abandoned:
+            logger.warning('Jobs %s did not finish on their last attempt', abandoned)
+            Job.objects.filter(pk__in=abandoned).update(
+                status=Job.FAILED, last_error='The lease expired before the job finished.', updated_at=now)
+            jobs = [due for due in jobs if due.pk not in abandoned]
+        lease = now + timedelta(seconds=settings.JOB_LEASE)
+        Job.objects.filter(pk__in=[claimed.pk for claimed in jobs]).update(
+            status=Job.RUNNING, run_at=lease, attempts=F('attempts') + 1, updated_at=now)
+    for claimed in jobs:
+        claimed.status, claimed.run_at, claimed.attempts = Job.RUNNING, lease, claimed.attempts + 1
+    return jobs
+
+
+def run(claimed):
+    """
+    Run a claimed job. The work is done in a transaction, the database changes
+    of a job that fails are rolled back before the job is retried.
+    :param claimed: Job
+    :return: bool, whether the job succeeded
+    """
+    try:
+        function = registry.get(claimed.name)
+        if function is None:
+            raise LookupError('No job is registered as "{}".'.format(claimed.name))
+        with transaction.atomic():
+            function(**claimed.payload)
+    except Exception as error:
+        retry_later(claimed, error)
+        return False
+
+    claimed.status = Job.DONE
+    claimed.save(update_fields=['status', 'updated_at'])
+    return True
+
+
+def retry_later(failed, error):
+    """
+    Queue a job that failed to be run again after a backoff, or mark it
+    as failed once it ran out of attempts
+    :param failed: Job
+    :param error: the exception raised by the job
+    """
+    if isinstance(error, RetryJob) and error.payload is not None:
+        failed.payload = error.payload
+    logger.warning('Job %s failed on attempt %s: %r', failed, failed.attempts, error)
+    failed.last_error = traceback.format_exc()
+    if failed.attempts >= failed.max_attempts:
+        failed.status = Job.FAILED
+    else:
+        failed.status = Job.QUEUED
+        failed.run_at = timezone.now() + backoff(failed.attempts)
+    failed.save(update_fields=['payload', 'status', 'run_at', 'last_error', 'updated_at'])
+
+
+def run_pending(batch_size=10):
+    """
+    Run the jobs that are due until there are none left
+    :param batch_size: the number of jobs claimed at a time
+    :return: the number of jobs that were run
+    """
+    autodiscover_modules('jobs')
+    count = 0
+    while True:
+        jobs = claim(batch_size)
+        if not jobs:
+            return count
+        for claimed in jobs:
+            run(claimed)
+        count += len(jobs)
+
+
+@job('core.send_email', priority=10)
+def send_email(**kwargs):
+    """
+    Sends an email in the background, takes the same arguments as
+    core.mail_sender.send_email. The data has to be JSON.
+    """
+    mail_sender.send_email(**kwargs)
@@ -1,32 +1,149 @@
 import os
-from django.template.loader import render_to_string
-from django.core.mail import EmailMultiAlternatives
+import threading
+
+from django.template import Context, Node, Variable, engines
+from django.template.base import TextNode, VariableNode
+from django.template.defaulttags import LoadNode
+from django.template.loader_tags import BlockNode, ExtendsNode
+from django.template.loader import get_template
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.utils.html import strip_tags
+from django_inlinecss.templatetags.inlinecss import InlineCssNode
 
 
-def send_email(**kwargs):
+class PlaceholderContext(dict):
     """
-    This function sends an email based on the arguments provided. Arguments
-    include template, data, subject and to_email. template is the full
-    path of the email template. data is a dictionary containing all
-    the variables required by the template.
-    :param kwargs:
-    :return:
+    A template context in which every variable renders as itself, e.g. {{ username }}
+    renders "{{ username }}". Rendering a template with it gives back a template.
+    """
+
+    def __contains__(self, key):
+        return True
+
+    def __getitem__(self, key):
+        return '{{ %s }}' % key
+
+
+def is_static(template):
+    """
+    Check whether a template, and the templates it extends, only outputs text and
+    plain variables. Tags like if and for, and filters, give a different output
+    depending on the data so they cannot be rendered with placeholders.
+    :param template: a compiled django template
+    :return: bool
+    """
+    return all(is_static_node(node) for node in template.nodelist.get_nodes_by_type(Node))
+
+
+def is_static_node(node):
+    if isinstance(node, ExtendsNode):
+        parent = node.parent_name.resolve(Context())
+        return isinstance(parent, str) and is_static(get_template(parent).template)
+    if isinstance(node, VariableNode):
+        expression = node.filter_expression
+        return not expression.filters and isinstance(expression.var, Variable) and '.' not in expression.var.var
+    return isinstance(node, (TextNode, BlockNode, LoadNode, InlineCssNode))
+
+
+class EmailTemplate:
+    """
+    An email template that is rendered once with placeholders, which inlines its css,
+    and compiled again from the result. Inlining the css is what makes rendering an
+    email slow, this way it is only done once per template instead of once per email.
+    Templates that are not static are rendered in full for every email.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.template = get_template(name)
+        self.compiled = self.template
+        if is_static(self.template.template):
+            inlined = self.template.render(PlaceholderContext())
+            self.compiled = engines['django'].from_string(inlined)
+
+    def render(self, data):
+        """
+        :param data: the variables of the template
+        :return: the html of the email
+        """
+        return self.compiled.render(data)
+
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+
+def get_email_template(name):
+    """
+    Get the compiled email template, it is only compiled once per process
+    :param name:
+    :return: EmailTemplate
     """
+    with _templates_lock:
+        if name not in _templates:
+            _templates[name] = EmailTemplate(name)
+        return _templates[name]
+
 
+def make_email(template, data, subject, to_email, connection=None):
+    """
+    Build the email with the html version attached
+    :return: EmailMultiAlternatives
+    """
     from_email = os.getenv("EMAIL_HOST_SENDER")
 
     # render with dynamic value
-    html_content = render_to_string(kwargs['template'], kwargs['data'])
+    html_content = get_email_template(template).render(data)
 
     # Strip the html tag. So people can see the pure text at least.
     text_content = strip_tags(html_content)
 
     # create the email, and attach the HTML version as well.
-    msg = EmailMultiAlternatives(kwargs['subject'], text_content, from_email, [kwargs['to_email']])
+    msg = EmailMultiAlternatives(subject, text_content, from_email, [to_email], connection=connection)
     msg.attach_alternative(html_content, "text/html")
+    return msg
+
+
+def send_email(**kwargs):
+    """
+    This function sends an email based on the arguments provided. Arguments
+    include template, data, subject and to_email. template is the full
+    path of the email template. data is a dictionary containing all
+    the variables required by the template. An open connection can be
+    passed as connection to send many emails over it.
+    :param kwargs:
+    :return:
+    """
+    msg = make_email(kwargs['template'], kwargs['data'], kwargs['subject'], kwargs['to_email'],
+                     connection=kwargs.get('connection'))
     msg.send()
 
     response = {"message": "email sent"}
 
-    return response
\ No newline at end of file
+    return response
+
+
+def send_mass_email(template, subject, recipients, connection=None):
+    """
+    Sends the same email template to many recipients over a single connection.
+    An email that cannot be built or sent does not stop the others from being sent.
+    :param template: the full path of the email template
+    :param subject:
+    :param recipients: an iterable of (to_email, data) where data holds the variables of the template
+    :param connection: the connection to use, a new one from the configured backend by default
+    :return: a dict of the emails that failed and the errors they failed with
+    """
+    failed = {}
+    connection = connection or get_connection()
+    # only close the connection if it was opened here
+    opened = connection.open()
+    try:
+        for to_email, data in recipients:
+            try:
+                connection.send_messages([make_email(template, data, subject, to_email, connection=connection)])
+            except Exception as error:
+                failed[to_email] = error
+    finally:
+        if opened:
+            connection.close()
+    return failed
@@ -0,0 +1,85 @@
+import threading
+import time
+import uuid
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test.client import RequestFactory
+from django.urls import reverse
+
+from authors.apps.articles.models import Article
+from authors.apps.authentication.models import User
+from authors.apps.profiles.models import Profile
+
+
+class Command(BaseCommand):
+    help = ('Compares the requests per second of the article list and detail when a connection is opened for '
+            'each request and when connections are kept open (CONN_MAX_AGE), on the configured database')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='The number of requests made to each url')
+        parser.add_argument('--concurrency', type=int, default=4, help='The number of threads making the requests')
+        parser.add_argument('--max-age', type=int, default=600, help='The CONN_MAX_AGE of the persistent run')
+
+    def handle(self, *args, **options):
+        user, article = self.create_data()
+        try:
+            # the requests go through the wsgi handler so that connections are closed as in production,
+            # the test client keeps them open
+            handler = WSGIHandler()
+            headers = {'HTTP_AUTHORIZATION': 'Token {}'.format(user.token)}
+            urls = [
+                ('list', reverse('articles:articles-list')),
+                ('detail', reverse('articles:articles-detail', kwargs={'slug': article.slug})),
+            ]
+            settings_dict = connections.databases[DEFAULT_DB_ALIAS]
+            max_age = settings_dict['CONN_MAX_AGE']
+            for name, url in urls:
+                for conn_max_age in (0, options['max_age']):
+                    settings_dict['CONN_MAX_AGE'] = conn_max_age
+                    seconds = self.run(handler, url, headers, options['requests'], options['concurrency'])
+                    self.report(name, conn_max_age, options['requests'], seconds)
+            settings_dict['CONN_MAX_AGE'] = max_age
+        finally:
+            article.delete()
+            user.delete()
+
+    def report(self, name, conn_max_age, count, seconds):
+        self.stdout.write('{:<8} CONN_MAX_AGE={:<6} {:>6} request(s) in {:6.2f}s, {:8.1f} request(s)/s'.format(
+            name, conn_max_age, count, seconds, count / seconds))
+
+    def create_data(self):
+        name = 'benchmark-{}'.format(uuid.uuid4().hex[:8])
+        user = User.objects.create_user(name, '{}@example.com'.format(name), uuid.uuid4().hex)
+        Profile.objects.create(user=user)
+        article = Article(author=user, title='Benchmark', description='Benchmark', body='Benchmark ' * 200,
+                          published=True)
+        article.save()
+        # the threads open their own connections
+        connection.close()
+        return user, article
+
+    def run(self, handler, url, headers, count, concurrency):
+        threads = [
+            threading.Thread(target=self.make_requests, args=(
+                handler, url, headers, count // concurrency + (index < count % concurrency)))
+            for index in range(concurrency)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - started
+
+    @staticmethod
+    def make_requests(handler, url, headers, count):
+        factory = RequestFactory()
+        for _ in range(count):
+            response = handler(factory.get(url, **headers).environ, lambda status, response_headers: None)
+            # sends request_finished, which closes the connection unless it is persistent
+            response.close()
+            if response.status_code != 200:
+                raise AssertionError('{} answered {}'.format(url, response.status_code))
+        connections.close_all()
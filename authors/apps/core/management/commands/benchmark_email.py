@@ -0,0 +1,49 @@
+import time
+
+from django.core.mail import EmailMultiAlternatives
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.test.utils import override_settings
+from django.utils.html import strip_tags
+
+from authors.apps.core.mail_sender import send_mass_email
+
+
+def send_without_batching(template, data, subject, to_email):
+    """
+    Sends an email the way it was sent before the batch api, the template is
+    rendered in full and the email is sent over a new connection.
+    """
+    html_content = render_to_string(template, data)
+    msg = EmailMultiAlternatives(subject, strip_tags(html_content), None, [to_email])
+    msg.attach_alternative(html_content, "text/html")
+    msg.send()
+
+
+class Command(BaseCommand):
+    help = 'Compares sending emails one by one with sending them in a batch, using the in memory email backend'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=10000, help='The number of emails to send in a batch')
+        parser.add_argument('--single-count', type=int, default=20, help='The number of emails to send one by one')
+        parser.add_argument('--template', default='article_created.html')
+
+    def handle(self, *args, **options):
+        template = options['template']
+        data = {'username': 'reader', 'article_title': 'A title', 'author': 'writer', 'title': 'A title',
+                'unsubscribe_url': 'http://localhost:8000/unsubscribe', 'activation_link': 'http://localhost:8000'}
+
+        with override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'):
+            started = time.perf_counter()
+            for number in range(options['single_count']):
+                send_without_batching(template, data, 'Benchmark', 'user{}@example.com'.format(number))
+            self.report('one by one', options['single_count'], time.perf_counter() - started)
+
+            started = time.perf_counter()
+            failed = send_mass_email(template, 'Benchmark', (
+                ('user{}@example.com'.format(number), data) for number in range(options['count'])))
+            self.report('batch', options['count'] - len(failed), time.perf_counter() - started)
+
+    def report(self, name, count, seconds):
+        self.stdout.write('{:<12} {:>6} email(s) in {:8.2f}s, {:8.1f} email(s)/s, {:8.3f}ms each'.format(
+            name, count, seconds, count / seconds, seconds / count * 1000))
@@ -0,0 +1,102 @@
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+# the application, the worker class and the python modules each mode needs
+MODES = {
+    'sync': ('authors.wsgi:application', 'sync', ()),
+    'gthread': ('authors.wsgi:application', 'gthread', ()),
+    'gevent': ('authors.wsgi:application', 'gevent', ('gevent', 'psycogreen')),
+    'asgi': ('authors.asgi:application', 'uvicorn.workers.UvicornWorker', ('uvicorn',)),
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = ('Compares the deployment modes of authors/gunicorn_config.py: sync, threaded and gevent workers and the '
+            'ASGI application on uvicorn workers. A server is started in each mode and load tested with load_test, '
+            'the modes whose packages are not installed are skipped.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+        parser.add_argument('--workers', type=int, default=2, help='The number of processes of each server')
+        parser.add_argument('--concurrency', type=int, default=32, help='The number of concurrent clients')
+        parser.add_argument('--duration', type=float, default=15, help='The seconds each endpoint is requested for')
+        parser.add_argument('--endpoints', nargs='+', help='Only request these endpoints, see load_test')
+        parser.add_argument('--output', help='Save the results of every mode to this JSON file')
+
+    def handle(self, *args, **options):
+        results = {}
+        for mode in options['modes']:
+            application, worker_class, modules = MODES[mode]
+            missing = [module for module in modules if importlib.util.find_spec(module) is None]
+            if missing:
+                self.stdout.write('Skipping {}, {} is not installed'.format(mode, ', '.join(missing)))
+                continue
+            self.stdout.write(self.style.MIGRATE_HEADING('{} workers'.format(mode)))
+            results[mode] = self.benchmark(application, worker_class, options)
+
+        self.report(results)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
+
+    def benchmark(self, application, worker_class, options):
+        port = free_port()
+        environ = dict(os.environ, GUNICORN_WORKER_CLASS=worker_class, WEB_CONCURRENCY=str(options['workers']),
+                       GUNICORN_LOG_LEVEL='warning')
+        # gunicorn 19 cannot be run with -m, its entry point is called instead
+        server = subprocess.Popen(
+            [sys.executable, '-c', 'from gunicorn.app.wsgiapp import run; run()', application,
+             '-c', 'python:authors.gunicorn_config', '--bind', '127.0.0.1:{}'.format(port),
+             '--access-logfile', os.devnull],
+            env=environ)
+        try:
+            self.wait_for(server, port)
+            with tempfile.NamedTemporaryFile(suffix='.json') as output:
+                call_command('load_test', base_url='http://127.0.0.1:{}'.format(port),
+                             concurrency=options['concurrency'], duration=options['duration'],
+                             endpoints=options['endpoints'], output=output.name, stdout=self.stdout)
+                return json.load(output)['endpoints']
+        finally:
+            server.terminate()
+            server.wait()
+
+    @staticmethod
+    def wait_for(server, port, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError('The server exited with {}'.format(server.returncode))
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError('The server did not start in {} seconds'.format(timeout))
+
+    def report(self, results):
+        """
+        Print the throughput and the 95th percentile latency of every endpoint in every mode
+        """
+        if not results:
+            return
+        modes = list(results)
+        self.stdout.write(self.style.MIGRATE_HEADING('request(s)/s, p95 ms'))
+        self.stdout.write('{:<14}'.format('') + ''.join('{:>20}'.format(mode) for mode in modes))
+        for endpoint in results[modes[0]]:
+            self.stdout.write('{:<14}'.format(endpoint) + ''.join(
+                '{requests_per_second:>12.1f}, {p95_ms:>6.1f}'.format(**results[mode][endpoint]) for mode in modes))
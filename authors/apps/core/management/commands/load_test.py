@@ -0,0 +1,187 @@
+import json
+import random
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import namedtuple
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from django.utils import timezone
+
+from authors.apps.articles.models import Article
+from authors.apps.articles.pagination import FeedPagination
+from authors.apps.authentication.models import User
+
+Sample = namedtuple('Sample', 'seconds ok')
+
+
+def percentile(values, fraction):
+    """
+    :param values: sorted list of numbers
+    :param fraction: between 0 and 1
+    :return: the nearest rank percentile of the values
+    """
+    if not values:
+        return 0
+    return values[min(int(fraction * len(values)), len(values) - 1)]
+
+
+def summarize(samples, seconds):
+    """
+    :param samples: list of Sample
+    :param seconds: the duration of the run
+    :return: dict of the throughput and latencies, in milliseconds, of the samples
+    """
+    latencies = sorted(sample.seconds * 1000 for sample in samples)
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for sample in samples if not sample.ok),
+        'requests_per_second': round(len(samples) / seconds, 1),
+        'mean_ms': round(sum(latencies) / len(latencies), 1) if latencies else 0,
+        'p50_ms': round(percentile(latencies, 0.5), 1),
+        'p95_ms': round(percentile(latencies, 0.95), 1),
+        'p99_ms': round(percentile(latencies, 0.99), 1),
+        'max_ms': round(latencies[-1], 1) if latencies else 0,
+    }
+
+
+def change(before, after):
+    """
+    :return: the change from before to after, in percent
+    """
+    return (after - before) / before * 100 if before else 0
+
+
+class Command(BaseCommand):
+    help = ('Load tests the hot endpoints of a running server: the article list, detail and search, the comments, '
+            'the notifications and the statistics. Each endpoint is requested by concurrent clients for a while, '
+            'the throughput and latency percentiles are printed and can be saved to compare runs. The articles and '
+            'users are sampled from the configured database, seed it with seed_benchmark_data.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://localhost:8000', help='The server to load test')
+        parser.add_argument('--concurrency', type=int, default=16, help='The number of concurrent clients')
+        parser.add_argument('--duration', type=float, default=30, help='The seconds each endpoint is requested for')
+        parser.add_argument('--users', type=int, default=100, help='The number of users the clients log in as')
+        parser.add_argument('--articles', type=int, default=1000, help='The number of articles requested')
+        parser.add_argument('--endpoints', nargs='+', help='Only request these endpoints')
+        parser.add_argument('--timeout', type=float, default=30, help='The seconds to wait for a response')
+        parser.add_argument('--output', help='Save the results to this JSON file')
+        parser.add_argument('--compare', help='Compare the results with the ones saved to this JSON file')
+
+    def handle(self, *args, **options):
+        self.timeout = options['timeout']
+        tokens, slugs, words = self.sample(options['users'], options['articles'])
+        # the first pages are the ones read the most, the list is not requested past its last page
+        self.pages = max(min(Article.objects.filter(published=True).count() // FeedPagination.page_size, 50), 1)
+        endpoints = self.endpoints(slugs, words, options['endpoints'])
+
+        results = {}
+        for name, make_path in endpoints.items():
+            samples, seconds = self.run(options['base_url'], make_path, tokens, options['concurrency'],
+                                        options['duration'])
+            results[name] = summarize(samples, seconds)
+            self.report(name, results[name])
+
+        run = {
+            'started_at': timezone.now().isoformat(),
+            'commit': self.commit(),
+            'base_url': options['base_url'],
+            'concurrency': options['concurrency'],
+            'duration': options['duration'],
+            'endpoints': results,
+        }
+        if options['compare']:
+            self.compare(results, options['compare'])
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(run, output, indent=2)
+
+    def sample(self, users, articles):
+        """
+        Pick users and published articles at random
+        :return: the tokens of the users, the slugs of the articles and words of their titles
+        """
+        user_ids = list(User.objects.filter(is_active=True).values_list('pk', flat=True).order_by('?')[:users])
+        tokens = [user.token for user in User.objects.filter(pk__in=user_ids)]
+        titles = list(Article.objects.filter(published=True).values_list('slug', 'title').order_by('?')[:articles])
+        if not tokens or not titles:
+            raise CommandError('There are no users or published articles, run seed_benchmark_data first')
+        words = [word for _, title in titles for word in title.split() if len(word) > 3]
+        return tokens, [slug for slug, _ in titles], words or ['article']
+
+    def endpoints(self, slugs, words, names=None):
+        """
+        :param names: the endpoints to request, all of them by default
+        :return: dict of the name of each endpoint and a function that makes the path of a request to it
+        """
+        endpoints = {
+            'list': lambda: '{}?page={}'.format(reverse('articles:articles-list'), random.randint(1, self.pages)),
+            'detail': lambda: reverse('articles:articles-detail', kwargs={'slug': random.choice(slugs)}),
+            'search': lambda: '{}?search={}'.format(reverse('articles:search-filter'), random.choice(words)),
+            'comments': lambda: reverse('articles:comments', kwargs={'slug': random.choice(slugs)}),
+            'notifications': lambda: reverse('notifications:notifications'),
+            'stats': lambda: reverse('articles:stats'),
+        }
+        unknown = set(names or ()) - set(endpoints)
+        if unknown:
+            raise CommandError('Unknown endpoint(s) {}, choose from {}'.format(
+                ', '.join(sorted(unknown)), ', '.join(endpoints)))
+        return {name: endpoints[name] for name in names} if names else endpoints
+
+    def run(self, base_url, make_path, tokens, concurrency, duration):
+        samples, lock = [], threading.Lock()
+        deadline = time.perf_counter() + duration
+
+        def client():
+            token = random.choice(tokens)
+            while time.perf_counter() < deadline:
+                sample = self.request(base_url + make_path(), token)
+                with lock:
+                    samples.append(sample)
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=client) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return samples, time.perf_counter() - started
+
+    def request(self, url, token):
+        request = urllib.request.Request(url, headers={'Authorization': 'Token {}'.format(token)})
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+            ok = True
+        except (urllib.error.URLError, OSError):
+            # HTTPError is a URLError, the error responses are counted too
+            ok = False
+        return Sample(time.perf_counter() - started, ok)
+
+    def report(self, name, result):
+        self.stdout.write(
+            '{:<14} {requests:>7} request(s) {errors:>5} error(s) {requests_per_second:8.1f} request(s)/s '
+            'mean {mean_ms:7.1f}ms p50 {p50_ms:7.1f}ms p95 {p95_ms:7.1f}ms p99 {p99_ms:7.1f}ms'.format(
+                name, **result))
+
+    def compare(self, results, path):
+        with open(path) as previous_file:
+            previous = json.load(previous_file)['endpoints']
+        self.stdout.write('Compared with {}:'.format(path))
+        for name, result in results.items():
+            if name not in previous:
+                continue
+            self.stdout.write('{:<14} {:+7.1f}% request(s)/s p50 {:+7.1f}% p95 {:+7.1f}% p99 {:+7.1f}%'.format(
+                name, *(change(previous[name][key], result[key]) for key in (
+                    'requests_per_second', 'p50_ms', 'p95_ms', 'p99_ms'))))
+
+    def commit(self):
+        try:
+            return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,63 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils.module_loading import autodiscover_modules
+
+from authors.apps.core.jobs import claim, run
+
+
+class Command(BaseCommand):
+    help = 'Runs the background jobs as they are queued'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=1, help='The number of jobs to run at the same time')
+        parser.add_argument('--sleep', type=float, default=1,
+                            help='How long to wait, in seconds, before looking for jobs when the queue is empty')
+        parser.add_argument('--batch-size', type=int, default=1,
+                            help='The number of jobs each thread claims at a time')
+        parser.add_argument('--once', action='store_true', help='Exit once there are no jobs left to run')
+
+    def handle(self, *args, **options):
+        autodiscover_modules('jobs')
+
+        # finish the jobs that are running before exiting
+        stopping = threading.Event()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signal_number, lambda *args: stopping.set())
+
+        threads = [threading.Thread(target=self.work, args=(stopping, options), daemon=True)
+                   for _ in range(options['concurrency'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(1)
+
+    def work(self, stopping, options):
+        """
+        Claim and run jobs until the worker is stopped. Each thread uses its own database connection.
+        :param stopping: threading.Event
+        :param options:
+        """
+        try:
+            while not stopping.is_set():
+                if self.run_jobs(options['batch_size']):
+                    continue
+                if options['once']:
+                    return
+                stopping.wait(options['sleep'])
+        finally:
+            connection.close()
+
+    def run_jobs(self, batch_size):
+        """
+        :param batch_size:
+        :return: the number of jobs that were run
+        """
+        jobs = claim(batch_size)
+        for claimed in jobs:
+            run(claimed)
+            self.stdout.write('Ran {}.'.format(claimed))
+        return len(jobs)
@@ -0,0 +1,183 @@
+import itertools
+import random
+import time
+import uuid
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.template.defaultfilters import slugify
+from notifications.models import Notification
+
+from authors.apps.articles.models import Article, ArticleRating, ArticleView, Comment, FavouriteArticle, Tag
+from authors.apps.authentication.models import User
+from authors.apps.core.test_helpers import fake, make_user
+from authors.apps.profiles.models import Profile
+
+
+def spread_pairs(total, left, right, offset=0):
+    """
+    Make distinct (left, right) pairs of ids, spread evenly over the left ids: each left
+    id is paired with about total / len(left) right ids, spaced evenly from a start that
+    depends on the left id. The pairs stay distinct while there are enough right ids.
+    :param total: the number of pairs
+    :param left: list of ids
+    :param right: list of ids
+    :param offset: skip this many right ids for each left id, to make pairs distinct from another call
+    """
+    per_left = -(-total // len(left)) + offset
+    step = max(len(right) // per_left, 1)
+    for number in range(total):
+        index, position = number % len(left), number // len(left) + offset
+        # a multiplicative hash scatters the starts
+        start = index * 2654435761 % len(right)
+        yield left[index], right[(start + position * step) % len(right)]
+
+
+class Command(BaseCommand):
+    help = ('Fills the database with a synthetic dataset for the load tests: users and their profiles, followers, '
+            'tags, articles, comments, reactions, ratings, views, favourites and notifications. Use a database of '
+            'its own, the rows are inserted in bulk without the signals of the models.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100000)
+        parser.add_argument('--follows', type=int, default=20, help='The number of profiles each profile follows')
+        parser.add_argument('--tags', type=int, default=1000)
+        parser.add_argument('--articles', type=int, default=1000000)
+        parser.add_argument('--comments', type=int, default=1000000)
+        parser.add_argument('--replies', type=int, default=250000)
+        parser.add_argument('--likes', type=int, default=2000000)
+        parser.add_argument('--dislikes', type=int, default=250000)
+        parser.add_argument('--ratings', type=int, default=500000)
+        parser.add_argument('--views', type=int, default=2000000)
+        parser.add_argument('--favourites', type=int, default=500000)
+        parser.add_argument('--notifications', type=int, default=500000)
+        parser.add_argument('--chunk-size', type=int, default=5000, help='The number of rows inserted at a time')
+        parser.add_argument('--seed', type=int, default=None, help='Seeds the random generators to repeat a dataset')
+        parser.add_argument('--skip-search-vectors', action='store_true',
+                            help='Do not compute the full text search vectors of the articles')
+
+    def handle(self, *args, **options):
+        if options['seed'] is not None:
+            random.seed(options['seed'])
+            fake.seed_instance(options['seed'])
+        self.chunk_size = options['chunk_size']
+        # makes the usernames, emails and slugs unique to this run
+        self.run = uuid.uuid4().hex[:6]
+        # the texts are picked from a pool, generating a million of them would take longer than inserting them
+        self.texts = [fake.text(max_nb_chars=2000) for _ in range(200)]
+        self.sentences = [fake.sentence() for _ in range(1000)]
+        started = time.perf_counter()
+
+        users = self.seed_users(options['users'])
+        profiles = self.bulk(Profile, (Profile(user_id=user) for user in users), 'profiles')
+        follows = ((follower, followed) for follower, followed in spread_pairs(
+            options['follows'] * len(profiles), profiles, profiles) if follower != followed)
+        self.bulk(Profile.follows.through, (Profile.follows.through(from_profile_id=follower, to_profile_id=followed)
+                                            for follower, followed in follows), 'follows')
+        tags = self.seed_tags(options['tags'])
+        articles = self.seed_articles(options['articles'], users)
+        self.bulk(Article.tags.through, (Article.tags.through(article_id=article, tag_id=tag) for article, tag in
+                                         spread_pairs(len(articles) * 2, articles, tags)), 'article tags')
+        self.seed_comments(options['comments'], options['replies'], articles, profiles)
+        self.seed_reactions(options, articles, users)
+        self.seed_notifications(options['notifications'], users)
+
+        call_command('update_comment_paths', stdout=self.stdout)
+        call_command('reconcile_article_counters', stdout=self.stdout)
+        if not options['skip_search_vectors']:
+            call_command('update_search_vectors', stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS('Seeded the dataset in {:.1f}s'.format(time.perf_counter() - started)))
+
+    def bulk(self, model, objects, name, ids=True):
+        """
+        Insert the objects chunk_size at a time, each chunk in a transaction
+        :param model:
+        :param objects: an iterable of unsaved instances
+        :param name: the name of the rows in the report
+        :param ids: whether to return the ids of the rows
+        :return: list of the ids of the rows
+        """
+        started = time.perf_counter()
+        created, objects = [], iter(objects)
+        count = 0
+        while True:
+            chunk = list(itertools.islice(objects, self.chunk_size))
+            if not chunk:
+                break
+            with transaction.atomic():
+                model._base_manager.bulk_create(chunk)
+            count += len(chunk)
+            if ids:
+                created.extend(instance.pk for instance in chunk)
+        seconds = time.perf_counter() - started
+        self.stdout.write('{:<14} {:>9} row(s) in {:7.1f}s, {:8.0f} row(s)/s'.format(
+            name, count, seconds, count / seconds if seconds else 0))
+        return created
+
+    def seed_users(self, count):
+        # hashing a password takes long on purpose, every user gets the same one
+        password = make_password(make_user()['password'])
+        users = (
+            User(username='{}-{}{}'.format(fake.user_name(), self.run, number),
+                 email='{}{}@{}'.format(self.run, number, fake.free_email_domain()),
+                 password=password, is_verified=True)
+            for number in range(count))
+        return self.bulk(User, users, 'users')
+
+    def seed_tags(self, count):
+        words = fake.words(nb=count)
+        tags = (Tag(tag='{}-{}'.format(words[number][:20], number),
+                    slug='{}-{}-{}'.format(words[number][:20], self.run, number))
+                for number in range(count))
+        return self.bulk(Tag, tags, 'tags')
+
+    def seed_articles(self, count, users):
+        def article(number):
+            title = random.choice(self.sentences)
+            return Article(
+                author_id=random.choice(users), title=title, description=random.choice(self.sentences),
+                body=random.choice(self.texts), slug='{}-{}{}'.format(slugify(title)[:230], self.run, number),
+                # most of the articles are published
+                published=random.random() < 0.9)
+        return self.bulk(Article, (article(number) for number in range(count)), 'articles')
+
+    def seed_comments(self, count, replies, articles, profiles):
+        comments = self.bulk(Comment, (
+            Comment(article_id=articles[number % len(articles)], author_id=random.choice(profiles),
+                    body=random.choice(self.sentences))
+            for number in range(count)), 'comments')
+        if not comments:
+            return
+
+        def reply():
+            # the n-th comment was made on the article n modulo the number of articles
+            parent = random.randrange(len(comments))
+            return Comment(article_id=articles[parent % len(articles)], parent_id=comments[parent],
+                           author_id=random.choice(profiles), body=random.choice(self.sentences))
+        self.bulk(Comment, (reply() for _ in range(replies)), 'replies', ids=False)
+
+    def seed_reactions(self, options, articles, users):
+        self.bulk(Article.likes.through, (Article.likes.through(article_id=article, user_id=user) for article, user in
+                                          spread_pairs(options['likes'], articles, users)), 'likes', ids=False)
+        # the dislikes come after the likes of each article, a user does not both like and dislike an article
+        likes_per_article = -(-options['likes'] // len(articles))
+        self.bulk(Article.dislikes.through, (
+            Article.dislikes.through(article_id=article, user_id=user) for article, user in
+            spread_pairs(options['dislikes'], articles, users, offset=likes_per_article)), 'dislikes', ids=False)
+        self.bulk(ArticleRating, (
+            ArticleRating(article_id=article, rated_by_id=user, rating=random.randint(1, 5))
+            for article, user in spread_pairs(options['ratings'], articles, users)), 'ratings', ids=False)
+        self.bulk(ArticleView, (ArticleView(article_id=article, user_id=user) for article, user in
+                                spread_pairs(options['views'], articles, users)), 'views', ids=False)
+        self.bulk(FavouriteArticle, (FavouriteArticle(article_id=article, user_id=user) for article, user in
+                                     spread_pairs(options['favourites'], articles, users)), 'favourites', ids=False)
+
+    def seed_notifications(self, count, users):
+        user_type = ContentType.objects.get_for_model(User)
+        self.bulk(Notification, (
+            Notification(recipient_id=recipient, actor_content_type=user_type, actor_object_id=str(actor),
+                         verb='follow', description='You have a new follower')
+            for recipient, actor in spread_pairs(count, users, users)), 'notifications', ids=False)
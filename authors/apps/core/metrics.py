@@ -0,0 +1,190 @@
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+# the metrics of the request being served by the current thread
+state = threading.local()
+
+
+class RequestMetrics:
+    """
+    What a request cost: its queries, the time spent in the database, in the
+    serializers and in the renderer, its duration and the size of its response
+    """
+    timings = ('sql', 'serializer', 'renderer')
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = Counter()
+        self.duration = 0.0
+        self.response_bytes = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # installed with execute_wrapper on the connections, counts and times the queries
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.seconds['sql'] += time.perf_counter() - started
+
+    def as_dict(self):
+        return {
+            'queries': self.queries,
+            'sql_ms': round(self.seconds['sql'] * 1000, 3),
+            'serializer_ms': round(self.seconds['serializer'] * 1000, 3),
+            'renderer_ms': round(self.seconds['renderer'] * 1000, 3),
+            'duration_ms': round(self.duration * 1000, 3),
+            'response_bytes': self.response_bytes,
+        }
+
+    def server_timing(self):
+        """
+        :return: the value of the Server-Timing header of the response
+        """
+        return ', '.join([
+            'db;desc="{} queries";dur={:.3f}'.format(self.queries, self.seconds['sql'] * 1000),
+            'serializer;dur={:.3f}'.format(self.seconds['serializer'] * 1000),
+            'renderer;dur={:.3f}'.format(self.seconds['renderer'] * 1000),
+            'total;dur={:.3f}'.format(self.duration * 1000),
+        ])
+
+
+@contextmanager
+def recording(metrics):
+    """
+    Record the queries made by the current thread in the block, and the timings of timed
+    """
+    state.metrics = metrics
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+            yield metrics
+    finally:
+        state.metrics = None
+
+
+@contextmanager
+def timer(name):
+    """
+    Add the time the block takes to the timing called name of the request being recorded, if any
+    """
+    metrics = getattr(state, 'metrics', None)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if metrics is not None:
+            metrics.seconds[name] += time.perf_counter() - started
+
+
+def timed(name, function):
+    """
+    Wrap a function so that the time it takes is added to the timing called name, see timer
+    """
+    def wrapper(*args, **kwargs):
+        with timer(name):
+            return function(*args, **kwargs)
+    return wrapper
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def labels(**values):
+    return '{' + ','.join('{}="{}"'.format(name, escape(value)) for name, value in values.items()) + '}'
+
+
+class Registry:
+    """
+    The totals of the recorded requests of each view, in this process, exposed in the
+    text format of Prometheus
+    """
+    # the upper bounds of the buckets of the durations, in seconds
+    buckets = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+    summaries = (
+        ('sql_queries', 'The number of SQL queries made by the requests'),
+        ('sql_seconds', 'The time the requests spent in SQL queries'),
+        ('serializer_seconds', 'The time the requests spent in serializers'),
+        ('renderer_seconds', 'The time the requests spent rendering their response'),
+        ('response_bytes', 'The size of the responses'),
+    )
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.requests = Counter()
+        # the sums of the summaries and of the durations, by (view, method)
+        self.sums = defaultdict(Counter)
+        self.counts = Counter()
+        self.histograms = defaultdict(lambda: [0] * len(self.buckets))
+
+    def observe(self, view, method, status, metrics):
+        """
+        :param view: the name of the url, e.g. articles:articles-list
+        :param method:
+        :param status: the status code of the response
+        :param metrics: RequestMetrics
+        """
+        key = (view, method)
+        with self.lock:
+            self.requests[(view, method, status)] += 1
+            self.counts[key] += 1
+            sums = self.sums[key]
+            sums['sql_queries'] += metrics.queries
+            for timing in RequestMetrics.timings:
+                sums['{}_seconds'.format(timing)] += metrics.seconds[timing]
+            sums['response_bytes'] += metrics.response_bytes
+            sums['duration_seconds'] += metrics.duration
+            histogram = self.histograms[key]
+            for index, bound in enumerate(self.buckets):
+                if metrics.duration <= bound:
+                    histogram[index] += 1
+
+    def render(self):
+        """
+        :return: the metrics in the text format of Prometheus
+        """
+        with self.lock:
+            lines = [
+                '# HELP authors_http_requests_total The recorded requests',
+                '# TYPE authors_http_requests_total counter',
+            ]
+            for (view, method, status), count in sorted(self.requests.items()):
+                lines.append('authors_http_requests_total{} {}'.format(
+                    labels(view=view, method=method, status=status), count))
+            lines.extend(self.render_histogram())
+            for name, description in self.summaries:
+                lines.extend(self.render_summary(name, description))
+        return '\n'.join(lines) + '\n'
+
+    def render_histogram(self):
+        name = 'authors_http_request_duration_seconds'
+        yield '# HELP {} The duration of the requests'.format(name)
+        yield '# TYPE {} histogram'.format(name)
+        for (view, method), histogram in sorted(self.histograms.items()):
+            for bound, count in zip(self.buckets, histogram):
+                yield '{}_bucket{} {}'.format(name, labels(view=view, method=method, le=bound), count)
+            count = self.counts[(view, method)]
+            yield '{}_bucket{} {}'.format(name, labels(view=view, method=method, le='+Inf'), count)
+            yield '{}_sum{} {}'.format(
+                name, labels(view=view, method=method), self.sums[(view, method)]['duration_seconds'])
+            yield '{}_count{} {}'.format(name, labels(view=view, method=method), count)
+
+    def render_summary(self, name, description):
+        yield '# HELP authors_http_request_{} {}'.format(name, description)
+        yield '# TYPE authors_http_request_{} summary'.format(name)
+        for (view, method), count in sorted(self.counts.items()):
+            yield 'authors_http_request_{}_sum{} {}'.format(
+                name, labels(view=view, method=method), self.sums[(view, method)][name])
+            yield 'authors_http_request_{}_count{} {}'.format(name, labels(view=view, method=method), count)
+
+
+registry = Registry()
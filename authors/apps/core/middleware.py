@@ -0,0 +1,117 @@
+import json
+import logging
+import random
+import time
+
+import jwt
+from django.conf import settings
+from rest_framework.authentication import get_authorization_header
+from rest_framework.permissions import SAFE_METHODS
+
+from authors.apps.core import metrics
+from authors.apps.core.cache import Namespace
+from authors.apps.core.routers import reading_from_replicas
+
+logger = logging.getLogger('authors.metrics')
+
+
+class MetricsMiddleware:
+    """
+    Records the queries, the timings and the size of the response of a sample of the
+    requests, METRICS_SAMPLE_RATE of them. Each is logged as a line of JSON and added
+    to the totals of its view exposed at /api/metrics/.
+
+    The serializers and renderers of the views that use
+    authors.apps.core.views.InstrumentedViewMixin are timed too. With METRICS_SERVER_TIMING
+    every request is recorded and its timings sent in the Server-Timing header.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sampled = random.random() < settings.METRICS_SAMPLE_RATE
+        if not sampled and not settings.METRICS_SERVER_TIMING:
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        with metrics.recording(metrics.RequestMetrics()) as recorded:
+            response = self.get_response(request)
+        recorded.duration = time.perf_counter() - started
+        recorded.response_bytes = 0 if response.streaming else len(response.content)
+
+        if sampled:
+            view = request.resolver_match.view_name if request.resolver_match else 'unresolved'
+            metrics.registry.observe(view, request.method, response.status_code, recorded)
+            logger.info(json.dumps({
+                'view': view, 'method': request.method, 'path': request.path, 'status': response.status_code,
+                **recorded.as_dict()
+            }, sort_keys=True))
+        if settings.METRICS_SERVER_TIMING:
+            response['Server-Timing'] = recorded.server_timing()
+        return response
+
+
+class ReplicaMiddleware:
+    """
+    Lets the safe requests read from the replicas, see authors.apps.core.routers,
+    unless the client wrote in the last DB_REPLICA_PIN_SECONDS seconds: the replicas
+    could still be behind on its write.
+
+    The clients are identified by their user, and by their address for the writes
+    made before they have a token, e.g. signing up. The pins are kept in the cache,
+    which has to be shared between the processes for them to be seen by all of them.
+    """
+    pins = Namespace('core.db:pinned', timeout=settings.DB_REPLICA_PIN_SECONDS)
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            # everything is read from the default database, there is nothing to pin
+            return self.get_response(request)
+        if request.method not in SAFE_METHODS:
+            response = self.get_response(request)
+            self.pin(request)
+            return response
+        if self.is_pinned(request):
+            return self.get_response(request)
+        with reading_from_replicas():
+            return self.get_response(request)
+
+    def pin(self, request):
+        self.pins.set(self.address_key(request), True)
+        # set by the authentication of the rest framework
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            self.pins.set(self.user_key(user.pk), True)
+
+    def is_pinned(self, request):
+        if self.pins.get(self.address_key(request)):
+            return True
+        user_id = self.token_user_id(request)
+        return user_id is not None and bool(self.pins.get(self.user_key(user_id)))
+
+    @staticmethod
+    def address_key(request):
+        # the first address is the client's when behind a proxy
+        address = request.META.get('HTTP_X_FORWARDED_FOR') or request.META.get('REMOTE_ADDR', '')
+        return 'address:{}'.format(address.split(',')[0].strip())
+
+    @staticmethod
+    def user_key(user_id):
+        return 'user:{}'.format(user_id)
+
+    @staticmethod
+    def token_user_id(request):
+        """
+        :return: the id of the user of the token, None when there is no valid token
+        """
+        header = get_authorization_header(request).split()
+        if len(header) != 2:
+            return None
+        try:
+            return jwt.decode(header[1], settings.SECRET_KEY)['id']
+        except (jwt.InvalidTokenError, KeyError):
+            return None
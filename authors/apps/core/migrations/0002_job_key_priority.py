@@ -0,0 +1,31 @@
+# Generated by Django 2.1.2 on 2026-10-18 02:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_job'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='job',
+            name='core_job_due_idx',
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='key',
+            field=models.CharField(max_length=255, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='priority',
+            field=models.SmallIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', '-priority', 'run_at'], name='core_job_due_idx'),
+        ),
+    ]
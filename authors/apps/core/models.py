@@ -1,6 +1,10 @@
+from django.contrib.postgres.fields import JSONField
+from django.core.signals import request_finished, request_started
 from django.db import models
 from django.utils import timezone
 
+from authors.apps.core.db.health import check_idle_connections, mark_idle_connections
+
 
 class TimestampsMixin(models.Model):
     """
@@ -67,3 +71,48 @@ class SoftDeleteMixin(models.Model):
         """
         self.deleted_at = None
         self.save()
+
+
+class Job(TimestampsMixin):
+    """
+    A unit of work to be run in the background by the worker, see core.jobs.
+    The name is the name the function that does the work was registered with
+    and the payload holds the keyword arguments it is called with.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    )
+
+    name = models.CharField(max_length=100)
+    payload = JSONField(default=dict)
+    # a job is only queued once for a key, e.g. to not notify the followers of an article twice
+    key = models.CharField(max_length=255, null=True, unique=True)
+    # the jobs with a higher priority are run first
+    priority = models.SmallIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUSES, default=QUEUED)
+    # the job is not run before this time, it is pushed back when the job is retried
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    last_error = models.TextField(blank=True, default='')
+
+    class Meta(TimestampsMixin.Meta):
+        indexes = [
+            # the worker looks for the queued jobs that are due, the most important first
+            models.Index(fields=['status', '-priority', 'run_at'], name='core_job_due_idx'),
+        ]
+
+    def __str__(self):
+        return '{} #{} ({})'.format(self.name, self.pk, self.status)
+
+
+# check the persistent connections that sat idle before a request uses them
+request_started.connect(check_idle_connections, dispatch_uid='authors.apps.core.db.health.check_idle_connections')
+request_finished.connect(mark_idle_connections, dispatch_uid='authors.apps.core.db.health.mark_idle_connections')
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
+from rest_framework import permissions
+from rest_framework.authentication import get_authorization_header
+
+
+class IsAdminOrMetricsScraper(permissions.BasePermission):
+    """
+    Lets the admins in, and Prometheus when it sends the METRICS_TOKEN as a bearer token
+    """
+
+    def has_permission(self, request, view):
+        if request.user and request.user.is_staff:
+            return True
+        header = get_authorization_header(request).split()
+        return (bool(settings.METRICS_TOKEN) and len(header) == 2 and header[0].lower() == b'bearer'
+                and constant_time_compare(header[1].decode(), settings.METRICS_TOKEN))
@@ -2,6 +2,7 @@ import json
 
 from rest_framework import status
 from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
 from rest_framework.utils.serializer_helpers import ReturnList
 
 
@@ -111,3 +112,24 @@ class RatingJSONRenderer(JSONRenderer):
         return json.dumps({
             'rating': data
         })
+
+
+class RenderedResponse(Response):
+    """
+    A response whose body was rendered beforehand, e.g. read from the cache. The
+    data is kept on the response like on any other, it is not rendered again.
+    """
+
+    def __init__(self, data, body, **kwargs):
+        """
+        :param data:
+        :param body: the rendered data, bytes
+        """
+        super().__init__(data, **kwargs)
+        self.body = body
+
+    @property
+    def rendered_content(self):
+        renderer = self.accepted_renderer
+        self['Content-Type'] = '{}; charset={}'.format(renderer.media_type, renderer.charset)
+        return self.body
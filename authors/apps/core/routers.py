@@ -0,0 +1,64 @@
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# where the current thread reads from, set for the requests by authors.apps.core.middleware.ReplicaMiddleware
+state = threading.local()
+
+
+@contextmanager
+def reading_from_replicas():
+    """
+    Send the reads made in the block to one of the DATABASE_REPLICAS, picked at
+    random, until the block writes to the database
+    """
+    state.replica = random.choice(settings.DATABASE_REPLICAS) if settings.DATABASE_REPLICAS else None
+    try:
+        yield
+    finally:
+        state.replica = None
+
+
+@contextmanager
+def reading_from_primary():
+    """
+    Send the reads made in the block to the default database, e.g. to fill the cache
+    with data that a replica could be lagging behind on
+    """
+    state.primary = getattr(state, 'primary', 0) + 1
+    try:
+        yield
+    finally:
+        state.primary -= 1
+
+
+class ReplicaRouter:
+    """
+    Sends the reads of the safe requests to a replica of the default database. A
+    request reads from a single replica, so that its reads are consistent with each
+    other. The writes go to the default database, and so do the reads that follow
+    them so that a request reads what it wrote.
+
+    Outside of the requests, e.g. in the worker and the commands, and in transactions,
+    everything uses the default database.
+    """
+
+    def db_for_read(self, model, **hints):
+        replica = getattr(state, 'replica', None)
+        if replica is None or getattr(state, 'primary', 0) or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return replica
+
+    def db_for_write(self, model, **hints):
+        state.replica = None
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replicas hold the same rows as the default database
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
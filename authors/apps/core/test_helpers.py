@@ -1,8 +1,18 @@
+import re
+import sys
+from collections import Counter
+
 from faker import Faker
 
+from django.core.cache import cache
+from django.db import connection
 from django.urls import reverse
+from rest_framework.serializers import Serializer
 
+from authors.apps.articles.models import Article
 from authors.apps.authentication.models import User
+from authors.apps.core.jobs import run_pending
+from authors.apps.profiles.models import Profile
 
 fake = Faker()
 test_client = None
@@ -113,3 +123,129 @@ def make_user(overrides=None):
                 attributes[field] = overrides.get(field)
 
     return attributes
+
+
+def create_profile():
+    """
+    Creates a random user and their profile directly, faster than create_user
+    when many users are needed.
+    :return: Profile
+    """
+    name = fake.uuid4()[:13]
+    user = User.objects.create_user('user-{}'.format(name), '{}@example.com'.format(name), fake.password())
+    return Profile.objects.create(user=user)
+
+
+def create_article(author, **fields):
+    """
+    Creates a published article with random content.
+    :param author: User
+    :param fields: the fields to override
+    :return: Article
+    """
+    attributes = {'title': fake.sentence(), 'description': fake.sentence(), 'body': fake.text(), 'published': True}
+    attributes.update(fields)
+    article = Article(author=author, **attributes)
+    article.save()
+    return article
+
+
+def run_jobs():
+    """
+    Runs the background jobs that are due, like the worker would.
+    :return: the number of jobs that were run
+    """
+    return run_pending()
+
+
+def query_source():
+    """
+    Find the serializer fields that were being serialized when a query was made,
+    from the outermost, e.g. "ArticleSerializer.author > ProfileSerializer.following".
+    The queries made outside of the serializers come from the "view".
+    :return: str
+    """
+    fields = []
+    frame = sys._getframe(1)
+    while frame is not None:
+        # the loop over the fields of Serializer.to_representation
+        if frame.f_code.co_name == 'to_representation' and isinstance(frame.f_locals.get('self'), Serializer) \
+                and 'field' in frame.f_locals:
+            fields.append('{}.{}'.format(type(frame.f_locals['self']).__name__, frame.f_locals['field'].field_name))
+        frame = frame.f_back
+    return ' > '.join(reversed(fields)) or 'view'
+
+
+def normalize_sql(sql):
+    """
+    Collapse the lists of parameters and the limits of the sql so that the same query reads the same
+    """
+    return re.sub(r'(LIMIT|OFFSET) \d+', r'\1 %s', re.sub(r'\(%s(, %s)*\)', '(%s, ...)', sql))
+
+
+def record_queries(function):
+    """
+    Call the function and record the queries it makes
+    :param function:
+    :return: list of (source, sql) of the queries, see query_source and normalize_sql
+    """
+    queries = []
+
+    def record(execute, sql, params, many, context):
+        queries.append((query_source(), normalize_sql(sql)))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(record):
+        function()
+    return queries
+
+
+class QueryScalingMixin:
+    """
+    Checks that a list endpoint makes as many queries for N rows as for 10N rows,
+    i.e. that its serializers do not make a query for each row. The cache is cleared
+    before each request, the cached lookups are counted as the queries they make on
+    a miss.
+
+        class ArticleQueriesTestCase(QueryScalingMixin, APITestCase):
+            def create_articles(self, count):
+                ...
+
+            def test_article_list(self):
+                self.assertQueriesDoNotScale(reverse('articles:articles-list'), self.create_articles)
+    """
+
+    def assertQueriesDoNotScale(self, url, seed, rows=2, data=None):
+        """
+        :param url: the url of the list endpoint
+        :param seed: a function that creates the given number of rows listed by the endpoint
+        :param rows: N, the endpoint lists N rows and then 10N, all of them have to fit in a page
+        :param data: the query parameters of the request
+        """
+        seed(rows)
+        few = self.record_list(url, data)
+        seed(rows * 9)
+        many = self.record_list(url, data)
+        if len(many) > len(few):
+            self.fail(self.scaling_report(url, rows, few, many))
+
+    def record_list(self, url, data):
+        cache.clear()
+        responses = []
+        queries = record_queries(lambda: responses.append(self.client.get(url, data)))
+        self.assertEqual(responses[0].status_code, 200, responses[0].content)
+        return queries
+
+    @staticmethod
+    def scaling_report(url, rows, few, many):
+        """
+        :return: a report of the queries made for 10N rows that were not made for N rows
+        """
+        lines = ['GET {} made {} queries for {} rows and {} for {} rows. The queries that grew with the rows:'.format(
+            url, len(few), rows, len(many), rows * 10)]
+        few, many = Counter(few), Counter(many)
+        for (source, sql), count in sorted(many.items()):
+            if count > few[(source, sql)]:
+                lines.append('  {}: {} -> {}'.format(source, few[(source, sql)], count))
+                lines.append('    {}'.format(sql[:300]))
+        return '\n'.join(lines)
@@ -0,0 +1,122 @@
+import asyncio
+import importlib.util
+import os
+import subprocess
+import sys
+import unittest
+import urllib.error
+import urllib.request
+
+from django.test import SimpleTestCase
+
+from authors.apps.core.asgi import WsgiToAsgi, make_environ
+from authors.apps.core.management.commands.benchmark_servers import Command as BenchmarkServers, free_port
+
+
+def echo(environ, start_response):
+    """
+    A WSGI application that answers with the body of the request, in two chunks
+    """
+    body = environ['wsgi.input'].read()
+    start_response('201 Created', [('Content-Type', 'text/plain'), ('X-Path', environ['PATH_INFO'])])
+    return [b'', body[:2], body[2:]]
+
+
+class WsgiToAsgiTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.application = WsgiToAsgi(echo, threads=2)
+
+    def tearDown(self):
+        self.application.executor.shutdown()
+        self.loop.close()
+
+    def call(self, scope, messages):
+        """
+        :return: the messages sent by the application
+        """
+        messages, sent = list(messages), []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        self.loop.run_until_complete(self.application(scope, receive, send))
+        return sent
+
+    def scope(self, **overrides):
+        return dict({
+            'type': 'http', 'method': 'POST', 'path': '/api/articles/', 'query_string': b'page=2',
+            'headers': [(b'content-type', b'text/plain'), (b'accept', b'text/plain'), (b'accept', b'*/*')],
+            'server': ('testserver', 8000), 'client': ('10.0.0.1', 1234),
+        }, **overrides)
+
+    def test_the_response_is_streamed(self):
+        sent = self.call(self.scope(), [
+            {'type': 'http.request', 'body': b'he', 'more_body': True},
+            {'type': 'http.request', 'body': b'llo'},
+        ])
+        self.assertEqual(sent[0], {
+            'type': 'http.response.start', 'status': 201,
+            'headers': [(b'content-type', b'text/plain'), (b'x-path', b'/api/articles/')]})
+        self.assertEqual([message['body'] for message in sent[1:]], [b'he', b'llo', b''])
+        self.assertFalse(sent[-1].get('more_body'))
+
+    def test_nothing_is_sent_when_the_client_disconnects(self):
+        self.assertEqual(self.call(self.scope(), [{'type': 'http.disconnect'}]), [])
+
+    def test_lifespan(self):
+        sent = self.call({'type': 'lifespan'}, [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}])
+        self.assertEqual([message['type'] for message in sent],
+                         ['lifespan.startup.complete', 'lifespan.shutdown.complete'])
+
+    def test_environ(self):
+        environ = make_environ(self.scope(path='/api/profiles/zoë/'), None)
+        self.assertEqual(environ['PATH_INFO'], '/api/profiles/zo\xc3\xab/')
+        self.assertEqual(environ['QUERY_STRING'], 'page=2')
+        self.assertEqual(environ['CONTENT_TYPE'], 'text/plain')
+        self.assertEqual(environ['HTTP_ACCEPT'], 'text/plain,*/*')
+        self.assertEqual((environ['SERVER_NAME'], environ['SERVER_PORT']), ('testserver', '8000'))
+        self.assertEqual(environ['REMOTE_ADDR'], '10.0.0.1')
+
+
+@unittest.skipUnless(os.getenv('RUN_SERVER_SMOKE_TESTS') == 'True', 'set RUN_SERVER_SMOKE_TESTS=True to start servers')
+@unittest.skipIf(importlib.util.find_spec('uvicorn') is None, 'uvicorn is not installed')
+class UvicornWorkerTestCase(SimpleTestCase):
+    """
+    Starts gunicorn with the uvicorn workers the way the Procfile does. The server
+    uses the configured database, not the test database, so these only run when
+    RUN_SERVER_SMOKE_TESTS is True, against a migrated database.
+    """
+
+    def get(self, application, path):
+        """
+        :return: the status of a request made to a server serving the application
+        """
+        port = free_port()
+        environ = dict(os.environ, GUNICORN_WORKER_CLASS='uvicorn.workers.UvicornWorker', WEB_CONCURRENCY='1',
+                       GUNICORN_LOG_LEVEL='warning')
+        server = subprocess.Popen(
+            [sys.executable, '-c', 'from gunicorn.app.wsgiapp import run; run()', application,
+             '-c', 'python:authors.gunicorn_config', '--bind', '127.0.0.1:{}'.format(port),
+             '--access-logfile', os.devnull],
+            env=environ)
+        try:
+            BenchmarkServers.wait_for(server, port)
+            try:
+                return urllib.request.urlopen('http://127.0.0.1:{}{}'.format(port, path), timeout=10).status
+            except urllib.error.HTTPError as error:
+                return error.code
+        finally:
+            server.terminate()
+            server.wait()
+
+    def test_the_wsgi_application_is_served(self):
+        # the response comes from django, uvicorn answers 500 when it cannot call the application
+        self.assertEqual(self.get('authors.wsgi:application', '/api/unknown/'), 404)
+
+    def test_the_asgi_application_is_served(self):
+        self.assertEqual(self.get('authors.asgi:application', '/api/unknown/'), 404)
@@ -0,0 +1,54 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from notifications.models import Notification
+
+from authors.apps.articles.models import Article, ArticleRating, Comment
+from authors.apps.authentication.models import User
+from authors.apps.core.management.commands.load_test import Sample, change, summarize
+from authors.apps.core.management.commands.seed_benchmark_data import spread_pairs
+from authors.apps.profiles.models import Profile
+
+
+class SeedBenchmarkDataTestCase(TestCase):
+
+    def test_pairs_are_distinct(self):
+        pairs = list(spread_pairs(60, list(range(10)), list(range(100, 130))))
+        self.assertEqual(len(set(pairs)), 60)
+        # and the ones made with an offset are distinct from them
+        others = set(spread_pairs(30, list(range(10)), list(range(100, 130)), offset=6))
+        self.assertFalse(others & set(pairs))
+
+    def test_the_rows_are_seeded(self):
+        out = StringIO()
+        call_command('seed_benchmark_data', users=10, follows=3, tags=5, articles=20, comments=15, replies=5,
+                     likes=30, dislikes=10, ratings=12, views=20, favourites=8, notifications=6, chunk_size=7,
+                     seed=1, skip_search_vectors=True, stdout=out)
+
+        self.assertEqual(User.objects.count(), 10)
+        self.assertEqual(Profile.objects.count(), 10)
+        self.assertEqual(Article.objects_with_deleted.count(), 20)
+        self.assertEqual(Comment.objects.filter(parent__isnull=False).count(), 5)
+        self.assertEqual(ArticleRating.objects.count(), 12)
+        self.assertEqual(Notification.objects.count(), 6)
+        # the counters are reconciled
+        self.assertEqual(sum(Article.objects_with_deleted.values_list('like_count', flat=True)), 30)
+        self.assertIn('Seeded the dataset', out.getvalue())
+
+
+class LoadTestTestCase(SimpleTestCase):
+
+    def test_summary(self):
+        samples = [Sample(seconds / 1000, True) for seconds in range(1, 101)] + [Sample(1, False)]
+        summary = summarize(samples, 2)
+        self.assertEqual(summary['requests'], 101)
+        self.assertEqual(summary['errors'], 1)
+        self.assertEqual(summary['requests_per_second'], 50.5)
+        self.assertEqual(summary['p50_ms'], 51)
+        self.assertEqual(summary['p99_ms'], 100)
+        self.assertEqual(summary['max_ms'], 1000)
+
+    def test_change(self):
+        self.assertEqual(change(200, 150), -25)
+        self.assertEqual(change(0, 150), 0)
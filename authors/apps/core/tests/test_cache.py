@@ -0,0 +1,77 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from authors.apps.core.cache import ModelCache, Namespace, stats
+from authors.apps.core.models import Job
+
+
+class NamespaceTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        stats.reset()
+        self.namespace = Namespace('test')
+
+    def test_keys_are_namespaced(self):
+        self.namespace.set('key', 'value')
+        self.assertEqual(Namespace('other').get('key'), None)
+        self.assertEqual(self.namespace.get('key'), 'value')
+
+    def test_get_or_set_only_computes_missing_values(self):
+        computed = []
+        for _ in range(2):
+            self.assertIsNone(self.namespace.get_or_set('key', lambda: computed.append(1)))
+        self.assertEqual(computed, [1])
+
+    def test_invalidate_all_bumps_the_version(self):
+        self.namespace.set('first', 1)
+        self.namespace.set('second', 2)
+        self.namespace.invalidate_all()
+        self.assertIsNone(self.namespace.get('first'))
+        self.assertIsNone(self.namespace.get('second'))
+
+        # the version was evicted
+        cache.delete(self.namespace.version_key)
+        self.namespace.set('first', 1)
+        self.namespace.invalidate_all()
+        self.assertIsNone(self.namespace.get('first'))
+
+    def test_hits_and_misses_are_counted(self):
+        self.namespace.get('key')
+        self.namespace.set('key', 'value')
+        self.namespace.get('key')
+        self.namespace.get('key')
+        self.assertEqual(stats.snapshot()['test'], {'hits': 2, 'misses': 1, 'hit_rate': 2 / 3})
+
+
+class ModelCacheTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.jobs = ModelCache(Job)
+        self.job = Job.objects.create(name='first')
+
+    def test_instances_are_cached_until_saved(self):
+        self.assertEqual(self.jobs.get_instance(self.job.pk).name, 'first')
+        with self.assertNumQueries(0):
+            self.jobs.get_instance(self.job.pk)
+
+        self.job.name = 'second'
+        self.job.save()
+        self.assertEqual(self.jobs.get_instance(self.job.pk).name, 'second')
+
+    def test_other_fields_are_checked_against_the_cached_instance(self):
+        self.assertEqual(self.jobs.get_instance_by('name', 'first'), self.job)
+        with self.assertNumQueries(0):
+            self.jobs.get_instance_by('name', 'first')
+
+        self.job.name = 'second'
+        self.job.save()
+        other = Job.objects.create(name='first')
+        self.assertEqual(self.jobs.get_instance_by('name', 'first'), other)
+
+    def test_deleted_instances_are_not_returned(self):
+        self.jobs.get_instance(self.job.pk)
+        self.job.delete()
+        with self.assertRaises(Job.DoesNotExist):
+            self.jobs.get_instance(self.job.pk)
@@ -0,0 +1,103 @@
+import time
+from unittest import mock
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.backends.postgresql.base import Database
+from django.test import TestCase, override_settings
+
+from authors.apps.core.db.base import ConnectionPool, DatabaseWrapper
+from authors.apps.core.db.health import check_idle_connections
+
+
+class ConnectionPoolTestCase(TestCase):
+
+    def setUp(self):
+        params = connection.get_connection_params()
+        self.pool = ConnectionPool(lambda: Database.connect(**params), size=2, timeout=0.1)
+
+    def tearDown(self):
+        self.pool.close_all()
+
+    def test_connections_are_reused(self):
+        first = self.pool.get()
+        self.pool.put(first)
+        self.assertIs(self.pool.get(), first)
+
+    def test_waits_for_a_free_connection(self):
+        self.pool.get()
+        self.pool.get()
+        with self.assertRaises(Database.OperationalError):
+            self.pool.get()
+
+    def test_returned_connections_are_rolled_back(self):
+        first = self.pool.get()
+        first.cursor().execute('SELECT 1')
+        self.pool.put(first)
+        self.assertIs(self.pool.get(), first)
+        self.assertEqual(first.get_transaction_status(), Database.extensions.TRANSACTION_STATUS_IDLE)
+
+    def test_broken_connections_are_discarded(self):
+        first = self.pool.get()
+        self.pool.put(first, discard=True)
+        self.assertTrue(first.closed)
+        second = self.pool.get()
+        second.close()
+        self.pool.put(second)
+        self.assertIsNot(self.pool.get(), second)
+
+    @override_settings(DB_HEALTH_CHECK_INTERVAL=0)
+    def test_idle_connections_are_checked(self):
+        first = self.pool.get()
+        self.pool.put(first)
+        with mock.patch.object(ConnectionPool, 'is_usable', return_value=False):
+            self.assertIsNot(self.pool.get(), first)
+        self.assertTrue(first.closed)
+
+
+class PooledDatabaseWrapperTestCase(TestCase):
+
+    def setUp(self):
+        # the default database does not use the pool in the tests, its pool is free
+        self.wrapper = DatabaseWrapper({**connection.settings_dict, 'POOL_SIZE': 1}, alias=DEFAULT_DB_ALIAS)
+
+    def tearDown(self):
+        self.wrapper.close()
+        DatabaseWrapper.pools.pop(DEFAULT_DB_ALIAS).close_all()
+
+    def test_closing_returns_the_connection_to_the_pool(self):
+        self.wrapper.ensure_connection()
+        raw = self.wrapper.connection
+        self.wrapper.close()
+        with self.wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        self.assertIs(self.wrapper.connection, raw)
+
+
+class HealthCheckTestCase(TestCase):
+
+    def setUp(self):
+        self.connection = connections[DEFAULT_DB_ALIAS]
+        self.connection.ensure_connection()
+        self.connection.idle_since = time.monotonic() - 60
+
+    def tearDown(self):
+        del self.connection.idle_since
+
+    def check(self, conn_max_age):
+        with mock.patch.dict(self.connection.settings_dict, CONN_MAX_AGE=conn_max_age), \
+                mock.patch.object(self.connection, 'is_usable', return_value=False), \
+                mock.patch.object(self.connection, 'close') as close:
+            check_idle_connections()
+        return close.called
+
+    @override_settings(DB_HEALTH_CHECK_INTERVAL=30)
+    def test_unusable_idle_connections_are_closed(self):
+        self.assertTrue(self.check(600))
+
+    @override_settings(DB_HEALTH_CHECK_INTERVAL=120)
+    def test_recently_used_connections_are_trusted(self):
+        self.assertFalse(self.check(600))
+
+    @override_settings(DB_HEALTH_CHECK_INTERVAL=30)
+    def test_connections_closed_after_each_request_are_not_checked(self):
+        self.assertFalse(self.check(0))
@@ -0,0 +1,24 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from authors import gunicorn_config
+
+
+class GunicornConfigTestCase(SimpleTestCase):
+
+    def process(self, preload_app):
+        return SimpleNamespace(cfg=SimpleNamespace(preload_app=preload_app))
+
+    @mock.patch('authors.wsgi.warm_up')
+    def test_a_preloaded_application_is_warmed_up_before_forking(self, warm_up):
+        gunicorn_config.when_ready(self.process(preload_app=True))
+        gunicorn_config.post_worker_init(self.process(preload_app=True))
+        warm_up.assert_called_once_with()
+
+    @mock.patch('authors.wsgi.warm_up')
+    def test_each_worker_warms_up_its_own_application(self, warm_up):
+        gunicorn_config.when_ready(self.process(preload_app=False))
+        gunicorn_config.post_worker_init(self.process(preload_app=False))
+        warm_up.assert_called_once_with()
@@ -0,0 +1,136 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from authors.apps.core.jobs import RetryJob, claim, enqueue, job, run_pending, send_email
+from authors.apps.core.models import Job
+
+calls = []
+
+
+@job('tests.record')
+def record(value):
+    calls.append(value)
+
+
+@job('tests.fail', max_attempts=2)
+def fail():
+    Job.objects.create(name='tests.rolled_back')
+    raise ValueError('failed')
+
+
+@job('tests.retry_rest')
+def retry_rest(values):
+    calls.append(values[0])
+    if len(values) > 1:
+        raise RetryJob(payload={'values': values[1:]})
+
+
+@override_settings(JOB_RETRY_DELAY=10, JOB_RETRY_MAX_DELAY=60)
+class JobQueueTest(TestCase):
+
+    def setUp(self):
+        calls.clear()
+
+    def test_queued_jobs_are_run(self):
+        record.delay(value=1)
+        enqueue('tests.record', {'value': 2})
+        self.assertEqual(run_pending(), 2)
+        self.assertEqual(calls, [1, 2])
+        self.assertFalse(Job.objects.exclude(status=Job.DONE).exists())
+
+    def test_jobs_are_not_run_before_they_are_due(self):
+        enqueue('tests.record', {'value': 1}, run_at=timezone.now() + timedelta(minutes=1))
+        self.assertEqual(run_pending(), 0)
+
+    def test_failed_jobs_are_rolled_back_and_retried_later(self):
+        failed = fail.delay()
+        run_pending()
+        failed.refresh_from_db()
+
+        self.assertEqual(failed.status, Job.QUEUED)
+        self.assertEqual(failed.attempts, 1)
+        self.assertIn('ValueError', failed.last_error)
+        self.assertGreater(failed.run_at, timezone.now() + timedelta(seconds=4))
+        self.assertFalse(Job.objects.filter(name='tests.rolled_back').exists())
+
+        Job.objects.filter(pk=failed.pk).update(run_at=timezone.now())
+        run_pending()
+        failed.refresh_from_db()
+        self.assertEqual(failed.status, Job.FAILED)
+
+    def test_retried_jobs_can_replace_their_payload(self):
+        retried = retry_rest.delay(values=[1, 2])
+        run_pending()
+        retried.refresh_from_db()
+        self.assertEqual(retried.payload, {'values': [2]})
+
+        Job.objects.filter(pk=retried.pk).update(run_at=timezone.now())
+        run_pending()
+        self.assertEqual(calls, [1, 2])
+
+    def test_unknown_jobs_fail(self):
+        unknown = enqueue('tests.unknown', max_attempts=1)
+        run_pending()
+        unknown.refresh_from_db()
+        self.assertEqual(unknown.status, Job.FAILED)
+
+    def test_claimed_jobs_are_leased(self):
+        leased = record.delay(value=1)
+        self.assertEqual(claim(), [leased])
+        self.assertEqual(claim(), [])
+
+        # the worker died, the lease expires
+        Job.objects.filter(pk=leased.pk).update(run_at=timezone.now())
+        self.assertEqual(claim(), [leased])
+
+    def test_jobs_that_never_finish_fail_after_their_last_attempt(self):
+        crashing = enqueue('tests.record', {'value': 1}, max_attempts=2)
+        for attempt in range(1, 3):
+            self.assertEqual(claim(), [crashing])
+            crashing.refresh_from_db()
+            self.assertEqual(crashing.attempts, attempt)
+            # the worker died, the lease expires
+            Job.objects.filter(pk=crashing.pk).update(run_at=timezone.now())
+
+        self.assertEqual(claim(), [])
+        crashing.refresh_from_db()
+        self.assertEqual(crashing.status, Job.FAILED)
+        self.assertIn('lease expired', crashing.last_error)
+
+    def test_jobs_are_only_queued_once_for_a_key(self):
+        first = record.schedule({'value': 1}, key='record-once')
+        self.assertEqual(record.schedule({'value': 2}, key='record-once'), first)
+        run_pending()
+        self.assertEqual(calls, [1])
+
+    def test_jobs_with_a_higher_priority_are_run_first(self):
+        record.delay(value='low')
+        record.schedule({'value': 'high'}, priority=10)
+        run_pending(batch_size=1)
+        self.assertEqual(calls, ['high', 'low'])
+
+    def test_emails_are_sent_in_the_background(self):
+        send_email.delay(template='email_subscribe.html', data={'username': 'foo'}, to_email='foo@bar.com',
+                         subject='Email subscription activated')
+        self.assertEqual(len(mail.outbox), 0)
+        run_pending()
+        self.assertEqual(mail.outbox[0].to, ['foo@bar.com'])
+
+
+class WorkerTest(TransactionTestCase):
+    # the worker threads use their own connections, they only see committed jobs
+
+    def setUp(self):
+        calls.clear()
+
+    def test_worker_runs_the_jobs_concurrently(self):
+        for value in range(4):
+            record.delay(value=value)
+        call_command('run_worker', once=True, concurrency=2, stdout=StringIO())
+        self.assertEqual(sorted(calls), [0, 1, 2, 3])
+        self.assertFalse(Job.objects.exclude(status=Job.DONE).exists())
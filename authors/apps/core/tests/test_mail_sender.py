@@ -0,0 +1,46 @@
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.template import engines
+from django.template.loader import get_template, render_to_string
+from django.test import TestCase
+
+from authors.apps.core.mail_sender import EmailTemplate, is_static, send_mass_email
+
+
+class FailingBackend(EmailBackend):
+    """Refuses to send to the addresses of the failing domain"""
+
+    def send_messages(self, messages):
+        if any(address.endswith('@failing.com') for message in messages for address in message.to):
+            raise ConnectionError('refused')
+        return super().send_messages(messages)
+
+
+class MailSenderTest(TestCase):
+    data = {'username': 'foo & bar', 'article_title': 'Dragons', 'author': 'baz',
+            'unsubscribe_url': 'http://x/?a=1&b=2'}
+
+    def test_compiled_templates_render_like_the_template(self):
+        template = EmailTemplate('article_created.html')
+        self.assertIsNot(template.compiled, template.template)
+        self.assertEqual(template.render(self.data), render_to_string('article_created.html', self.data))
+
+    def test_templates_with_logic_are_not_compiled(self):
+        self.assertTrue(is_static(get_template('article_created.html').template))
+        for source in ('{% if a %}a{% endif %}', '{{ a|upper }}', '{{ a.b }}'):
+            self.assertFalse(is_static(engines['django'].from_string(source).template))
+
+    def test_mass_email_is_sent_to_every_recipient(self):
+        failed = send_mass_email('article_created.html', 'Hello',
+                                 [('foo@bar.com', self.data), ('baz@bar.com', dict(self.data, username='baz'))])
+        self.assertEqual(failed, {})
+        self.assertEqual([message.to for message in mail.outbox], [['foo@bar.com'], ['baz@bar.com']])
+        self.assertIn('baz', mail.outbox[1].body)
+
+    def test_mass_email_reports_the_recipients_that_failed(self):
+        failed = send_mass_email('article_created.html', 'Hello',
+                                 [('foo@failing.com', self.data), ('foo@bar.com', self.data)],
+                                 connection=FailingBackend())
+        self.assertEqual(list(failed), ['foo@failing.com'])
+        self.assertIsInstance(failed['foo@failing.com'], ConnectionError)
+        self.assertEqual(len(mail.outbox), 1)
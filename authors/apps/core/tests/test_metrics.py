@@ -0,0 +1,78 @@
+import json
+
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from authors.apps.articles.tests.api.test_articles import BaseArticlesTestCase
+from authors.apps.authentication.models import User
+from authors.apps.core import metrics
+
+
+class RegistryTestCase(TestCase):
+
+    def test_queries_are_counted_while_recording(self):
+        with metrics.recording(metrics.RequestMetrics()) as recorded:
+            User.objects.count()
+            with metrics.timer('serializer'):
+                pass
+        User.objects.count()
+        self.assertEqual(recorded.queries, 1)
+        self.assertGreater(recorded.seconds['sql'], 0)
+        self.assertGreater(recorded.seconds['serializer'], 0)
+
+    def test_renders_the_prometheus_text_format(self):
+        registry = metrics.Registry()
+        recorded = metrics.RequestMetrics()
+        recorded.queries, recorded.duration, recorded.response_bytes = 3, 0.2, 100
+        registry.observe('articles:articles-list', 'GET', 200, recorded)
+        registry.observe('articles:articles-list', 'GET', 200, recorded)
+        text = registry.render()
+        labels = '{view="articles:articles-list",method="GET"'
+        self.assertIn('authors_http_requests_total{}, status="200"}} 2'.replace(', ', ',').format(labels), text)
+        self.assertIn('authors_http_request_duration_seconds_bucket{},le="0.1"}} 0'.format(labels), text)
+        self.assertIn('authors_http_request_duration_seconds_bucket{},le="0.25"}} 2'.format(labels), text)
+        self.assertIn('authors_http_request_sql_queries_sum{}}} 6'.format(labels), text)
+        self.assertIn('authors_http_request_response_bytes_count{}}} 2'.format(labels), text)
+
+
+class MetricsMiddlewareTestCase(BaseArticlesTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.create_article(published=True)
+        metrics.registry.reset()
+
+    @override_settings(METRICS_SAMPLE_RATE=1)
+    def test_sampled_requests_are_logged_and_added_up(self):
+        with self.assertLogs('authors.metrics') as logs:
+            response = self.client.get(self.url_list)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'articles:articles-list')
+        self.assertEqual(record['status'], status.HTTP_200_OK)
+        self.assertGreater(record['queries'], 0)
+        self.assertGreater(record['serializer_ms'], 0)
+        self.assertGreater(record['renderer_ms'], 0)
+        self.assertEqual(record['response_bytes'], len(response.content))
+        self.assertEqual(metrics.registry.counts[('articles:articles-list', 'GET')], 1)
+
+    @override_settings(METRICS_SAMPLE_RATE=0)
+    def test_requests_that_are_not_sampled_are_not_recorded(self):
+        self.client.get(self.url_list)
+        self.assertEqual(metrics.registry.counts, {})
+
+    @override_settings(METRICS_SAMPLE_RATE=0, METRICS_SERVER_TIMING=True)
+    def test_server_timing(self):
+        response = self.client.get(self.url_list)
+        self.assertRegex(response['Server-Timing'], r'^db;desc="\d+ queries";dur=[\d.]+, serializer;dur=')
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_the_endpoint_needs_the_token(self):
+        url = reverse('metrics')
+        self.client.credentials()
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer wrong').status_code,
+                         status.HTTP_403_FORBIDDEN)
+        response = self.client.get(url, HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
@@ -0,0 +1,89 @@
+import jwt
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from authors.apps.articles.models import Article
+from authors.apps.core.middleware import ReplicaMiddleware
+from authors.apps.core.routers import ReplicaRouter, reading_from_primary, reading_from_replicas
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class ReplicaRouterTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_reads_use_the_default_database_outside_of_requests(self):
+        self.assertEqual(self.router.db_for_read(Article), 'default')
+
+    def test_reads_use_the_replica_until_a_write(self):
+        with reading_from_replicas():
+            self.assertEqual(self.router.db_for_read(Article), 'replica1')
+            self.assertEqual(self.router.db_for_write(Article), 'default')
+            self.assertEqual(self.router.db_for_read(Article), 'default')
+
+    def test_reads_from_the_primary_in_a_block(self):
+        with reading_from_replicas():
+            with reading_from_primary():
+                self.assertEqual(self.router.db_for_read(Article), 'default')
+            self.assertEqual(self.router.db_for_read(Article), 'replica1')
+
+    def test_only_the_default_database_is_migrated(self):
+        self.assertTrue(self.router.allow_migrate('default', 'articles'))
+        self.assertFalse(self.router.allow_migrate('replica1', 'articles'))
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class ReplicaMiddlewareTestCase(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.router = ReplicaRouter()
+        self.middleware = ReplicaMiddleware(self.view)
+        self.token = jwt.encode({'id': 1}, settings.SECRET_KEY).decode()
+        self.read_from = None
+
+    def view(self, request):
+        self.read_from = self.router.db_for_read(Article)
+        # what the authentication of the rest framework sets
+        request.user = getattr(request, 'authenticated', AnonymousUser())
+        return None
+
+    def request(self, method, address='10.0.0.1', token=None, user=None):
+        headers = {'REMOTE_ADDR': address}
+        if token:
+            headers['HTTP_AUTHORIZATION'] = 'Token {}'.format(token)
+        request = getattr(self.factory, method)('/api/articles/', **headers)
+        if user is not None:
+            request.authenticated = user
+        self.middleware(request)
+        return self.read_from
+
+    def test_safe_requests_read_from_a_replica(self):
+        self.assertEqual(self.request('get'), 'replica1')
+
+    def test_writes_use_the_default_database(self):
+        self.assertEqual(self.request('post'), 'default')
+
+    def test_clients_read_from_the_default_database_after_writing(self):
+        self.request('post')
+        self.assertEqual(self.request('get'), 'default')
+        self.assertEqual(self.request('get', address='10.0.0.2'), 'replica1')
+
+    def test_users_read_from_the_default_database_after_writing(self):
+        user = type('User', (), {'pk': 1, 'is_authenticated': True})()
+        self.request('post', address='10.0.0.2', token=self.token, user=user)
+        self.assertEqual(self.request('get', token=self.token), 'default')
+        self.assertEqual(self.request('get'), 'replica1')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_reads_use_the_default_database_without_replicas(self):
+        self.assertEqual(self.request('get'), 'default')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_writes_are_not_pinned_without_replicas(self):
+        self.request('post')
+        self.assertFalse(self.middleware.is_pinned(self.factory.get('/api/articles/', REMOTE_ADDR='10.0.0.1')))
@@ -0,0 +1,134 @@
+import hashlib
+
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from authors.apps.core import metrics
+from authors.apps.core.cache import stats
+from authors.apps.core.permissions import IsAdminOrMetricsScraper
+from authors.apps.core.renderers import BaseJSONRenderer
+
+
+class CacheStatsView(APIView):
+    """
+    The hits and misses of each cache namespace, counted by the process that serves the request
+    """
+    permission_classes = (IsAdminUser,)
+    renderer_classes = (BaseJSONRenderer,)
+    renderer_names = ('cache', 'caches')
+
+    def get(self, request):
+        return Response(stats.snapshot(), status=status.HTTP_200_OK)
+
+
+class MetricsView(APIView):
+    """
+    The totals of the requests recorded by the process that serves the request, in the
+    text format of Prometheus
+    """
+    permission_classes = (IsAdminOrMetricsScraper,)
+
+    def get(self, request):
+        return HttpResponse(metrics.registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class InstrumentedViewMixin:
+    """
+    Adds the time the view spends in its serializers and its renderer to the metrics of
+    the request, see authors.apps.core.middleware.MetricsMiddleware. The serializers
+    made by get_serializer are timed.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        serializer.to_representation = metrics.timed('serializer', serializer.to_representation)
+        return serializer
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        renderer = getattr(response, 'accepted_renderer', None)
+        if renderer is not None:
+            # the renderers are made for each request
+            renderer.render = metrics.timed('renderer', renderer.render)
+        return response
+
+
+class NotModified(Exception):
+    """
+    Raised to answer a conditional request with 304 Not Modified before the view runs
+    """
+
+
+class ConditionalGetMixin:
+    """
+    Answers conditional GET requests, with If-None-Match or If-Modified-Since, with
+    304 Not Modified once the request is authenticated and before the view serializes
+    anything. The ETag and Last-Modified headers are added to the responses.
+
+    Views implement get_validators, which should be much cheaper than the view itself,
+    e.g. an aggregate of updated_at or values read from the cache. Views that only know
+    their validators part way, e.g. once a page is fetched, call check_validators.
+    """
+
+    def get_validators(self, request, *args, **kwargs):
+        """
+        :return: None when the request has no validators, or a tuple of:
+            - values that change whenever the response changes, they are hashed into the ETag
+              along with the user and the query string
+            - the time the response last changed, or None when it can change without it changing
+        """
+        return None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.etag = self.last_modified = None
+        if request.method not in ('GET', 'HEAD'):
+            return
+
+        validators = self.get_validators(request, *args, **kwargs)
+        if validators is not None:
+            self.check_validators(request, *validators)
+
+    def check_validators(self, request, values, last_modified=None):
+        """
+        Set the validators of the response, see get_validators
+        :raises NotModified: when the client has the response already
+        """
+        self.etag, self.last_modified = self.make_etag(request, values), last_modified
+        if self.is_not_modified(request):
+            raise NotModified()
+
+    @staticmethod
+    def make_etag(request, values):
+        user = request.user.pk if request.user and request.user.is_authenticated else None
+        fingerprint = repr((values, user, request.get_full_path()))
+        return quote_etag(hashlib.md5(fingerprint.encode()).hexdigest())
+
+    def is_not_modified(self, request):
+        # If-None-Match takes precedence over If-Modified-Since
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match is not None:
+            return bool(set(parse_etags(if_none_match)) & {self.etag, '*'})
+        if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+        return (if_modified_since is not None and self.last_modified is not None
+                and int(self.last_modified.timestamp()) <= if_modified_since)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return HttpResponseNotModified()
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, 'etag', None) and response.status_code in (200, 304) and not response.has_header('ETag'):
+            response['ETag'] = self.etag
+            if self.last_modified is not None:
+                response['Last-Modified'] = http_date(self.last_modified.timestamp())
+            # the responses differ between users
+            patch_vary_headers(response, ('Authorization',))
+        return response
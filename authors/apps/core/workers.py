@@ -0,0 +1,16 @@
+from uvicorn.workers import UvicornWorker
+
+from authors.apps.core.asgi import WsgiToAsgi, default_threads
+
+
+class WsgiUvicornWorker(UvicornWorker):
+    """
+    A uvicorn worker that also serves WSGI applications, through WsgiToAsgi. The
+    Procfile serves authors.wsgi:application whatever the worker class, see
+    authors/gunicorn_config.py, authors.asgi:application is served as it is.
+    """
+
+    def load_wsgi(self):
+        super().load_wsgi()
+        if not isinstance(self.wsgi, WsgiToAsgi):
+            self.wsgi = WsgiToAsgi(self.wsgi, threads=default_threads())
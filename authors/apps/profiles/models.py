@@ -1,5 +1,7 @@
 from django.db import models
+from django.db.models.signals import post_delete, post_save
 
+from authors.apps.core.cache import ModelCache
 from authors.apps.core.models import TimestampsMixin
 from authors.settings import AUTH_USER_MODEL
 from cloudinary.models import CloudinaryField
@@ -37,13 +39,13 @@ class FollowMixin(models.Model):
         """
         Get a list of profiles that follow this profile.
         """
-        return self.followed_by.all()
+        return self.followed_by.select_related('user')
 
     def following(self):
         """
         Get a list of profiles that this profile follows.
         """
-        return self.follows.all()
+        return self.follows.select_related('user')
 
     class Meta:
         abstract = True
@@ -64,3 +66,14 @@ class Profile(TimestampsMixin, FollowMixin):
 
     def __str__(self):
         return self.user.username
+
+    @staticmethod
+    def user_changed(sender, instance, *args, **kwargs):
+        # the username of the user is part of the profile
+        cached_profiles.invalidate_on_commit(instance.pk)
+
+
+# the profiles by the id of their user, with the user
+cached_profiles = ModelCache(Profile, Profile.objects.select_related('user'), key_field='user_id')
+post_save.connect(Profile.user_changed, AUTH_USER_MODEL, dispatch_uid="authors.apps.profiles.models.Profile")
+post_delete.connect(Profile.user_changed, AUTH_USER_MODEL, dispatch_uid="authors.apps.profiles.models.Profile")
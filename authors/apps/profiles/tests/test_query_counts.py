@@ -0,0 +1,37 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from authors.apps.core.test_helpers import QueryScalingMixin, create_profile
+
+
+class ProfileQueriesTestCase(QueryScalingMixin, APITestCase):
+    """
+    The list endpoints of the profiles make the same number of queries however many profiles they list
+    """
+
+    def setUp(self):
+        self.profile = create_profile()
+        self.client.force_authenticate(self.profile.user)
+
+    def create_profiles(self, count):
+        for _ in range(count):
+            create_profile()
+
+    def create_followers(self, count):
+        for _ in range(count):
+            create_profile().follows.add(self.profile)
+
+    def create_followed(self, count):
+        for _ in range(count):
+            self.profile.follows.add(create_profile())
+
+    def test_profile_list(self):
+        self.assertQueriesDoNotScale(reverse('profiles:get-profiles'), self.create_profiles)
+
+    def test_followers(self):
+        self.assertQueriesDoNotScale(reverse('profiles:followers', kwargs={'username': self.profile.username}),
+                                     self.create_followers)
+
+    def test_following(self):
+        self.assertQueriesDoNotScale(reverse('profiles:following', kwargs={'username': self.profile.username}),
+                                     self.create_followed)
@@ -6,14 +6,15 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 
 from authors.apps.authentication.models import User
-from .models import Profile
+from .models import Profile, cached_profiles
 from .serializers import ProfileSerializer
 from .renderers import ProfileJSONRenderer
 
 from authors.apps.core.exceptions import ProfileDoesNotExist
+from authors.apps.core.views import ConditionalGetMixin, InstrumentedViewMixin
 
 
-class ProfileListView(ListAPIView):
+class ProfileListView(InstrumentedViewMixin, ListAPIView):
     permission_classes = (IsAuthenticated,)
     serializer_class = ProfileSerializer
     renderer_classes = (ProfileJSONRenderer,)
@@ -23,25 +24,33 @@ class ProfileListView(ListAPIView):
         Get a listing of user profiles. Excludes the requester.
         """
         try:
-            queryset = Profile.objects.all().exclude(user=request.user)
+            queryset = Profile.objects.select_related('user').exclude(user=request.user)
         except Profile.DoesNotExist:
             raise ProfileDoesNotExist
         serializer = self.serializer_class(queryset, many=True)
         return Response({'profiles': serializer.data}, status=status.HTTP_200_OK)
 
 
-class ProfileGetView(APIView):
+class ProfileGetView(InstrumentedViewMixin, ConditionalGetMixin, APIView):
     """Lists fetches a single profile and also updates a specific profile"""
 
     permission_classes = (IsAuthenticated,)
     serializer_class = ProfileSerializer
     renderer_classes = (ProfileJSONRenderer,)
 
+    def get_validators(self, request, username):
+        try:
+            profile = cached_profiles.get_instance_by('user__username', username)
+        except Profile.DoesNotExist:
+            return None
+        # the username is saved with the user
+        return (profile.username, profile.updated_at), max(profile.updated_at, profile.user.updated_at)
+
     def get(self, request, username):
         """Fetches a specific profile filtered by the username"""
 
         try:
-            profile = Profile.objects.get(user__username=username)
+            profile = cached_profiles.get_instance_by('user__username', username)
         except Profile.DoesNotExist:
             raise ProfileDoesNotExist
 
@@ -0,0 +1,15 @@
+"""
+ASGI config for authors project.
+
+It exposes the ASGI callable as a module-level variable named ``application``,
+for ASGI servers. The gunicorn config of the Procfile serves the WSGI application
+on uvicorn workers through the same adapter, see authors/gunicorn_config.py.
+
+The requests are handled by the WSGI application on ASGI_THREADS threads per process,
+see WsgiToAsgi.
+"""
+
+from authors.apps.core.asgi import WsgiToAsgi, default_threads
+from authors.wsgi import application as wsgi_application
+
+application = WsgiToAsgi(wsgi_application, threads=default_threads())
@@ -0,0 +1,86 @@
+"""
+The gunicorn settings of the web processes, used by the Procfile:
+
+    gunicorn authors.wsgi:application -c python:authors.gunicorn_config
+
+By default each process serves GUNICORN_THREADS requests at a time on threads, so
+that a slow SMTP call or search holds a thread instead of the whole process. Set
+GUNICORN_WORKER_CLASS to:
+
+- gthread, the default
+- sync, one request at a time per process
+- gevent, a greenlet per request, needs `pip install gevent psycogreen`. It has to be
+  set here rather than with -k so that the modules are patched before the application is loaded
+- uvicorn.workers.UvicornWorker, uvicorn workers holding the connections on an event loop and
+  handling the requests on ASGI_THREADS threads. The Procfile keeps serving authors.wsgi:application,
+  authors.apps.core.workers.WsgiUvicornWorker is used instead to serve it through
+  authors.apps.core.asgi.WsgiToAsgi
+
+The settings can also be overridden on the command line. A worker class given with -k is used
+as it is, with -k uvicorn.workers.UvicornWorker serve authors.asgi:application instead.
+"""
+import multiprocessing
+import os
+
+bind = '0.0.0.0:{}'.format(os.getenv('PORT', '8000'))
+
+# the number of processes, Heroku sets WEB_CONCURRENCY from the memory of the dyno
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+
+if worker_class in ('uvicorn', 'uvicorn.workers.UvicornWorker'):
+    # the uvicorn worker only serves ASGI applications, this one adapts the WSGI application of the Procfile
+    worker_class = 'authors.apps.core.workers.WsgiUvicornWorker'
+
+if worker_class == 'gevent':
+    # the application keeps its connections in thread locals, they have to be greenlet locals when it is preloaded
+    from gevent import monkey
+    monkey.patch_all()
+    # lets psycopg2 wait for the database without blocking the other greenlets
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
+
+# the number of requests a gthread process serves at a time
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+
+# the number of requests a gevent process serves at a time
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '100'))
+
+# load the application before forking, the processes share its memory and start faster
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True') == 'True'
+
+# the seconds a request can take before its process is restarted
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+
+# the seconds an idle connection is kept open, behind the Heroku router
+keepalive = 5
+
+# restart the processes after this many requests so that a leak cannot grow for ever
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = max_requests // 10
+
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+accesslog = '-'
+errorlog = '-'
+
+
+def when_ready(server):
+    if server.cfg.preload_app:
+        # load the search index and the revocation filter once, the workers are forked with them
+        from authors.wsgi import warm_up
+        warm_up()
+
+
+def post_worker_init(worker):
+    if not worker.cfg.preload_app:
+        # each worker loads them once it has loaded the application, within the timeout
+        from authors.wsgi import warm_up
+        warm_up()
+
+
+def pre_fork(server, worker):
+    if server.cfg.preload_app:
+        # the application was loaded in this process, its connections must not be shared with the workers
+        from authors.apps.core.db import close_connections
+        close_connections()
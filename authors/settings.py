@@ -35,6 +35,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'corsheaders',
     'django_extensions',
     'rest_framework',
@@ -53,6 +54,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'authors.apps.core.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -62,6 +64,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'social_django.middleware.SocialAuthExceptionMiddleware',
+    'authors.apps.core.middleware.ReplicaMiddleware',
 ]
 
 ROOT_URLCONF = 'authors.urls'
@@ -134,15 +137,46 @@ SOCIAL_AUTH_GOOGLE_SCOPE = ['email', 'username']
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        # the connections are taken from a pool shared by the threads of each process when
+        # DB_POOL_SIZE is set, see authors.apps.core.db
+        'ENGINE': 'authors.apps.core.db' if os.getenv('DB_POOL_SIZE') else 'django.db.backends.postgresql',
         'NAME': os.getenv('DB_NAME'),
         'USER': os.getenv('DB_USER'),
         'HOST': os.getenv('DB_HOST'),
         'PASSWORD': os.getenv('DB_PASSWORD'),
         'PORT': '5432',
+        # How long, in seconds, a connection is kept open between requests, 0 opens one for each
+        # request. Keep it at 0 with a pool, closing a connection returns it to the pool
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 0)),
+        # the maximum number of connections of each process, and how long, in seconds, a thread
+        # waits for one when they are all in use
+        'POOL_SIZE': int(os.getenv('DB_POOL_SIZE', 0)),
+        'POOL_TIMEOUT': int(os.getenv('DB_POOL_TIMEOUT', 30)),
+        'OPTIONS': {
+            # queries running for longer than this many milliseconds are cancelled, 0 never cancels them
+            'options': '-c statement_timeout={}'.format(int(os.getenv('DB_STATEMENT_TIMEOUT', 0))),
+        },
     }
 }
 
+# The read replicas of the default database, the safe requests read from them, see
+# authors.apps.core.routers. DB_REPLICA_HOSTS is a comma separated list of the hosts of the
+# replicas, they have the same name and credentials as the default database. To try the routing
+# locally, set it to the host of the default database: the replica is then a second connection to it
+for number, host in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), 1):
+    DATABASES['replica{}'.format(number)] = {
+        **DATABASES['default'], 'HOST': host.strip(), 'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['authors.apps.core.routers.ReplicaRouter']
+# How long, in seconds, a client reads from the default database after it writes, longer than
+# the replicas take to catch up
+DB_REPLICA_PIN_SECONDS = int(os.getenv('DB_REPLICA_PIN_SECONDS', 5))
+
+# How long, in seconds, a persistent or pooled connection can sit idle before it is checked
+# with a query, so that a request does not fail on a connection the database dropped
+DB_HEALTH_CHECK_INTERVAL = int(os.getenv('DB_HEALTH_CHECK_INTERVAL', 30))
+
 # sendGrid API Settings
 EMAIL_HOST = os.getenv('EMAIL_HOST')
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
@@ -231,4 +265,70 @@ CLOUDINARY = {
     'secure': True
 }
 
+# The backend used to search the articles, the in memory index or postgres full text search
+# (authors.apps.articles.search.PostgresSearchBackend). The in memory index is loaded when a
+# gunicorn process starts, or on the first search, and each process holds a copy of it, prefer
+# postgres for large datasets
+ARTICLE_SEARCH_BACKEND = os.getenv('ARTICLE_SEARCH_BACKEND', 'authors.apps.articles.search.InMemorySearchBackend')
+# Where the in memory index is saved by the rebuild_search_index command, and loaded from
+ARTICLE_SEARCH_INDEX_PATH = os.getenv('ARTICLE_SEARCH_INDEX_PATH')
+# How often, in seconds, the in memory index looks for articles changed by other processes
+ARTICLE_SEARCH_SYNC_INTERVAL = int(os.getenv('ARTICLE_SEARCH_SYNC_INTERVAL', 5))
+
+# The cache used by authors.apps.core.cache, the local memory cache of each process by default.
+# Set CACHE_BACKEND to a Redis backend, e.g. django_redis.cache.RedisCache, and CACHE_LOCATION
+# to its url to share the cache between processes
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'authors'),
+        # how long, in seconds, values are cached unless a namespace says otherwise
+        'TIMEOUT': int(os.getenv('CACHE_TIMEOUT', 300)),
+        'KEY_PREFIX': os.getenv('CACHE_KEY_PREFIX', 'ah'),
+    },
+}
+
+# How long, in seconds, the authenticated users are cached. When the cache is not shared
+# between processes, a user saved by one process is seen by the others after this delay
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', 60))
+# How long, in seconds, the tokens that are not blacklisted are cached. When the cache is
+# not shared between processes, a token blacklisted by one process is accepted by the
+# others for at most this long. 0 disables the caching, blacklisted tokens are always cached
+AUTH_REVOCATION_CACHE_TIMEOUT = int(os.getenv('AUTH_REVOCATION_CACHE_TIMEOUT', 30))
+# Whether to keep a Bloom filter of the blacklisted tokens in memory, it answers that a token
+# is not blacklisted without a query. It is loaded when a web worker starts
+AUTH_REVOCATION_BLOOM_FILTER = os.getenv('AUTH_REVOCATION_BLOOM_FILTER', 'False') == 'True'
+# How often, in seconds, the Bloom filter picks up the tokens blacklisted by other processes
+AUTH_REVOCATION_BLOOM_REFRESH = int(os.getenv('AUTH_REVOCATION_BLOOM_REFRESH', 5))
+
+# How long to wait, in seconds, before retrying a failed background job. The delay doubles
+# with every attempt up to the maximum
+JOB_RETRY_DELAY = int(os.getenv('JOB_RETRY_DELAY', 30))
+JOB_RETRY_MAX_DELAY = int(os.getenv('JOB_RETRY_MAX_DELAY', 3600))
+# How long, in seconds, a worker has to finish a job before it is given to another worker
+JOB_LEASE = int(os.getenv('JOB_LEASE', 600))
+
 DJANGO_NOTIFICATIONS_CONFIG = {'SOFT_DELETE': True}
+
+# The fraction of the requests whose queries, timings and response size are logged and added
+# to the totals at /api/metrics/, see authors.apps.core.middleware.MetricsMiddleware
+METRICS_SAMPLE_RATE = float(os.getenv('METRICS_SAMPLE_RATE', 0))
+# Record every request and send its timings in the Server-Timing header, for debugging
+METRICS_SERVER_TIMING = os.getenv('METRICS_SERVER_TIMING', 'False') == 'True'
+# The token Prometheus sends, as "Authorization: Bearer <token>", to read /api/metrics/
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'metrics': {'class': 'logging.StreamHandler', 'formatter': 'message'},
+    },
+    'loggers': {
+        # a line of JSON for each sampled request
+        'authors.metrics': {'handlers': ['metrics'], 'level': 'INFO', 'propagate': False},
+    },
+}
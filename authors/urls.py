@@ -19,6 +19,7 @@ from django.urls import path
 from rest_framework_swagger.views import get_swagger_view
 
 from authors.apps.articles.views import TagsAPIView
+from authors.apps.core.views import CacheStatsView, MetricsView
 
 schema_view = get_swagger_view(title='Authors Haven API')
 
@@ -29,6 +30,8 @@ urlpatterns = [
     path('api/profiles/', include('authors.apps.profiles.urls', namespace='profiles')),
     path('api/', include('authors.apps.articles.urls', namespace="ah-articles")),
     path('api/tags/', TagsAPIView.as_view(), name="tags"),
+    path('api/cache/stats/', CacheStatsView.as_view(), name="cache-stats"),
+    path('api/metrics/', MetricsView.as_view(), name="metrics"),
     path('api/notifications/', include('authors.apps.ah_notifications.urls', namespace='notifications')),
     path('', schema_view),
 ]
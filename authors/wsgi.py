@@ -14,3 +14,18 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "authors.settings")
 
 application = get_wsgi_application()
+
+
+def warm_up():
+    """
+    Load what the application keeps in memory before it serves its first request, called by
+    the hooks of authors/gunicorn_config.py. Other servers, like runserver, load it lazily.
+    """
+    from django.conf import settings
+    from authors.apps.articles.search import get_search_backend
+    from authors.apps.authentication.models import revocation_filter
+
+    if settings.AUTH_REVOCATION_BLOOM_FILTER:
+        revocation_filter.load()
+    # the search index, if the backend has one
+    get_search_backend().prepare()